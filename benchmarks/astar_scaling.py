@@ -0,0 +1,63 @@
+"""
+A* scaling benchmark.
+
+Runs `AStarStrategy.find_path` across square grids of growing side whose odd
+rows are walls, each with a single gap at alternating ends. The only route
+snakes through every open row, so a query expands about half of the grid
+whatever the heuristic says, and the search work grows with the grid area.
+The benchmark prints the cells expanded and the wall time per expanded cell.
+With the lazy deletion open set that time stays near flat as the grid grows,
+so a query costs about linear in the area it explores; the old open-set
+membership scan rebuilt a list of the whole heap per edge and grew
+quadratically.
+
+Usage:
+    python -m benchmarks.astar_scaling [side ...]
+"""
+import math
+import sys
+import time
+
+import numpy as np
+
+from fuel_efficency.algorithms.a_star import AStarStrategy
+from fuel_efficency.algorithms.search_stats import SearchStats
+from fuel_efficency.entities.position import Position
+from fuel_efficency.entities.terrain_grid import DEFAULT_PALETTE, TerrainGrid
+from fuel_efficency.entities.valley import Valley
+
+DEFAULT_SIDES = (64, 128, 256, 512, 1024)
+
+# The default terrain types plus an impassable one for the walls
+PALETTE = DEFAULT_PALETTE + ((Valley, math.inf),)
+WALL = len(DEFAULT_PALETTE)
+
+
+def serpentine_terrain(side: int) -> TerrainGrid:
+    # Odd rows are walls, open at the right end then the left end in turn
+    codes = np.zeros((side, side), dtype=np.uint8)
+    for x in range(1, side, 2):
+        codes[x, :] = WALL
+        codes[x, side - 1 if x % 4 == 1 else 0] = 0
+    return TerrainGrid(codes, PALETTE)
+
+
+def time_query(terrain: TerrainGrid, start: Position, end: Position):
+    stats = SearchStats()
+    began = time.perf_counter()
+    AStarStrategy.find_path(terrain, Valley(position=start), Valley(position=end), stats=stats)
+    return time.perf_counter() - began, stats.nodes_expanded
+
+
+def main(sides):
+    print(f"{'side':>6} {'cells':>10} {'expanded':>10} {'time (s)':>10} {'us/expanded':>12}")
+    for side in sides:
+        terrain = serpentine_terrain(side)
+        # The end lies on the last open row, past every wall
+        last_row = side - 1 if side % 2 else side - 2
+        seconds, expanded = time_query(terrain, Position(0, 0), Position(last_row, side // 2))
+        print(f"{side:>6} {side * side:>10} {expanded:>10} {seconds:>10.4f} {1e6 * seconds / expanded:>12.3f}")
+
+
+if __name__ == "__main__":
+    main([int(side) for side in sys.argv[1:]] or DEFAULT_SIDES)
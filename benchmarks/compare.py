@@ -0,0 +1,85 @@
+"""
+Compare two `benchmarks.suite` result files.
+
+Results are grouped by (strategy, side, mix, cost model); the median wall time, the
+total expansions and the total heap operations of each group are compared between
+the baseline and the candidate, and counts a strategy does not report show as n/a.
+The exit status is 1 when any group got slower than `--threshold` times the
+baseline, so the script can gate a change.
+
+Usage:
+    python -m benchmarks.compare baseline.json candidate.json [--threshold 1.1]
+"""
+import argparse
+import json
+import statistics
+import sys
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+Group = Tuple[str, int, str, str]
+
+
+def summarize(path: str) -> Dict[Group, dict]:
+    with open(path) as file:
+        results = json.load(file)['results']
+    groups: Dict[Group, List[dict]] = {}
+    for record in results:
+        groups.setdefault((record['strategy'], record['side'], record['mix'], record['cost_model']), []).append(record)
+    return {
+        group: dict(
+            wall_time=statistics.median(record['wall_time'] for record in records),
+            nodes_expanded=total(record.get('nodes_expanded') for record in records),
+            heap_operations=total(None if record['heap_pops'] is None else record['heap_pushes'] + record['heap_pops'] for record in records),
+            peak_memory_bytes=max(record['peak_memory_bytes'] for record in records),
+        )
+        for group, records in groups.items()
+    }
+
+
+def total(counts: Iterable[Optional[int]]) -> Optional[int]:
+    # A count missing from any record of a group leaves the group without one
+    counts = list(counts)
+    return None if None in counts else sum(counts)
+
+
+def ratio(before: Optional[float], after: Optional[float]) -> Optional[float]:
+    if before is None or after is None:
+        return None
+    return after / before if before else 1.0
+
+
+def format_ratio(value: Optional[float], width: int) -> str:
+    return f"{'n/a':>{width}} " if value is None else f"{value:>{width}.2f}x"
+
+
+def compare(baseline: Dict[Group, dict], candidate: Dict[Group, dict], threshold: float) -> List[Group]:
+    """Print one line per group found in both files and return the groups that regressed."""
+    regressions = []
+    print(f"{'strategy':<20} {'side':>5} {'mix':<8} {'model':<9} {'time':>8} {'expanded':>9} {'heap ops':>9} {'memory':>8}")
+    for group in sorted(baseline.keys() & candidate.keys()):
+        before, after = baseline[group], candidate[group]
+        time_ratio, expanded_ratio, heap_ratio, memory_ratio = (
+            ratio(before.get(metric), after.get(metric)) for metric in ('wall_time', 'nodes_expanded', 'heap_operations', 'peak_memory_bytes')
+        )
+        if time_ratio > threshold:
+            regressions.append(group)
+        strategy, side, mix, cost_model = group
+        flag = '  slower' if time_ratio > threshold else ''
+        print(
+            f"{strategy:<20} {side:>5} {mix:<8} {cost_model:<9} {format_ratio(time_ratio, 7)} {format_ratio(expanded_ratio, 8)} "
+            f"{format_ratio(heap_ratio, 8)} {format_ratio(memory_ratio, 7)}{flag}"
+        )
+    return regressions
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('baseline')
+    parser.add_argument('candidate')
+    parser.add_argument('--threshold', type=float, default=1.1, help="Slowdown ratio that counts as a regression")
+    args = parser.parse_args(argv)
+    return 1 if compare(summarize(args.baseline), summarize(args.candidate), args.threshold) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,239 @@
+"""
+Strategy benchmark suite.
+
+Generates seeded random grids mixing `Valley`, `Plateau`, `UpHill` and `DownHill`
+patches, runs every selected strategy on the same seeded queries and records, per
+query, the best wall time of `--repeat` runs, the cells expanded (from `SearchStats`,
+for strategies that fill one), the heap pushes and pops of the search (stale entries
+included, so pops do not bound expansions) and the peak memory traced during a
+separate, untimed run. Counts a strategy cannot report are recorded as null.
+
+Results are written as JSON together with the commit and interpreter they were
+measured on; compare two result files with `benchmarks.compare`.
+
+Usage:
+    python -m benchmarks.suite [--sizes 64 128 ...] [--mixes uniform ...]
+        [--strategies dijkstra ...] [--queries N] [--repeat N] [--seed N]
+        [--cost-model weighted] [--output results.json]
+
+Sides up to 4096 are supported; pure Python searches take minutes per query there.
+"""
+import argparse
+import contextlib
+import heapq
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+import types
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from fuel_efficency.algorithms.a_star import AStarStrategy
+from fuel_efficency.algorithms.bidirectional import BidirectionalStrategy
+from fuel_efficency.algorithms.context import Context
+from fuel_efficency.algorithms.cost_model import CostModel, DistanceCostModel, SlopeCostModel, WeightedCostModel
+from fuel_efficency.algorithms.dijkstra import DijkstraStrategy
+from fuel_efficency.algorithms.jump_point import JumpPointStrategy
+from fuel_efficency.algorithms.search_stats import SearchStats
+from fuel_efficency.entities.position import Position
+from fuel_efficency.entities.terrain_grid import DEFAULT_PALETTE, TerrainGrid
+from fuel_efficency.entities.valley import Valley
+
+DEFAULT_SIZES = (64, 128, 256, 512)
+MAX_SIZE = 4096
+# Share of Valley, Plateau, UpHill and DownHill cells, in DEFAULT_PALETTE order
+TERRAIN_MIXES = {
+    'uniform': (0.25, 0.25, 0.25, 0.25),
+    'flat': (0.7, 0.2, 0.05, 0.05),
+    'hilly': (0.1, 0.1, 0.5, 0.3),
+}
+# Side of the square patches of a single terrain type
+PATCH_SIZE = 8
+COST_MODELS = {
+    'distance': DistanceCostModel(),
+    'weighted': WeightedCostModel(),
+    'slope': SlopeCostModel(),
+}
+
+# Searches are handed the stats to fill, None on timed runs; those without `stats=` ignore them
+Search = Callable[[TerrainGrid, Valley, Valley, CostModel, Optional[SearchStats]], list]
+
+
+def run_context(terrain: TerrainGrid, start: Valley, end: Valley, cost_model: CostModel, stats: Optional[SearchStats]) -> list:
+    context = Context(_strategy=DijkstraStrategy(), _grid=terrain, _start=start, _end=end, _cost_model=cost_model, _collect_stats=stats is not None)
+    path = context.run()
+    if stats is not None:
+        stats.nodes_expanded = context.last_stats.nodes_expanded
+    return path
+
+
+STRATEGIES: Dict[str, Search] = {
+    'dijkstra': lambda terrain, start, end, cost_model, stats: DijkstraStrategy.find_path(terrain, start, end, cost_model=cost_model, stats=stats),
+    'dijkstra_vectorized': lambda terrain, start, end, cost_model, stats: DijkstraStrategy.find_path(terrain, start, end, cost_model=cost_model, vectorized=True, stats=stats),
+    'dijkstra_bucketed': lambda terrain, start, end, cost_model, stats: DijkstraStrategy.find_path(terrain, start, end, cost_model=cost_model, bucketed=True, stats=stats),
+    'a_star': lambda terrain, start, end, cost_model, stats: AStarStrategy.find_path(terrain, start, end, cost_model=cost_model, stats=stats),
+    'bidirectional': lambda terrain, start, end, cost_model, stats: BidirectionalStrategy().find_path(terrain, start, end, cost_model=cost_model),
+    'jump_point': lambda terrain, start, end, cost_model, stats: JumpPointStrategy.find_path(terrain, start, end, cost_model=cost_model),
+    'context': run_context,
+}
+DEFAULT_STRATEGIES = ('dijkstra', 'a_star', 'context')
+# Strategies that fill the stats they are handed, the others have no expansion count
+COUNTS_EXPANSIONS = frozenset({'dijkstra', 'dijkstra_vectorized', 'dijkstra_bucketed', 'a_star', 'context'})
+# Strategies whose open set is not a `heapq` heap, so heap operations do not apply
+WITHOUT_HEAP = frozenset({'dijkstra_bucketed'})
+
+
+def generate_terrain(side: int, mix: str, seed: int) -> TerrainGrid:
+    """
+    Build a seeded square grid of terrain patches.
+
+    Args:
+        side (int): The side of the grid, in cells.
+        mix (str): A key of `TERRAIN_MIXES`.
+        seed (int): The random seed.
+
+    Returns:
+        TerrainGrid: The grid, the same for the same arguments on every machine.
+    """
+    rng = np.random.default_rng(seed)
+    patches = -(-side // PATCH_SIZE)
+    codes = rng.choice(len(DEFAULT_PALETTE), size=(patches, patches), p=TERRAIN_MIXES[mix])
+    codes = np.repeat(np.repeat(codes, PATCH_SIZE, axis=0), PATCH_SIZE, axis=1)[:side, :side]
+    return TerrainGrid(codes.astype(np.uint8))
+
+
+def generate_queries(side: int, count: int, seed: int) -> List[tuple]:
+    # The first query always crosses the whole grid, the others are random
+    rng = np.random.default_rng(seed)
+    queries = [(Position(0, 0), Position(side - 1, side - 1))]
+    while len(queries) < count:
+        start, end = rng.integers(0, side, (2, 2)).tolist()
+        queries.append((Position(*start), Position(*end)))
+    return queries[:count]
+
+
+@contextlib.contextmanager
+def count_heap_operations() -> Iterator[Dict[str, int]]:
+    """
+    Count the heap operations of every search module while the block runs.
+
+    Each module's `heapq` reference is swapped for a counting wrapper, so the
+    strategies themselves carry no instrumentation.
+    """
+    counts = {'heap_pushes': 0, 'heap_pops': 0}
+
+    def heappush(heap, item):
+        counts['heap_pushes'] += 1
+        return heapq.heappush(heap, item)
+
+    def heappop(heap):
+        counts['heap_pops'] += 1
+        return heapq.heappop(heap)
+
+    def heapreplace(heap, item):
+        counts['heap_pushes'] += 1
+        counts['heap_pops'] += 1
+        return heapq.heapreplace(heap, item)
+
+    counting = types.SimpleNamespace(heappush=heappush, heappop=heappop, heapreplace=heapreplace, heapify=heapq.heapify)
+    modules = [
+        module for name, module in sys.modules.items()
+        if name.startswith('fuel_efficency.algorithms.') and getattr(module, 'heapq', None) is heapq
+    ]
+    for module in modules:
+        module.heapq = counting
+    try:
+        yield counts
+    finally:
+        for module in modules:
+            module.heapq = heapq
+
+
+def measure(strategy: str, terrain: TerrainGrid, start: Position, end: Position, cost_model: CostModel, repeat: int = 1) -> dict:
+    search = STRATEGIES[strategy]
+    start_node, end_node = Valley(position=start), Valley(position=end)
+    stats = SearchStats()
+    with count_heap_operations() as counts:
+        path = search(terrain, start_node, end_node, cost_model, stats)
+    # Counting costs time too, so timed runs go without it
+    wall_time = float('inf')
+    for _ in range(repeat):
+        began = time.perf_counter()
+        search(terrain, start_node, end_node, cost_model, None)
+        wall_time = min(wall_time, time.perf_counter() - began)
+
+    # Tracing slows allocations down, so memory is measured on a separate run
+    tracemalloc.start()
+    try:
+        search(terrain, start_node, end_node, cost_model, None)
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    heap = strategy not in WITHOUT_HEAP
+    return dict(
+        wall_time=wall_time,
+        nodes_expanded=stats.nodes_expanded if strategy in COUNTS_EXPANSIONS else None,
+        heap_pushes=counts['heap_pushes'] if heap else None,
+        heap_pops=counts['heap_pops'] if heap else None,
+        peak_memory_bytes=peak_memory,
+        path_length=len(path),
+    )
+
+
+def run_benchmarks(sizes: Sequence[int], mixes: Sequence[str], strategies: Sequence[str], queries: int, seed: int, cost_model: str, repeat: int = 1) -> List[dict]:
+    """
+    Run every strategy on every (size, mix) grid.
+
+    Returns:
+        List[dict]: One record per (strategy, grid, query).
+    """
+    results = []
+    for side in sizes:
+        if not 1 <= side <= MAX_SIZE:
+            raise ValueError(f"Grid sides must be between 1 and {MAX_SIZE}")
+        for mix in mixes:
+            terrain = generate_terrain(side, mix, seed)
+            for number, (start, end) in enumerate(generate_queries(side, queries, seed)):
+                for name in strategies:
+                    record = dict(strategy=name, side=side, mix=mix, cost_model=cost_model, seed=seed, query=number)
+                    record.update(measure(name, terrain, start, end, COST_MODELS[cost_model], repeat))
+                    results.append(record)
+    return results
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return dict(commit=commit, python=platform.python_version(), numpy=np.__version__, machine=platform.platform())
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--mixes', nargs='+', choices=TERRAIN_MIXES, default=list(TERRAIN_MIXES))
+    parser.add_argument('--strategies', nargs='+', choices=STRATEGIES, default=DEFAULT_STRATEGIES)
+    parser.add_argument('--queries', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per query, the best one is kept")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--cost-model', choices=COST_MODELS, default='weighted')
+    parser.add_argument('--output', help="JSON file to write, standard output by default")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.sizes, args.mixes, args.strategies, args.queries, args.seed, args.cost_model, args.repeat)
+    report = json.dumps(dict(environment=environment(), results=results), indent=2)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(report + '\n')
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
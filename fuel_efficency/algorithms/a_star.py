@@ -1,49 +1,203 @@
 import heapq
 import math
-from typing import List, Dict
+import time
+from typing import Collection, List, Dict, Optional, Sequence, Set, Union
 
+from fuel_efficency.algorithms.cost_model import CostModel, DistanceCostModel
+from fuel_efficency.algorithms.landmarks import Landmarks
 from fuel_efficency.algorithms.path_finding import PathfindingStrategy
+from fuel_efficency.algorithms.path_result import PathResult
+from fuel_efficency.algorithms.search_limits import Cutoff, LimitReached, SearchLimits, cut_off, trim_open_set
+from fuel_efficency.algorithms.search_stats import SearchStats
+from fuel_efficency.algorithms.workspace import SearchWorkspace
 from fuel_efficency.entities.node import Node
 from fuel_efficency.entities.position import Position
+from fuel_efficency.entities.terrain_grid import Grid, TerrainGrid, as_terrain_grid
 
 class AStarStrategy(PathfindingStrategy):
 
     # Define the allowed directions for movement as positions
     allowed_directions = [Position(-1, 0), Position(0, -1), Position(0, 1), Position(1, 0)]
+    # Manhattan length of a step in each allowed direction
+    step_lengths = [abs(direction.x) + abs(direction.y) for direction in allowed_directions]
+    supported_options = frozenset({'cost_model', 'stats', 'workspace', 'limits', 'compact', 'landmarks'})
 
     @staticmethod
-    def find_path(grid: List[List[Node]], start: Node, end: Node) -> List[Node]:
-        # Initialize the open set (priority queue) with the start node
-        open_set = []
-        heapq.heappush(open_set, (0, start))
-        came_from: Dict[Node, Node] = {}
-        g_score = {start: 0}  # Cost from start to the current node
-        f_score = {start: AStarStrategy.heuristic(start, end)}  # Estimated cost from start to end through the current node
+    def find_path(grid: Grid, start: Node, end: Node, *, cost_model: Optional[CostModel] = None, stats: Optional[SearchStats] = None, workspace: Optional[SearchWorkspace] = None, limits: Optional[SearchLimits] = None, compact: bool = False, landmarks: Optional[Landmarks] = None) -> Union[List[Node], LimitReached, PathResult]:
+        began = time.perf_counter()
+        path = AStarStrategy.search(grid, start, end, cost_model, stats, workspace, limits, compact, landmarks)
+        if stats is not None:
+            stats.total_seconds += time.perf_counter() - began
+        return path
+
+    @staticmethod
+    def search(grid: Grid, start: Node, end: Node, cost_model: Optional[CostModel], stats: Optional[SearchStats], workspace: Optional[SearchWorkspace] = None, limits: Optional[SearchLimits] = None, compact: bool = False, landmarks: Optional[Landmarks] = None) -> Union[List[Node], LimitReached, PathResult]:
+        # Search on flat cell indices, nodes are only built for the returned path
+        terrain = as_terrain_grid(grid)
+        endpoints = AStarStrategy.endpoint_indices(terrain, start, end)
+        if endpoints is None:
+            return []
+        source, target = endpoints
+        width = terrain.width
+        target_x, target_y = divmod(target, width)
+        # Edge costs are looked up per (source terrain, direction, target terrain), and the
+        # Manhattan heuristic is scaled by the cheapest cost per unit so it stays admissible
+        cost_model = cost_model or DistanceCostModel()
+        cost_table = cost_model.compile(terrain.palette_weights, AStarStrategy.step_lengths)
+        scale = cost_model.unit_lower_bound(terrain.used_palette_weights)
+        codes = terrain.flat_codes
+        # Landmark bounds follow the terrain weights, the larger of both admissible estimates is used
+        bound = None
+        if landmarks is not None:
+            landmarks.check(terrain, cost_table, AStarStrategy.allowed_directions)
+            bound = landmarks.lower_bound(target)
+
+        # Open set entries are (f_score, -g_score, cell): ties on f_score go to the
+        # deepest cell first, then to the lowest index, so results are deterministic.
+        # The old node heap broke ties by node weight and heap layout instead, so where
+        # several shortest paths exist the one returned may differ, at the same cost.
+        # Entries are never removed from the heap, superseded ones are skipped on pop.
+        source_f_score = scale * AStarStrategy.index_heuristic(source, target_x, target_y, width)
+        if bound is not None:
+            source_f_score = max(source_f_score, bound(source))
+        open_set = [(source_f_score, 0, source)]
+        # Scores, predecessors and closed flags live in the flat arrays of a reused
+        # workspace, and every written cell is recorded so the next search only clears those
+        workspace = (workspace or SearchWorkspace.default(terrain)).prepare(terrain.size)
+        came_from, closed, touched = workspace.came_from, workspace.closed, workspace.touched
+        g_score = workspace.cost  # Cost from start to the current cell
+        g_score[source] = 0
+        touched.append(source)
+        pops_before = 0 if stats is None else stats.heap_pops
+        path = []
+
+        # Cells reached but left unexpanded by the cost or beam limits, why, and the cells expanded
+        max_cost = math.inf if limits is None or limits.max_cost is None else limits.max_cost
+        cut: Set[int] = set()
+        cut_reason = None
+        expansions = 0
+        dropped_entries = 0  # Pushed, but neither popped nor left queued
 
         while open_set:
-            # Pop the node with the lowest f_score from the open set
-            _, current = heapq.heappop(open_set)
-
-            # If the current node is the end node, reconstruct the path
-            if current == end:
-                path = AStarStrategy.reconstruct_path(came_from, start, end)
-                return path[1:]  # Omitting the start position
-
-            # Get the neighbors of the current node
-            for neighbor in AStarStrategy.get_neighbors(grid, current):
-                # Calculate the tentative g_score for the neighbor
-                tentative_g_score = g_score[current] + AStarStrategy.calculate_distance(current, neighbor)
-                # If the neighbor is not in g_score or the new g_score is lower, update it
-                if neighbor not in g_score or tentative_g_score < g_score[neighbor]:
+            # Pop the cell with the lowest f_score from the open set
+            f_score, _, current = heapq.heappop(open_set)
+            if closed[current]:
+                if stats is not None:
+                    stats.record_stale_pop(len(open_set))
+                continue  # Stale entry left behind by a later improvement
+            closed[current] = 1
+            if stats is not None:
+                stats.record_expansion(len(open_set), current, f_score)
+
+            # If the current cell is the end cell, reconstruct the path
+            if current == target:
+                if stats is None:
+                    path = AStarStrategy.reconstruct_indices(came_from, source, target)
+                else:
+                    reconstruct_began = time.perf_counter()
+                    path = AStarStrategy.reconstruct_indices(came_from, source, target)
+                    stats.reconstruct_path_seconds += time.perf_counter() - reconstruct_began
+                # Omitting the start position
+                if compact:
+                    path = PathResult.from_route(grid, terrain, source, path[1:], cost_table, AStarStrategy.allowed_directions)
+                else:
+                    path = AStarStrategy.path_nodes(grid, terrain, path[1:])
+                break
+
+            if limits is not None:
+                reason = limits.exceeded(expansions, len(open_set))
+                if reason is not None:
+                    frontier = [current] + [index for _, g, index in open_set if not closed[index] and -g == g_score[index]]
+                    path = LimitReached.from_cutoff(AStarStrategy.cut_off(terrain, reason, frontier, source, target, workspace), grid, terrain)
+                    break
+                if limits.beam_width is not None and len(open_set) > 2 * limits.beam_width:
+                    dropped = trim_open_set(open_set, limits.beam_width)
+                    cut.update(index for _, g, index in dropped if not closed[index] and -g == g_score[index])
+                    cut_reason = 'beam_width'
+                    dropped_entries += len(dropped)
+                expansions += 1
+
+            # Get the neighbors of the current cell
+            edge_costs = cost_table[codes[current]]
+            if stats is None:
+                neighbors = terrain.neighbors(current, AStarStrategy.allowed_directions)
+            else:
+                neighbors_began = time.perf_counter()
+                neighbors = terrain.neighbors(current, AStarStrategy.allowed_directions)
+                stats.get_neighbors_seconds += time.perf_counter() - neighbors_began
+            for neighbor, direction in neighbors:
+                if closed[neighbor]:
+                    continue
+                # Calculate the tentative g_score for the neighbor, impassable cells cost infinity
+                tentative_g_score = g_score[current] + edge_costs[direction][codes[neighbor]]
+                if tentative_g_score == math.inf:
+                    continue
+                # If the neighbor was not reached yet or the new g_score is lower, (re)open it
+                if tentative_g_score < g_score[neighbor]:
+                    if stats is None:
+                        h_score = AStarStrategy.index_heuristic(neighbor, target_x, target_y, width)
+                    else:
+                        distance_began = time.perf_counter()
+                        h_score = AStarStrategy.index_heuristic(neighbor, target_x, target_y, width)
+                        stats.calculate_distance_seconds += time.perf_counter() - distance_began
+                    f_score = tentative_g_score + scale * h_score
+                    if bound is not None:
+                        f_score = max(f_score, tentative_g_score + bound(neighbor))
+                        if f_score == math.inf:
+                            continue  # The landmarks prove the end cannot be reached from there
+                    if f_score > max_cost:
+                        # Any path through the neighbor costs more than the budget
+                        cut.add(current)
+                        cut_reason = cut_reason or 'max_cost'
+                        continue
                     came_from[neighbor] = current
                     g_score[neighbor] = tentative_g_score
-                    f_score[neighbor] = tentative_g_score + AStarStrategy.heuristic(neighbor, end)
-                    # Push the neighbor into the open set if it's not already in it
-                    if neighbor not in [i[1] for i in open_set]:
-                        heapq.heappush(open_set, (f_score[neighbor], neighbor))
+                    touched.append(neighbor)
+                    heapq.heappush(open_set, (f_score, -tentative_g_score, neighbor))
+
+        if cut and path == []:
+            # The open set ran out, but only because limits left cells unexpanded
+            path = LimitReached.from_cutoff(AStarStrategy.cut_off(terrain, cut_reason, cut, source, target, workspace), grid, terrain)
+        if stats is not None:
+            stats.record_end(pops_before, len(open_set), dropped_entries)
+        # The path stays empty if no path is found
+        return path
+
+    @staticmethod
+    def cut_off(terrain: TerrainGrid, reason: str, frontier: Collection[int], source: int, target: int, workspace: SearchWorkspace) -> Cutoff:
+        # The frontier is ranked by the heuristic distance to the end
+        width = terrain.width
+        target_x, target_y = divmod(target, width)
+
+        def closeness(index: int) -> float:
+            return AStarStrategy.index_heuristic(index, target_x, target_y, width)
 
-        # Return an empty list if no path is found
-        return []
+        return cut_off(reason, frontier, source, workspace.came_from, workspace.cost, closeness)
+
+    @staticmethod
+    def build_landmarks(grid: Grid, count: int = 8, *, cost_model: Optional[CostModel] = None, cells: Optional[Sequence[Node]] = None, workers: int = 1) -> Landmarks:
+        """
+        Preprocess a grid for the landmark heuristic of `find_path(..., landmarks=...)`.
+
+        Args:
+            grid (Grid): A list-of-lists grid or a `TerrainGrid`.
+            count (int): The number of landmarks, spread around the edge of the grid.
+            cost_model (Optional[CostModel]): The cost model the searches will use, geometric
+                distance by default.
+            cells (Optional[Sequence[Node]]): The landmarks, placed by their position, instead of
+                spreading `count` of them.
+            workers (int): Number of worker processes computing the landmark distances.
+
+        Returns:
+            Landmarks: The landmark distances, valid for this grid's cells and cost model.
+        """
+        terrain = as_terrain_grid(grid)
+        if cells is not None and not all(terrain.contains(node.position) for node in cells):
+            raise ValueError("Landmarks must lie inside the grid")
+        cost_model = cost_model or DistanceCostModel()
+        cost_table = cost_model.compile(terrain.palette_weights, AStarStrategy.step_lengths)
+        indices = None if cells is None else [terrain.index(node.position) for node in cells]
+        return Landmarks.build(terrain, cost_table, AStarStrategy.allowed_directions, count, indices, workers)
 
     @staticmethod
     def get_neighbors(grid: List[List[Node]], node: Node) -> List[Node]:
@@ -68,6 +222,12 @@ class AStarStrategy(PathfindingStrategy):
         # Calculate the heuristic (estimated cost) using the Manhattan distance
         return abs(node1.position.x - node2.position.x) + abs(node1.position.y - node2.position.y)
 
+    @staticmethod
+    def index_heuristic(index: int, target_x: int, target_y: int, width: int) -> float:
+        # Manhattan distance from a flat cell index to the target cell
+        x, y = divmod(index, width)
+        return abs(x - target_x) + abs(y - target_y)
+
     @staticmethod
     def reconstruct_path(came_from: Dict[Node, Node], start: Node, end: Node) -> List[Node]:
         current = end
@@ -80,3 +240,17 @@ class AStarStrategy(PathfindingStrategy):
         # Reverse the path to get the correct order from start to end
         path.reverse()
         return path
+
+    @staticmethod
+    def reconstruct_indices(came_from: Dict[int, int], start: int, end: int) -> List[int]:
+        # `reconstruct_path` over flat cell indices, as the search records them
+        current = end
+        path = []
+        # Backtrack from the end cell to the start cell to reconstruct the path
+        while current != start:
+            path.append(current)
+            current = came_from[current]
+        path.append(start)
+        # Reverse the path to get the correct order from start to end
+        path.reverse()
+        return path
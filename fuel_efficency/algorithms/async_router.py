@@ -0,0 +1,163 @@
+import asyncio
+import functools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple, Union
+
+from fuel_efficency.algorithms.context import Context
+from fuel_efficency.algorithms.cost_model import CostModel
+from fuel_efficency.algorithms.dijkstra import DijkstraStrategy
+from fuel_efficency.algorithms.path_finding import PathfindingStrategy
+from fuel_efficency.entities.grid_file import PathLike, load_grid
+from fuel_efficency.entities.node import Node
+from fuel_efficency.entities.terrain_grid import Grid, TerrainGrid, as_terrain_grid
+
+# (start cell, end cell) of a query, as flat indices
+Query = Tuple[int, int]
+
+# Context of a pool worker, set once by `_init_worker` and reused by every query it answers
+_worker_state: Dict[str, Context] = {}
+
+
+class RouterBusy(RuntimeError):
+    """Raised by `AsyncRouter.find_path` when `max_pending` searches are already in flight."""
+
+
+@dataclass(slots=True)
+class _Search:
+    # A search sent to the pool and the number of callers awaiting it
+    future: asyncio.Future
+    waiters: int = 0
+
+
+class AsyncRouter:
+    """
+    asyncio front end to a `Context` running in a pool of worker processes.
+
+    Every worker loads the grid once, when it starts, and keeps a `Context` over it,
+    so queries only carry two cell indices there and a list of indices back. A grid
+    given as a grid file path is memory-mapped by every worker, which then share its
+    pages instead of holding a copy each.
+
+    Identical queries in flight at the same time are coalesced into one search. At
+    most `max_pending` distinct searches are in flight, further queries are turned
+    away with `RouterBusy` so callers can shed load instead of queueing without bound.
+    A search is cancelled once every caller awaiting it was cancelled or timed out;
+    one already running in a worker finishes, but its result is dropped.
+
+    Args:
+        grid (Union[Grid, PathLike]): The grid to route on, or the path of a grid file.
+        strategy (Optional[PathfindingStrategy]): The strategy of the workers' contexts, Dijkstra by default.
+        cost_model (Optional[CostModel]): The cost model of the workers' contexts.
+        workers (int): Number of worker processes.
+        max_pending (int): Maximum number of distinct searches in flight.
+        timeout (Optional[float]): Default seconds a caller waits for its path, no limit when None.
+    """
+
+    def __init__(self, grid: Union[Grid, PathLike], strategy: Optional[PathfindingStrategy] = None, *, cost_model: Optional[CostModel] = None, workers: int = 1, max_pending: int = 64, timeout: Optional[float] = None):
+        if workers < 1 or max_pending < 1:
+            raise ValueError("Workers and max pending must be positive")
+        if timeout is not None and timeout <= 0:
+            raise ValueError("Timeout must be positive")
+        if strategy is not None and not isinstance(strategy, PathfindingStrategy):
+            raise TypeError("Strategy must be an instance of PathfindingStrategy")
+        if isinstance(grid, (str, os.PathLike)):
+            # Workers map the file themselves, the pool only hands them its path
+            self.grid: Grid = load_grid(grid)
+            worker_grid: Union[TerrainGrid, str] = os.fspath(grid)
+        else:
+            self.grid = grid
+            worker_grid = as_terrain_grid(grid)
+        self.terrain = as_terrain_grid(self.grid)
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._searches: Dict[Query, _Search] = {}
+        self._pool = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(worker_grid, strategy or DijkstraStrategy(), cost_model),
+        )
+        self._closed = False
+
+    @property
+    def pending(self) -> int:
+        """Number of distinct searches in flight."""
+        return len(self._searches)
+
+    async def find_path(self, start: Node, end: Node, *, timeout: Optional[float] = None) -> List[Node]:
+        """
+        Find a path in a worker process without blocking the event loop.
+
+        Args:
+            start (Node): The start node, not included in the path.
+            end (Node): The end node.
+            timeout (Optional[float]): Seconds to wait for the path, the router's default when None.
+
+        Returns:
+            List[Node]: The path as returned by the context, an empty list if there is none.
+
+        Raises:
+            RouterBusy: `max_pending` other searches are in flight.
+            asyncio.TimeoutError: The path did not arrive in time.
+        """
+        if self._closed:
+            raise RuntimeError("The router is closed")
+        query = DijkstraStrategy.endpoint_indices(self.terrain, start, end)
+        if query is None:
+            # Return an empty list if either end lies off the grid
+            return []
+
+        search = self._searches.get(query)
+        if search is None:
+            if len(self._searches) >= self.max_pending:
+                raise RouterBusy(f"{self.max_pending} searches already in flight")
+            future = asyncio.get_running_loop().run_in_executor(self._pool, _route_in_worker, *query)
+            search = self._searches[query] = _Search(future)
+            future.add_done_callback(functools.partial(self._forget, query))
+
+        search.waiters += 1
+        try:
+            # Shielded, so a caller giving up does not cancel the search for the others
+            path = await asyncio.wait_for(asyncio.shield(search.future), self.timeout if timeout is None else timeout)
+        finally:
+            search.waiters -= 1
+            if search.waiters == 0 and not search.future.done():
+                # Nobody waits for it any more, its slot is freed right away
+                search.future.cancel()
+                self._forget(query, search.future)
+        return DijkstraStrategy.path_nodes(self.grid, self.terrain, path)
+
+    def _forget(self, query: Query, future: asyncio.Future):
+        # Finished and cancelled searches free their slot, later queries search again
+        search = self._searches.get(query)
+        if search is not None and search.future is future:
+            del self._searches[query]
+
+    async def close(self):
+        """Cancel the queued searches and shut the worker processes down."""
+        if self._closed:
+            return
+        self._closed = True
+        for search in list(self._searches.values()):
+            search.future.cancel()
+        # Waiting for running searches to finish happens off the event loop
+        await asyncio.get_running_loop().run_in_executor(None, functools.partial(self._pool.shutdown, cancel_futures=True))
+
+    async def __aenter__(self) -> 'AsyncRouter':
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+def _init_worker(grid: Union[TerrainGrid, str], strategy: PathfindingStrategy, cost_model: Optional[CostModel]):
+    terrain = load_grid(grid) if isinstance(grid, str) else grid
+    _worker_state['context'] = Context(_strategy=strategy, _grid=terrain, _cost_model=cost_model)
+
+
+def _route_in_worker(source: int, target: int) -> List[int]:
+    context = _worker_state['context']
+    terrain = context.grid
+    context.start, context.end = terrain.node_at(source), terrain.node_at(target)
+    return [terrain.index(node.position) for node in context.run()]
@@ -0,0 +1,86 @@
+import math
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from fuel_efficency.algorithms.cost_model import CostTable
+from fuel_efficency.algorithms.dijkstra import DijkstraStrategy
+from fuel_efficency.entities.terrain_grid import TerrainGrid, TerrainType
+
+# (source cell, target cells) answered by one shortest path tree
+RouteGroup = Tuple[int, Sequence[int]]
+
+# Grid and cost table of a pool worker, set once by `_init_worker` and only read afterwards
+_worker_state: Dict[str, object] = {}
+
+
+def route_group(terrain: TerrainGrid, cost_table: CostTable, group: RouteGroup) -> List[Optional[List[int]]]:
+    """
+    Answer every query of a group with a single Dijkstra tree grown from its source.
+
+    Args:
+        terrain (TerrainGrid): The grid to route on.
+        cost_table (CostTable): The compiled cost model.
+        group (RouteGroup): The shared source cell and the target cells.
+
+    Returns:
+        List[Optional[List[int]]]: The cell indices of each path, start excluded, or None if unreachable.
+    """
+    source, targets = group
+    cost_so_far, came_from = DijkstraStrategy.settle(terrain, source, cost_table, targets)
+    return [
+        None if cost_so_far[target] == math.inf else DijkstraStrategy.reconstruct_indices(came_from, source, target)
+        for target in targets
+    ]
+
+
+def route_groups(terrain: TerrainGrid, cost_table: CostTable, groups: Sequence[RouteGroup], workers: int = 1) -> List[List[Optional[List[int]]]]:
+    """
+    Answer route groups, spreading them across a process pool when `workers` > 1.
+
+    The terrain codes are copied once into a shared memory block that every worker
+    maps, so the grid is never pickled, and the cost table is handed to each worker
+    when it starts; tasks carry nothing but cell indices.
+
+    Args:
+        terrain (TerrainGrid): The grid to route on.
+        cost_table (CostTable): The compiled cost model.
+        groups (Sequence[RouteGroup]): The groups to answer.
+        workers (int): Number of worker processes, 1 routes in this process.
+
+    Returns:
+        List[List[Optional[List[int]]]]: The answers of each group, in group order.
+    """
+    if workers <= 1 or len(groups) <= 1:
+        return [route_group(terrain, cost_table, group) for group in groups]
+    block = shared_memory.SharedMemory(create=True, size=max(terrain.size, 1))
+    try:
+        np.ndarray(terrain.shape, dtype=np.uint8, buffer=block.buf)[:] = terrain.codes
+        # Workers trust the counts instead of scanning the codes again
+        code_counts = np.bincount(terrain.codes.ravel(), minlength=len(terrain.palette)).tolist()
+        initargs = (block.name, terrain.shape, terrain.palette, code_counts, cost_table)
+        with ProcessPoolExecutor(max_workers=min(workers, len(groups)), initializer=_init_worker, initargs=initargs) as pool:
+            return list(pool.map(_route_group_in_worker, groups))
+    finally:
+        block.close()
+        block.unlink()
+
+
+def _init_worker(name: str, shape: Tuple[int, int], palette: Tuple[TerrainType, ...], code_counts: List[int], cost_table: CostTable):
+    try:
+        # The block belongs to the parent, which unlinks it, so workers do not track it
+        block = shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        block = shared_memory.SharedMemory(name=name)
+    codes = np.ndarray(shape, dtype=np.uint8, buffer=block.buf)
+    _worker_state.update(
+        block=block,  # Keeps the mapping open for as long as the worker lives
+        terrain=TerrainGrid(codes, palette, code_counts),
+        cost_table=cost_table,
+    )
+
+
+def _route_group_in_worker(group: RouteGroup) -> List[Optional[List[int]]]:
+    return route_group(_worker_state['terrain'], _worker_state['cost_table'], group)
@@ -0,0 +1,149 @@
+import heapq
+import math
+from typing import Callable, Dict, Hashable, List, Optional, Sequence
+
+from fuel_efficency.algorithms.cost_model import CostModel, DistanceCostModel
+from fuel_efficency.algorithms.dijkstra import DijkstraStrategy
+from fuel_efficency.algorithms.path_finding import PathfindingStrategy
+from fuel_efficency.entities.node import Node
+from fuel_efficency.entities.position import Position
+from fuel_efficency.entities.terrain_grid import Grid, TerrainGrid, as_terrain_grid
+
+FORWARD, BACKWARD = 0, 1
+
+
+class BidirectionalStrategy(PathfindingStrategy):
+    """
+    Searches from `start` and from `end` at once and stops when the two frontiers prove
+    no cheaper meeting point is left.
+
+    Without a heuristic this is bidirectional Dijkstra. With one, both searches run A*
+    on the average potential `(h_end(v) - h_start(v)) / 2`, which keeps the two
+    searches consistent with each other so the stop condition stays exact.
+
+    Args:
+        directions (Sequence[Position]): The movement model, e.g.
+            `DijkstraStrategy.cardinal_directions` (8 neighbours, the default) or
+            `AStarStrategy.allowed_directions` (4 neighbours).
+        heuristic (bool): Guide both searches with an admissible geometric heuristic.
+    """
+
+    def __init__(self, directions: Sequence[Position] = DijkstraStrategy.cardinal_directions, heuristic: bool = True):
+        self.directions = list(directions)
+        self.heuristic = heuristic
+        # Euclidean length of a step in each direction, and the direction that undoes it
+        self.step_lengths = [math.sqrt(direction.x ** 2 + direction.y ** 2) for direction in self.directions]
+        self.opposite = [self.directions.index(Position(-direction.x, -direction.y)) for direction in self.directions]
+        self.diagonal = any(direction.x and direction.y for direction in self.directions)
+
+    def cache_key(self) -> Hashable:
+        # The movement model decides the route, and ties may break differently with a heuristic
+        return type(self), tuple(self.directions), self.heuristic
+
+    def find_path(self, grid: Grid, start: Node, end: Node, *, cost_model: Optional[CostModel] = None) -> List[Node]:
+        terrain = as_terrain_grid(grid)
+        endpoints = self.endpoint_indices(terrain, start, end)
+        if endpoints is None:
+            return []
+        source, target = endpoints
+        cost_model = cost_model or DistanceCostModel()
+        cost_table = cost_model.compile(terrain.palette_weights, self.step_lengths)
+        codes = terrain.flat_codes
+        potential = self.potential(terrain, source, target, cost_model.unit_lower_bound(terrain.used_palette_weights))
+        # Forward keys are g + p(v) and backward keys g - p(v), so the potentials cancel
+        # out when the keys of both sides are added up
+        signs = (1, -1)
+
+        g_score: List[Dict[int, float]] = [{source: 0}, {target: 0}]
+        came_from: List[Dict[int, int]] = [{}, {}]
+        closed = [set(), set()]
+        open_sets = [[(potential(source), source)], [(-potential(target), target)]]
+        best_cost, meeting = (0, source) if source == target else (math.inf, None)
+
+        while open_sets[FORWARD] and open_sets[BACKWARD]:
+            # No path through the unsettled cells can beat the best meeting point any more
+            if open_sets[FORWARD][0][0] + open_sets[BACKWARD][0][0] >= best_cost:
+                break
+            # Expand the side whose frontier is cheaper
+            side = FORWARD if open_sets[FORWARD][0][0] <= open_sets[BACKWARD][0][0] else BACKWARD
+            _, current = heapq.heappop(open_sets[side])
+            if current in closed[side]:
+                continue  # Stale entry left behind by a later improvement
+            closed[side].add(current)
+
+            scores, other_scores, sign = g_score[side], g_score[1 - side], signs[side]
+            current_code = codes[current]
+            for neighbor, direction in terrain.neighbors(current, self.directions):
+                # The backward search walks edges against their direction
+                if side == FORWARD:
+                    edge_cost = cost_table[current_code][direction][codes[neighbor]]
+                else:
+                    edge_cost = cost_table[codes[neighbor]][self.opposite[direction]][current_code]
+                if edge_cost == math.inf:
+                    continue
+                new_cost = scores[current] + edge_cost
+                if new_cost < scores.get(neighbor, math.inf):
+                    scores[neighbor] = new_cost
+                    came_from[side][neighbor] = current
+                    heapq.heappush(open_sets[side], (new_cost + sign * potential(neighbor), neighbor))
+                # Every cell reached by both searches is a candidate meeting point
+                through = scores[neighbor] + other_scores.get(neighbor, math.inf)
+                if through < best_cost:
+                    best_cost, meeting = through, neighbor
+
+        if meeting is None:
+            return []
+        return self.path_nodes(grid, terrain, self.join_paths(came_from, source, target, meeting))
+
+    def potential(self, terrain: TerrainGrid, source: int, target: int, scale: float) -> Callable[[int], float]:
+        if not self.heuristic or scale == 0:
+            return lambda index: 0
+        width = terrain.width
+        source_x, source_y = divmod(source, width)
+        target_x, target_y = divmod(target, width)
+        diagonal = self.diagonal
+
+        def distance(x: int, y: int, other_x: int, other_y: int) -> float:
+            # Geometric lower bound: octile distance with diagonal steps, Manhattan without
+            dx, dy = abs(x - other_x), abs(y - other_y)
+            if diagonal:
+                return max(dx, dy) + (math.sqrt(2) - 1) * min(dx, dy)
+            return dx + dy
+
+        def potential(index: int) -> float:
+            x, y = divmod(index, width)
+            return scale * (distance(x, y, target_x, target_y) - distance(x, y, source_x, source_y)) / 2
+
+        return potential
+
+    @staticmethod
+    def join_paths(came_from: List[Dict[int, int]], source: int, target: int, meeting: int) -> List[int]:
+        # Forward half from the meeting cell back to the start, start excluded
+        path = []
+        current = meeting
+        while current != source:
+            path.append(current)
+            current = came_from[FORWARD][current]
+        path.reverse()
+        # Backward half from the meeting cell on to the end
+        current = meeting
+        while current != target:
+            current = came_from[BACKWARD][current]
+            path.append(current)
+        return path
+
+    def get_neighbors(self, grid: List[List[Node]], node: Node) -> List[Node]:
+        neighbors = []
+        x, y = node.position.x, node.position.y
+
+        # Iterate through all directions of the movement model to find valid neighbors
+        for direction in self.directions:
+            nx, ny = x + direction.x, y + direction.y
+            if 0 <= nx < len(grid) and 0 <= ny < len(grid[0]):
+                neighbors.append(grid[nx][ny])
+
+        return neighbors
+
+    def calculate_distance(self, node1: Node, node2: Node) -> float:
+        # Calculate the Euclidean distance between two nodes
+        return math.sqrt((node1.position.x - node2.position.x) ** 2 + (node1.position.y - node2.position.y) ** 2)
@@ -0,0 +1,349 @@
+import heapq
+import math
+from typing import Collection, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+from fuel_efficency.algorithms.cost_model import CostModel
+from fuel_efficency.algorithms.dijkstra import DijkstraStrategy
+from fuel_efficency.entities.position import Position
+from fuel_efficency.entities.terrain_grid import TerrainGrid
+
+# A border is the pair of adjacent cluster numbers it separates, lowest first
+Border = Tuple[int, int]
+# An entrance is a pair of neighbouring passable cells on either side of a border
+Entrance = Tuple[int, int]
+
+
+class ClusterGraph:
+    """
+    Abstract graph of a `TerrainGrid` split into square clusters, as used by HPA*.
+
+    Every border between two clusters (sides and corners) is scanned for crossings
+    between passable cells. Each run of straight crossings gets one entrance in its
+    middle, or two at its ends when the run is `long_run` cells or longer. Diagonal
+    crossings that no run covers get their own entrance. Entrance cells are the
+    nodes of the abstract graph. They are linked to the cell across the border by
+    a single step and to the other entrances of their cluster by the cost of the
+    cheapest path that stays inside the cluster.
+
+    The graph only depends on the grid and the cost model, so it is built once and
+    reused by every query. `update_cells` edits the grid and only rebuilds the
+    clusters around the changed cells.
+
+    Moves follow `DijkstraStrategy` (8 directions, corners may be cut).
+
+    Args:
+        terrain (TerrainGrid): The grid to abstract.
+        cost_model (CostModel): How steps are priced.
+        cluster_size (int): The side of a cluster, in cells.
+    """
+
+    # Straight runs of at least this many crossings get an entrance at each end
+    long_run = 6
+
+    def __init__(self, terrain: TerrainGrid, cost_model: CostModel, cluster_size: int = 16):
+        if cluster_size < 1:
+            raise ValueError("Cluster size must be positive")
+        self.terrain = terrain
+        # The terrain version the graph follows, edits made elsewhere leave it behind
+        self.version = terrain.version
+        self.cost_model = cost_model
+        self.cluster_size = cluster_size
+        self.cost_table = cost_model.compile(terrain.palette_weights, DijkstraStrategy.step_lengths)
+        height, width = terrain.shape
+        self.clusters_high = -(-height // cluster_size)
+        self.clusters_wide = -(-width // cluster_size)
+        directions = DijkstraStrategy.cardinal_directions
+        self.direction_numbers = {(direction.x, direction.y): number for number, direction in enumerate(directions)}
+        self.opposite = [directions.index(Position(-direction.x, -direction.y)) for direction in directions]
+
+        self.entrances: Dict[Border, List[Entrance]] = {}
+        # Single-step edges across borders, and edges between the entrances of one cluster
+        self.inter: Dict[int, Dict[int, float]] = {}
+        self.intra: List[Dict[int, Dict[int, float]]] = [{} for _ in range(self.clusters_high * self.clusters_wide)]
+        self.rebuild(range(len(self.intra)))
+
+    def cluster_of(self, index: int) -> int:
+        x, y = divmod(index, self.terrain.width)
+        return (x // self.cluster_size) * self.clusters_wide + y // self.cluster_size
+
+    def bounds(self, cluster: int) -> Tuple[int, int, int, int]:
+        """The (first row, row after the last, first column, column after the last) of a cluster."""
+        height, width = self.terrain.shape
+        cluster_x, cluster_y = divmod(cluster, self.clusters_wide)
+        top, left = cluster_x * self.cluster_size, cluster_y * self.cluster_size
+        return top, min(top + self.cluster_size, height), left, min(left + self.cluster_size, width)
+
+    def borders_of(self, cluster: int) -> List[Border]:
+        cluster_x, cluster_y = divmod(cluster, self.clusters_wide)
+        borders = []
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                nx, ny = cluster_x + dx, cluster_y + dy
+                if (dx or dy) and 0 <= nx < self.clusters_high and 0 <= ny < self.clusters_wide:
+                    other = nx * self.clusters_wide + ny
+                    borders.append((min(cluster, other), max(cluster, other)))
+        return borders
+
+    def nodes_of(self, cluster: int) -> Set[int]:
+        """The entrance cells that lie in a cluster."""
+        nodes = set()
+        for border in self.borders_of(cluster):
+            for a, b in self.entrances.get(border, ()):
+                nodes.add(a if border[0] == cluster else b)
+        return nodes
+
+    def update_cells(self, changes: Mapping[Position, int]) -> List[int]:
+        """
+        Change the terrain code of some cells and rebuild the clusters they touch.
+
+        Args:
+            changes (Mapping[Position, int]): The new terrain code of every changed cell.
+
+        Returns:
+            List[int]: The flat indices of the cells whose code actually changed.
+        """
+        changed = self.terrain.set_cells(changes)
+        self.rebuild({self.cluster_of(index) for index in changed})
+        self.version = self.terrain.version
+        return changed
+
+    def rebuild(self, clusters: Iterable[int]):
+        """
+        Rescan the borders of `clusters` and recompute their intra-cluster edges. Neighbouring
+        clusters are only recomputed when the entrances on their shared border moved.
+
+        Args:
+            clusters (Iterable[int]): The cluster numbers whose cells changed.
+        """
+        dirty = set(clusters)
+        stale = set(dirty)
+        passable = self.terrain.passable.ravel()
+        for border in {border for cluster in dirty for border in self.borders_of(cluster)}:
+            previous = self.entrances.pop(border, [])
+            for a, b in previous:
+                self.unlink(a, b)
+                self.unlink(b, a)
+            entrances = self.scan(border, passable)
+            for a, b in entrances:
+                self.link(a, b)
+                self.link(b, a)
+            if entrances:
+                self.entrances[border] = entrances
+            if entrances != previous:
+                stale.update(border)
+        for cluster in stale:
+            self.intra[cluster] = self.connect(cluster)
+
+    def scan(self, border: Border, passable: Sequence[bool]) -> List[Entrance]:
+        # Lay the cells on either side of the border out as two parallel rows
+        first, second = border
+        top, bottom, left, right = self.bounds(first)
+        other_top, _, other_left, _ = self.bounds(second)
+        width = self.terrain.width
+        if other_top == top:  # Side by side
+            near = [x * width + right - 1 for x in range(top, bottom)]
+            far = [x * width + right for x in range(top, bottom)]
+        elif other_left == left:  # One above the other
+            near = [(bottom - 1) * width + y for y in range(left, right)]
+            far = [bottom * width + y for y in range(left, right)]
+        elif other_left > left:  # Corner to corner, going down and right
+            near, far = [(bottom - 1) * width + right - 1], [bottom * width + right]
+        else:  # Corner to corner, going down and left
+            near, far = [(bottom - 1) * width + left], [bottom * width + left - 1]
+
+        crossing = [bool(passable[a] and passable[b]) for a, b in zip(near, far)]
+        entrances = []
+        run_start = None
+        for position, open_ in enumerate(crossing + [False]):
+            if open_ and run_start is None:
+                run_start = position
+            elif not open_ and run_start is not None:
+                run_end = position - 1
+                if run_end - run_start + 1 >= self.long_run:
+                    entrances += [(near[run_start], far[run_start]), (near[run_end], far[run_end])]
+                else:
+                    middle = (run_start + run_end) // 2
+                    entrances.append((near[middle], far[middle]))
+                run_start = None
+        # A diagonal crossing next to a straight one is reachable along the run, on both sides
+        for position in range(len(near) - 1):
+            if crossing[position] or crossing[position + 1]:
+                continue
+            for a, b in ((near[position], far[position + 1]), (near[position + 1], far[position])):
+                if passable[a] and passable[b]:
+                    entrances.append((a, b))
+        return entrances
+
+    def step_cost(self, a: int, b: int) -> float:
+        width = self.terrain.width
+        codes = self.terrain.flat_codes
+        number = self.direction_numbers[(b // width - a // width, b % width - a % width)]
+        return self.cost_table[codes[a]][number][codes[b]]
+
+    def link(self, a: int, b: int):
+        self.inter.setdefault(a, {})[b] = self.step_cost(a, b)
+
+    def unlink(self, a: int, b: int):
+        edges = self.inter.get(a)
+        if edges is not None:
+            edges.pop(b, None)
+            if not edges:
+                del self.inter[a]
+
+    def connect(self, cluster: int) -> Dict[int, Dict[int, float]]:
+        # Cheapest in-cluster cost between every ordered pair of entrances of the cluster
+        nodes = self.nodes_of(cluster)
+        edges = {}
+        for node in nodes:
+            cost_so_far, _ = self.search(node, cluster, nodes)
+            edges[node] = {other: cost_so_far[other] for other in nodes if other != node and other in cost_so_far}
+        return edges
+
+    def search(self, source: int, cluster: int, targets: Collection[int] = (), backward: bool = False) -> Tuple[Dict[int, float], Dict[int, int]]:
+        """
+        Dijkstra search that never leaves one cluster.
+
+        Args:
+            source (int): The flat index of the root cell, inside the cluster.
+            cluster (int): The cluster to search.
+            targets (Collection[int]): Stop once all of these cells are settled, the whole
+                cluster is settled when empty.
+            backward (bool): Follow edges against their direction, giving the cost from
+                every cell to `source`.
+
+        Returns:
+            Tuple[Dict[int, float], Dict[int, int]]: The cost of every reached cell and its
+                predecessor towards `source`.
+        """
+        top, bottom, left, right = self.bounds(cluster)
+        width = self.terrain.width
+        codes = self.terrain.flat_codes
+        cost_table = self.cost_table
+        steps = [
+            (number, direction.x, direction.y, self.opposite[number])
+            for number, direction in enumerate(DijkstraStrategy.cardinal_directions)
+        ]
+        pending = set(targets)
+        pending.discard(source)
+        stop_early = bool(pending)
+
+        open_set = [(0, source)]
+        came_from: Dict[int, int] = {}
+        cost_so_far = {source: 0}
+        while open_set:
+            current_priority, current = heapq.heappop(open_set)
+            if current_priority > cost_so_far[current]:
+                continue  # Stale entry left behind by a later improvement
+            if current in pending:
+                pending.remove(current)
+                if stop_early and not pending:
+                    break
+            x, y = divmod(current, width)
+            current_code = codes[current]
+            edge_costs = cost_table[current_code]
+            for number, dx, dy, opposite in steps:
+                nx, ny = x + dx, y + dy
+                if not (top <= nx < bottom and left <= ny < right):
+                    continue
+                neighbor = nx * width + ny
+                if backward:
+                    edge_cost = cost_table[codes[neighbor]][opposite][current_code]
+                else:
+                    edge_cost = edge_costs[number][codes[neighbor]]
+                new_cost = current_priority + edge_cost
+                if new_cost < cost_so_far.get(neighbor, math.inf):
+                    cost_so_far[neighbor] = new_cost
+                    came_from[neighbor] = current
+                    heapq.heappush(open_set, (new_cost, neighbor))
+        return cost_so_far, came_from
+
+    def find_route(self, source: int, target: int) -> Optional[List[int]]:
+        """
+        Route on the abstract graph, then refine every abstract edge into cells.
+
+        Args:
+            source (int): The flat index of the start cell.
+            target (int): The flat index of the end cell.
+
+        Returns:
+            Optional[List[int]]: The cell indices of the path, start excluded, or None if unreachable.
+        """
+        if source == target:
+            return []
+        if not math.isfinite(self.terrain.palette[self.terrain.flat_codes[target]][1]):
+            return None
+        source_cluster, target_cluster = self.cluster_of(source), self.cluster_of(target)
+        # The endpoints join the abstract graph through in-cluster searches
+        source_nodes = self.nodes_of(source_cluster)
+        if source_cluster == target_cluster:
+            source_nodes.add(target)
+        target_nodes = self.nodes_of(target_cluster)
+        source_costs, _ = self.search(source, source_cluster, source_nodes)
+        target_costs, _ = self.search(target, target_cluster, target_nodes, backward=True)
+        # Only the settled costs to entrances are final, the rest of the search is dropped
+        source_costs = {node: source_costs[node] for node in source_nodes if node in source_costs}
+        target_costs = {node: target_costs[node] for node in target_nodes if node in target_costs}
+
+        abstract = self.abstract_search(source, target, source_costs, target_costs)
+        if abstract is None:
+            return None
+        path = []
+        for a, b in zip(abstract, abstract[1:]):
+            cluster = self.cluster_of(a)
+            if cluster != self.cluster_of(b):
+                path.append(b)  # Entrances across a border are one step apart
+            else:
+                _, came_from = self.search(a, cluster, (b,))
+                path += DijkstraStrategy.reconstruct_indices(came_from, a, b)
+        return path
+
+    def abstract_search(self, source: int, target: int, source_costs: Dict[int, float], target_costs: Dict[int, float]) -> Optional[List[int]]:
+        width = self.terrain.width
+        target_x, target_y = divmod(target, width)
+        scale = self.cost_model.unit_lower_bound(self.terrain.used_palette_weights)
+
+        def heuristic(index: int) -> float:
+            # Octile distance, the geometric lower bound of 8-direction movement
+            dx, dy = abs(index // width - target_x), abs(index % width - target_y)
+            return scale * (max(dx, dy) + (math.sqrt(2) - 1) * min(dx, dy))
+
+        def edges(node: int) -> Iterable[Tuple[int, float]]:
+            if node == source:
+                yield from source_costs.items()
+            if node != target:
+                yield from self.intra[self.cluster_of(node)].get(node, {}).items()
+                yield from self.inter.get(node, {}).items()
+                if node in target_costs:
+                    yield target, target_costs[node]
+
+        # Same open set discipline as AStarStrategy: (f_score, -g_score, node) with lazy deletion
+        open_set = [(heuristic(source), 0, source)]
+        came_from: Dict[int, int] = {}
+        g_score = {source: 0}
+        closed = set()
+        while open_set:
+            _, _, current = heapq.heappop(open_set)
+            if current in closed:
+                continue  # Stale entry left behind by a later improvement
+            closed.add(current)
+            if current == target:
+                path = [target]
+                while path[-1] != source:
+                    path.append(came_from[path[-1]])
+                path.reverse()
+                return path
+            for neighbor, cost in edges(current):
+                if neighbor in closed or cost == math.inf:
+                    continue
+                tentative_g_score = g_score[current] + cost
+                if tentative_g_score < g_score.get(neighbor, math.inf):
+                    came_from[neighbor] = current
+                    g_score[neighbor] = tentative_g_score
+                    heapq.heappush(open_set, (tentative_g_score + heuristic(neighbor), -tentative_g_score, neighbor))
+        return None
+
+    def edge_count(self) -> int:
+        """Number of directed edges of the abstract graph."""
+        return sum(len(edges) for edges in self.inter.values()) + sum(
+            len(edges) for cluster in self.intra for edges in cluster.values()
+        )
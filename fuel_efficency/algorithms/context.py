@@ -1,30 +1,59 @@
+import itertools
+import time
+from array import array
 from dataclasses import dataclass, field
-from typing import List
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Tuple
 
+from fuel_efficency.algorithms.batch import route_groups
+from fuel_efficency.algorithms.cost_model import CostModel, DistanceCostModel
 from fuel_efficency.algorithms.dijkstra import DijkstraStrategy
 from fuel_efficency.algorithms.path_finding import PathfindingStrategy
+from fuel_efficency.algorithms.route_cache import RouteCache
+from fuel_efficency.algorithms.search_limits import SearchLimits
+from fuel_efficency.algorithms.search_stats import SearchStats
+from fuel_efficency.entities.lazy_grid import LazyGrid
 from fuel_efficency.entities.node import Node
+from fuel_efficency.entities.terrain_grid import Grid, TerrainGrid, as_terrain_grid
+from fuel_efficency.entities.tiled_grid import TiledGrid
 from fuel_efficency.entities.valley import Valley
 
+# Every grid assigned to any context gets a fresh version, so cache keys never collide
+_grid_versions = itertools.count()
+
+
+def check_limits(strategy: PathfindingStrategy, limits: Optional[SearchLimits]):
+    """Raise ValueError when limits are set for a strategy whose `find_path` does not take them."""
+    if limits is not None and 'limits' not in strategy.supported_options:
+        raise ValueError(f"{type(strategy).__name__} does not support search limits")
+
 
 @dataclass(slots=True)
 class Context:
     _strategy: PathfindingStrategy = field(default_factory=DijkstraStrategy)
-    _grid: List[List[Node]] = field(default_factory=lambda: [[Valley() for _ in range(3)] for _ in range(3)])
+    _grid: Grid = field(default_factory=lambda: TerrainGrid.filled(3, 3).lazy())
     _start: Node = field(default_factory=Valley)
     _end: Node = field(default_factory=Valley)
+    _cost_model: Optional[CostModel] = None
+    _cache: Optional[RouteCache] = None
+    _collect_stats: bool = False
+    _stats_callback: Optional[Callable[[SearchStats], None]] = None
+    _limits: Optional[SearchLimits] = None
+    _last_stats: Optional[SearchStats] = field(default=None, init=False, repr=False, compare=False)
+    _grid_version: int = field(default_factory=lambda: next(_grid_versions), init=False, repr=False, compare=False)
 
     @property
     def grid(self):
         return self._grid
 
     @grid.setter
-    def grid(self, new_grid: List[List[Node]]):
-        if not isinstance(new_grid, list):
-            raise TypeError("Grid must be a list")
-        if not all(isinstance(row, list) for row in new_grid):
+    def grid(self, new_grid: Grid):
+        if not isinstance(new_grid, (list, TerrainGrid, LazyGrid, TiledGrid)):
+            raise TypeError("Grid must be a list, a TerrainGrid, a LazyGrid or a TiledGrid")
+        if isinstance(new_grid, list) and not all(isinstance(row, list) for row in new_grid):
             raise TypeError("Grid must be a list of lists")
         self._grid = new_grid
+        # Cached routes of the previous grid can no longer be hit
+        self._grid_version = next(_grid_versions)
 
     @property
     def start(self):
@@ -50,9 +79,203 @@ class Context:
     def strategy(self, new_strategy: PathfindingStrategy):
         if not isinstance(new_strategy, PathfindingStrategy):
             raise TypeError("Strategy must be an instance of PathfindingStrategy")
+        check_limits(new_strategy, self._limits)
         self._strategy = new_strategy
 
+    @property
+    def cost_model(self):
+        return self._cost_model
+
+    @cost_model.setter
+    def cost_model(self, new_cost_model: Optional[CostModel]):
+        if new_cost_model is not None and not isinstance(new_cost_model, CostModel):
+            raise TypeError("Cost model must be an instance of CostModel")
+        self._cost_model = new_cost_model
+
+    @property
+    def cache(self):
+        return self._cache
+
+    @cache.setter
+    def cache(self, new_cache: Optional[RouteCache]):
+        if new_cache is not None and not isinstance(new_cache, RouteCache):
+            raise TypeError("Cache must be an instance of RouteCache")
+        self._cache = new_cache
+
+    @property
+    def collect_stats(self):
+        return self._collect_stats
+
+    @collect_stats.setter
+    def collect_stats(self, new_collect_stats: bool):
+        if not isinstance(new_collect_stats, bool):
+            raise TypeError("Collect stats must be a bool")
+        self._collect_stats = new_collect_stats
+
+    @property
+    def stats_callback(self):
+        return self._stats_callback
+
+    @stats_callback.setter
+    def stats_callback(self, new_stats_callback: Optional[Callable[[SearchStats], None]]):
+        if new_stats_callback is not None and not callable(new_stats_callback):
+            raise TypeError("Stats callback must be callable")
+        self._stats_callback = new_stats_callback
+
+    @property
+    def limits(self):
+        return self._limits
+
+    @limits.setter
+    def limits(self, new_limits: Optional[SearchLimits]):
+        if new_limits is not None and not isinstance(new_limits, SearchLimits):
+            raise TypeError("Limits must be an instance of SearchLimits")
+        check_limits(self._strategy, new_limits)
+        self._limits = new_limits
+
+    @property
+    def last_stats(self) -> Optional[SearchStats]:
+        """Stats of the last `run`, when `collect_stats` or `stats_callback` is set."""
+        return self._last_stats
+
+    def search_options(self) -> dict:
+        # Only options that were configured are forwarded, so strategies that
+        # take none keep working unchanged
+        options = {}
+        if self._cost_model is not None:
+            options['cost_model'] = self._cost_model
+        if self._limits is not None:
+            check_limits(self._strategy, self._limits)
+            options['limits'] = self._limits
+        return options
+
     def run(self):
         if not hasattr(self._strategy, 'find_path'):
             raise NotImplementedError("Strategy must implement the find_path method")
-        return self._strategy.find_path(self.grid, self.start, self.end)
+        options = self.search_options()
+        # Stats are only requested when someone reads them, and only strategies that
+        # accept `stats=` count their own work
+        stats = None
+        if self._collect_stats or self._stats_callback is not None:
+            stats = SearchStats()
+            if 'stats' in self._strategy.supported_options:
+                options['stats'] = stats
+
+        began = time.perf_counter()
+        if self.disconnected():
+            path = []
+        else:
+            path = self.cached_run(options, stats)
+
+        if stats is not None:
+            if 'stats' not in options:
+                # Other strategies only get the wall time of the call timed here
+                stats.total_seconds = time.perf_counter() - began
+            self._last_stats = stats
+            if self._stats_callback is not None:
+                self._stats_callback(stats)
+        return path
+
+    def disconnected(self) -> bool:
+        """
+        Whether the connectivity index of the grid proves that no path joins start and end.
+
+        Only grids whose index was already built are checked, as building it reads every cell.
+        """
+        if not isinstance(self._grid, (TerrainGrid, LazyGrid)):
+            return False
+        grid = as_terrain_grid(self._grid)
+        if not grid.has_connectivity:
+            return False
+        if not (grid.contains(self._start.position) and grid.contains(self._end.position)):
+            return False
+        return not grid.connectivity.connected(grid.index(self._start.position), grid.index(self._end.position))
+
+    def cached_run(self, options: dict, stats: Optional[SearchStats]):
+        if self._cache is None:
+            return self._strategy.find_path(self.grid, self.start, self.end, **options)
+
+        key = self.cache_key()
+        began = time.perf_counter()
+        route = self._cache.get(key)
+        if route is not None:
+            path = self.route_nodes(route)
+            if stats is not None:
+                stats.cache_hit = True
+                stats.total_seconds = time.perf_counter() - began
+            return path
+        path = self._strategy.find_path(self.grid, self.start, self.end, **options)
+        if isinstance(path, list):
+            width = self.grid_width()
+            self._cache.put(key, array('q', [node.position.x * width + node.position.y for node in path]))
+        return path
+
+    def cache_key(self) -> Hashable:
+        # Setting the grid bumps the context's grid version and editing its cells bumps the
+        # grid's own, so routes of either an earlier grid or earlier cells are never hit
+        return (
+            self._grid_version,
+            self.grid_state(),
+            self._strategy.cache_key(),
+            (self._start.position.x, self._start.position.y),
+            (self._end.position.x, self._end.position.y),
+            self._cost_model,
+            self._limits,  # Beam searches may find dearer routes
+        )
+
+    def grid_state(self) -> Hashable:
+        if isinstance(self._grid, TiledGrid):
+            return None  # Tiled grid files are read-only
+        if isinstance(self._grid, list):
+            # List cells can be replaced behind anyone's back, so their contents are compared
+            return as_terrain_grid(self._grid).fingerprint
+        return as_terrain_grid(self._grid).version
+
+    def grid_width(self) -> int:
+        if isinstance(self._grid, (TerrainGrid, TiledGrid)):
+            return self._grid.width
+        return len(self._grid[0]) if self._grid else 0
+
+    def route_nodes(self, route: array) -> List[Node]:
+        # Rebuild a cached route from its flat cell indices
+        if isinstance(self._grid, (TerrainGrid, TiledGrid)):
+            return [self._grid.node_at(index) for index in route]
+        width = self.grid_width()
+        return [self._grid[index // width][index % width] for index in route]
+
+    def run_batch(self, pairs: Sequence[Tuple[Node, Node]], workers: int = 1) -> List[List[Node]]:
+        """
+        Route many (start, end) pairs over the context grid.
+
+        Queries are grouped by start and each group is answered by one single-source
+        Dijkstra tree, using `DijkstraStrategy`'s 8-direction movement and the context
+        cost model whatever the context strategy is. Groups are spread across
+        `workers` processes.
+
+        Args:
+            pairs (Sequence[Tuple[Node, Node]]): The (start, end) queries.
+            workers (int): Number of worker processes, 1 routes in this process.
+
+        Returns:
+            List[List[Node]]: One path per query, in request order, formatted like
+                `DijkstraStrategy.find_path` (empty when unreachable).
+        """
+        terrain = as_terrain_grid(self.grid)
+        cost_model = self._cost_model or DistanceCostModel()
+        cost_table = cost_model.compile(terrain.palette_weights, DijkstraStrategy.step_lengths)
+
+        # Group the query numbers by start cell, queries off the grid get no path
+        groups: Dict[int, List[Tuple[int, int]]] = {}
+        for number, (start, end) in enumerate(pairs):
+            endpoints = DijkstraStrategy.endpoint_indices(terrain, start, end)
+            if endpoints is not None:
+                groups.setdefault(endpoints[0], []).append((number, endpoints[1]))
+
+        paths: List[List[Node]] = [[] for _ in pairs]
+        route_group_list = [(source, [target for _, target in queries]) for source, queries in groups.items()]
+        answers = route_groups(terrain, cost_table, route_group_list, workers)
+        for queries, group_answers in zip(groups.values(), answers):
+            for (number, _), path in zip(queries, group_answers):
+                if path is not None:
+                    paths[number] = DijkstraStrategy.path_nodes(self.grid, terrain, path)
+        return paths
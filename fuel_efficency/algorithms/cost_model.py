@@ -0,0 +1,101 @@
+import math
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import List, Sequence
+
+# cost_table[source_code][direction][target_code] -> cost of the step
+CostTable = List[List[List[float]]]
+
+
+class CostModel(ABC):
+    """
+    Prices a single step between two neighbouring cells.
+
+    Costs must be non-negative and scale linearly with the step length, which is
+    what makes `unit_lower_bound` a valid per-unit-distance bound for A*.
+    Cells with an infinite weight are impassable.
+    """
+
+    @abstractmethod
+    def edge_cost(self, source_weight: float, target_weight: float, length: float) -> float:
+        """
+        Cost of moving `length` units from a cell of `source_weight` into a cell of `target_weight`.
+        """
+        pass # pragma: no cover
+
+    def compile(self, palette_weights: Sequence[float], step_lengths: Sequence[float]) -> CostTable:
+        """
+        Precompute the cost of every edge type of a grid.
+
+        Args:
+            palette_weights (Sequence[float]): The weight of every terrain code.
+            step_lengths (Sequence[float]): The length of every movement direction.
+
+        Returns:
+            CostTable: `table[source_code][direction][target_code]`, infinite for impassable cells.
+        """
+        weights = [float(weight) for weight in palette_weights]
+        return [
+            [[self._checked_cost(source, target, float(length)) for target in weights] for length in step_lengths]
+            for source in weights
+        ]
+
+    def unit_lower_bound(self, palette_weights: Sequence[float]) -> float:
+        """
+        Smallest cost per unit of distance over every passable edge type.
+
+        Args:
+            palette_weights (Sequence[float]): The weight of every terrain code.
+
+        Returns:
+            float: The factor to scale a geometric heuristic by so it stays admissible.
+        """
+        weights = [float(weight) for weight in palette_weights]
+        costs = [self._checked_cost(source, target, 1.0) for source in weights for target in weights]
+        return min((cost for cost in costs if math.isfinite(cost)), default=0.0)
+
+    def _checked_cost(self, source_weight: float, target_weight: float, length: float) -> float:
+        if not (math.isfinite(source_weight) and math.isfinite(target_weight)):
+            return math.inf
+        cost = self.edge_cost(source_weight, target_weight, length)
+        if cost < 0:
+            raise ValueError(f"{type(self).__name__} produced a negative edge cost")
+        return cost
+
+
+@dataclass(frozen=True, slots=True)
+class DistanceCostModel(CostModel):
+    """Geometry only: a step costs its length whatever the terrain. The strategies' default."""
+
+    def edge_cost(self, source_weight: float, target_weight: float, length: float) -> float:
+        return length
+
+
+@dataclass(frozen=True, slots=True)
+class WeightedCostModel(CostModel):
+    """A step costs its length scaled by the weight of the cell being entered."""
+
+    def edge_cost(self, source_weight: float, target_weight: float, length: float) -> float:
+        return length * target_weight
+
+
+@dataclass(frozen=True, slots=True)
+class SlopeCostModel(CostModel):
+    """
+    Asymmetric uphill/downhill cost.
+
+    Entering a heavier cell adds `climb_factor` per unit of weight gained, entering
+    a lighter one refunds `descent_factor` per unit of weight lost. The cost never
+    drops below zero.
+
+    Args:
+        climb_factor (float): Extra cost per unit of weight climbed.
+        descent_factor (float): Refund per unit of weight descended.
+    """
+    climb_factor: float = float(1)
+    descent_factor: float = float(0.5)
+
+    def edge_cost(self, source_weight: float, target_weight: float, length: float) -> float:
+        slope = target_weight - source_weight
+        factor = self.climb_factor if slope > 0 else self.descent_factor
+        return length * max(0.0, target_weight + factor * slope)
@@ -0,0 +1,249 @@
+import heapq
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fuel_efficency.algorithms.cost_model import CostModel, CostTable, DistanceCostModel
+from fuel_efficency.algorithms.dijkstra import DijkstraStrategy
+from fuel_efficency.algorithms.path_finding import PathfindingStrategy
+from fuel_efficency.entities.node import Node
+from fuel_efficency.entities.position import Position
+from fuel_efficency.entities.terrain_grid import Grid, TerrainGrid, as_terrain_grid
+
+Key = Tuple[float, float]
+
+
+class DStarLiteStrategy(PathfindingStrategy):
+    """
+    Incremental replanning with D* Lite over the 8-direction movement model of `DijkstraStrategy`.
+
+    The search runs backwards from `end` and keeps its state between calls. When
+    cells change through `update_cells`, only the part of the search tree that
+    depends on them is repaired. When the start moves as the vehicle advances, the
+    queue keys are corrected by the distance moved (`km`) instead of being rebuilt.
+    Paths cost the same as `DijkstraStrategy`'s.
+
+    The state is reused while `find_path` is called with the same grid object, end
+    cell and cost model. Any other call starts a fresh search.
+    """
+
+    # The direction that undoes each of DijkstraStrategy's cardinal directions
+    opposite_directions = [
+        DijkstraStrategy.cardinal_directions.index(Position(-direction.x, -direction.y))
+        for direction in DijkstraStrategy.cardinal_directions
+    ]
+
+    def __init__(self):
+        self.grid: Optional[Grid] = None
+        self.terrain: Optional[TerrainGrid] = None
+        self.cost_model: Optional[CostModel] = None
+        self.cost_table: CostTable = []
+        self.scale = 0.0
+        self.goal = -1
+        self.last_start = -1
+        self.km = 0.0  # Sum of the heuristic distances the start has moved
+        self.g: Dict[int, float] = {}
+        self.rhs: Dict[int, float] = {}
+        self.open_set: List[Tuple[float, float, int]] = []
+        self.open_keys: Dict[int, Key] = {}  # Current key of every cell in the open set
+        self.expansions = 0  # Cells expanded by the last call to `find_path`
+
+    def find_path(self, grid: Grid, start: Node, end: Node, *, cost_model: Optional[CostModel] = None) -> List[Node]:
+        cost_model = cost_model or DistanceCostModel()
+        if grid is not self.grid or cost_model != self.cost_model:
+            self.grid, self.terrain, self.cost_model = grid, as_terrain_grid(grid), cost_model
+            self.compile()
+            self.goal = -1
+        terrain = self.terrain
+        endpoints = self.endpoint_indices(terrain, start, end)
+        if endpoints is None:
+            return []
+        source, target = endpoints
+        if target != self.goal:
+            self.reset(source, target)
+        elif source != self.last_start:
+            # Every key already queued is too high by the distance the start moved, which
+            # lower-bounds how much the heuristic can have dropped
+            self.km += self.heuristic(self.last_start, source)
+            self.last_start = source
+
+        self.expansions = 0
+        self.compute_shortest_path()
+        path = self.extract_path(source)
+        if path is None:
+            # Return an empty list if no path is found
+            return []
+        return self.path_nodes(grid, terrain, path)
+
+    def update_cells(self, changes: Iterable[Node]) -> List[int]:
+        """
+        Change cells of the grid being searched and repair the search state around them.
+
+        The new nodes also replace the old ones in list-of-lists grids, so the caller's
+        grid and the search state stay in step.
+
+        Args:
+            changes (Iterable[Node]): The new node of every changed cell, placed by its position.
+
+        Returns:
+            List[int]: The flat indices of the cells whose terrain actually changed.
+        """
+        if self.terrain is None:
+            raise ValueError("Call find_path before updating cells")
+        terrain = self.terrain
+        changes = list(changes)
+        palette_size = len(terrain.palette)
+        codes = {node.position: terrain.code_of(node) for node in changes}
+        changed = terrain.set_cells(codes)
+        if not isinstance(self.grid, TerrainGrid):
+            for node in changes:
+                self.grid[node.position.x][node.position.y] = node
+
+        if len(terrain.palette) != palette_size:
+            scale = self.scale
+            self.compile()
+            if self.scale < scale:
+                # The queued keys rest on the old heuristic, which may now overestimate
+                self.goal = -1
+        if self.goal < 0:
+            return changed
+
+        # Every edge into or out of a changed cell changed cost, so the cells on those
+        # edges get their one-step lookahead recomputed
+        affected = set(changed)
+        for index in changed:
+            affected.update(neighbor for neighbor, _ in terrain.neighbors(index, DijkstraStrategy.cardinal_directions))
+        for index in affected:
+            if index != self.goal:
+                self.rhs[index] = self.lookahead(index)
+            self.update_vertex(index)
+        return changed
+
+    def compile(self):
+        # The heuristic must stay admissible whatever the cells change into, so it is
+        # scaled by every weight of the palette, not only by the ones in use
+        palette_weights = self.terrain.palette_weights
+        self.cost_table = self.cost_model.compile(palette_weights, DijkstraStrategy.step_lengths)
+        self.scale = self.cost_model.unit_lower_bound(palette_weights)
+
+    def reset(self, source: int, target: int):
+        self.goal, self.last_start, self.km = target, source, 0.0
+        self.g, self.rhs = {}, {target: 0}
+        self.open_set, self.open_keys = [], {}
+        self.update_vertex(target)
+
+    def heuristic(self, index: int, other: int) -> float:
+        # Octile distance, the geometric lower bound of 8-direction movement
+        width = self.terrain.width
+        dx, dy = abs(index // width - other // width), abs(index % width - other % width)
+        return self.scale * (max(dx, dy) + (math.sqrt(2) - 1) * min(dx, dy))
+
+    def calculate_key(self, index: int) -> Key:
+        best = min(self.g.get(index, math.inf), self.rhs.get(index, math.inf))
+        return best + self.heuristic(self.last_start, index) + self.km, best
+
+    def edge_cost(self, source: int, target: int, direction: int) -> float:
+        codes = self.terrain.flat_codes
+        return self.cost_table[codes[source]][direction][codes[target]]
+
+    def lookahead(self, index: int) -> float:
+        # Cheapest cost to the goal through one step out of `index`
+        g = self.g
+        return min(
+            (self.edge_cost(index, neighbor, direction) + g.get(neighbor, math.inf)
+             for neighbor, direction in self.terrain.neighbors(index, DijkstraStrategy.cardinal_directions)),
+            default=math.inf,
+        )
+
+    def update_vertex(self, index: int):
+        # Queue inconsistent cells (g != rhs), drop consistent ones
+        if self.g.get(index, math.inf) != self.rhs.get(index, math.inf):
+            key = self.calculate_key(index)
+            if self.open_keys.get(index) != key:
+                self.open_keys[index] = key
+                heapq.heappush(self.open_set, (key[0], key[1], index))
+        else:
+            self.open_keys.pop(index, None)
+
+    def top_key(self) -> Key:
+        # Entries are never removed from the heap, superseded ones are skipped here
+        open_set, open_keys = self.open_set, self.open_keys
+        while open_set:
+            k1, k2, index = open_set[0]
+            if open_keys.get(index) == (k1, k2):
+                return k1, k2
+            heapq.heappop(open_set)
+        return math.inf, math.inf
+
+    def compute_shortest_path(self):
+        g, rhs = self.g, self.rhs
+        terrain, directions, opposite = self.terrain, DijkstraStrategy.cardinal_directions, self.opposite_directions
+        start = self.last_start
+        while True:
+            top_key = self.top_key()
+            if top_key == (math.inf, math.inf):
+                break
+            # Ties with the start are expanded too: a zero-cost step out of the start leaves
+            # its successor with the same key
+            if top_key > self.calculate_key(start) and rhs.get(start, math.inf) == g.get(start, math.inf):
+                break
+            _, _, current = self.open_set[0]
+            new_key = self.calculate_key(current)
+            if top_key < new_key:
+                # Queued before the start moved, requeue with the up to date key
+                self.open_keys[current] = new_key
+                heapq.heapreplace(self.open_set, (new_key[0], new_key[1], current))
+                continue
+            heapq.heappop(self.open_set)
+            del self.open_keys[current]
+            self.expansions += 1
+
+            # The search runs backwards, so it relaxes the edges that lead into `current`
+            predecessors = terrain.neighbors(current, directions)
+            old_g = g.get(current, math.inf)
+            if old_g > rhs[current]:
+                # Overconsistent: the cost to the goal dropped and is now final
+                g[current] = rhs[current]
+                for neighbor, direction in predecessors:
+                    cost = self.edge_cost(neighbor, current, opposite[direction]) + g[current]
+                    if neighbor != self.goal and cost < rhs.get(neighbor, math.inf):
+                        rhs[neighbor] = cost
+                        self.update_vertex(neighbor)
+            else:
+                # Underconsistent: the cost to the goal rose, so everything that went through it is redone
+                g[current] = math.inf
+                for neighbor, direction in predecessors + [(current, None)]:
+                    if neighbor == self.goal:
+                        continue
+                    through = old_g if direction is None else self.edge_cost(neighbor, current, opposite[direction]) + old_g
+                    if rhs.get(neighbor, math.inf) == through:
+                        rhs[neighbor] = self.lookahead(neighbor)
+                    self.update_vertex(neighbor)
+
+    def extract_path(self, source: int) -> Optional[List[int]]:
+        g = self.g
+        if g.get(source, math.inf) == math.inf and source != self.goal:
+            return None
+        path = []
+        visited = {source}
+        current = source
+        # Walk down the cost-to-goal values, one cheapest step at a time
+        while current != self.goal:
+            best, best_cost = None, math.inf
+            for neighbor, direction in self.terrain.neighbors(current, DijkstraStrategy.cardinal_directions):
+                cost = self.edge_cost(current, neighbor, direction) + g.get(neighbor, math.inf)
+                if neighbor not in visited and cost < best_cost:
+                    best, best_cost = neighbor, cost
+            if best is None:
+                return None
+            path.append(best)
+            visited.add(best)
+            current = best
+        return path
+
+    @staticmethod
+    def get_neighbors(grid: List[List[Node]], node: Node) -> List[Node]:
+        return DijkstraStrategy.get_neighbors(grid, node)
+
+    @staticmethod
+    def calculate_distance(node1: Node, node2: Node) -> float:
+        return DijkstraStrategy.calculate_distance(node1, node2)
@@ -1,46 +1,391 @@
 import heapq
 import math
-from typing import List, Dict
+import time
+from array import array
+from typing import Callable, Collection, List, Dict, Optional, Set, Tuple, Union
 
+import numpy as np
+
+from fuel_efficency.algorithms.cost_model import CostModel, CostTable, DistanceCostModel
 from fuel_efficency.algorithms.path_finding import PathfindingStrategy
+from fuel_efficency.algorithms.path_result import PathResult
+from fuel_efficency.algorithms.search_limits import Cutoff, LimitReached, SearchLimits, cut_off, trim_open_set
+from fuel_efficency.algorithms.search_stats import SearchStats
+from fuel_efficency.algorithms.shortest_path_tree import ShortestPathTree
+from fuel_efficency.algorithms.workspace import SearchWorkspace
 from fuel_efficency.entities.node import Node
 from fuel_efficency.entities.position import Position
+from fuel_efficency.entities.terrain_grid import Grid, TerrainGrid, as_terrain_grid
+from fuel_efficency.entities.tiled_grid import TiledGrid
 
 class DijkstraStrategy(PathfindingStrategy):
 
     # Define the cardinal directions as positions for neighbor nodes
     cardinal_directions = [Position(-1, -1), Position(-1, 0), Position(-1, 1), Position(0, -1), Position(0, 1), Position(1, -1), Position(1, 0), Position(1, 1)]
+    # Euclidean length of a step in each cardinal direction
+    step_lengths = [math.sqrt(direction.x ** 2 + direction.y ** 2) for direction in cardinal_directions]
+    # Rows of edge costs computed per batch by the vectorized expansion
+    vectorized_band_rows = 64
+    supported_options = frozenset({'cost_model', 'vectorized', 'bucketed', 'stats', 'workspace', 'limits', 'compact'})
+
+    @staticmethod
+    def find_path(grid: Grid, start: Node, end: Node, *, cost_model: Optional[CostModel] = None, vectorized: bool = False, bucketed: bool = False, stats: Optional[SearchStats] = None, workspace: Optional[SearchWorkspace] = None, limits: Optional[SearchLimits] = None, compact: bool = False) -> Union[List[Node], LimitReached, PathResult]:
+        """
+        Find the cheapest 8-connected path from `start` to `end`.
+
+        Args:
+            grid (Grid): A list-of-lists grid, a `TerrainGrid` or a `TiledGrid`. List grids are
+                converted on every call, see `as_terrain_grid`.
+            start (Node): The start node, not included in the path.
+            end (Node): The end node.
+            cost_model (Optional[CostModel]): How steps are priced, geometric distance by default.
+            vectorized (bool): Expand the 8 neighbours of a cell with NumPy in one batch.
+                Returns exactly the same path as the scalar expansion.
+            bucketed (bool): Keep the open set in a bucket queue instead of a binary heap. The
+                path costs the same, but may take another route among equally cheap ones.
+                Needs a cost model whose steps all cost more than zero.
+            stats (Optional[SearchStats]): Filled in with the counters and timings of the search.
+            workspace (Optional[SearchWorkspace]): The arrays the scalar expansion keeps its state
+                in, the calling thread's default workspace when not given.
+            limits (Optional[SearchLimits]): Bounds on the work of the scalar expansion.
+            compact (bool): Return a found path as a `PathResult` of cell indices instead of a list of nodes.
+
+        Returns:
+            Union[List[Node], LimitReached, PathResult]: The path, an empty list if there is none,
+                or what was explored when a limit stopped the search first.
+        """
+        if limits is not None and (vectorized or bucketed):
+            raise ValueError("Search limits are only supported by the scalar expansion")
+        if vectorized and isinstance(grid, TiledGrid):
+            raise ValueError("The vectorized expansion needs every code in memory, search tiled grids without it")
+        began = time.perf_counter()
+        # Search on flat cell indices, nodes are only built for the returned path
+        terrain = as_terrain_grid(grid)
+        endpoints = DijkstraStrategy.endpoint_indices(terrain, start, end)
+        path = None
+        if endpoints is not None:
+            source, target = endpoints
+            # Edge costs are looked up per (source terrain, direction, target terrain)
+            cost_model = cost_model or DistanceCostModel()
+            cost_table = cost_model.compile(terrain.palette_weights, DijkstraStrategy.step_lengths)
+            if vectorized:
+                path = DijkstraStrategy.vectorized_search(terrain, source, target, cost_table, stats)
+            elif bucketed:
+                path = DijkstraStrategy.bucket_search(terrain, source, target, cost_table, stats, workspace)
+            else:
+                path = DijkstraStrategy.scalar_search(terrain, source, target, cost_table, stats, workspace, limits)
+        # Return an empty list if no path is found
+        if path is None:
+            nodes = []
+        elif isinstance(path, Cutoff):
+            nodes = LimitReached.from_cutoff(path, grid, terrain)
+        elif compact:
+            nodes = PathResult.from_route(grid, terrain, source, path, cost_table, DijkstraStrategy.cardinal_directions)
+        else:
+            nodes = DijkstraStrategy.path_nodes(grid, terrain, path)
+        if stats is not None:
+            stats.total_seconds += time.perf_counter() - began
+        return nodes
 
     @staticmethod
-    def find_path(grid: List[List[Node]], start: Node, end: Node) -> List[Node]:
-        # Initialize the open set (priority queue) with the start node
+    def scalar_search(terrain: TerrainGrid, source: int, target: int, cost_table: CostTable, stats: Optional[SearchStats] = None, workspace: Optional[SearchWorkspace] = None, limits: Optional[SearchLimits] = None) -> Union[List[int], None, Cutoff]:
+        codes = terrain.flat_codes
+        path = None
+        pops_before = 0 if stats is None else stats.heap_pops
+
+        # Costs and predecessors live in the flat arrays of a reused workspace, and every
+        # written cell is recorded so the next search only clears those
+        workspace = (workspace or SearchWorkspace.default(terrain)).prepare(terrain.size)
+        cost_so_far, came_from, touched = workspace.cost, workspace.came_from, workspace.touched
+        cost_so_far[source] = 0
+        touched.append(source)
+
+        # Initialize the open set (priority queue) with the start cell
         open_set = []
-        heapq.heappush(open_set, (0, start))
-        came_from: Dict[Node, Node] = {}
-        cost_so_far = {start: 0}
+        heapq.heappush(open_set, (0, source))
+
+        # Cells reached but left unexpanded by the cost or beam limits, why, and the cells expanded
+        max_cost = math.inf if limits is None or limits.max_cost is None else limits.max_cost
+        cut: Set[int] = set()
+        cut_reason = None
+        expansions = 0
+        dropped_entries = 0  # Pushed, but neither popped nor left queued
 
         while open_set:
-            # Pop the node with the lowest cost from the open set
+            # Pop the cell with the lowest cost from the open set
             current_priority, current = heapq.heappop(open_set)
+            if current_priority > cost_so_far[current]:
+                if stats is not None:
+                    stats.record_stale_pop(len(open_set))
+                continue  # Stale entry left behind by a later improvement
+            if stats is not None:
+                stats.record_expansion(len(open_set), current, current_priority)
+
+            # If the current cell is the end cell, reconstruct the path
+            if current == target:
+                path = DijkstraStrategy.timed_reconstruct_indices(came_from, source, target, stats)
+                break
 
-            # If the current node is the end node, reconstruct the path
-            if current == end:
-                return DijkstraStrategy.reconstruct_path(came_from, start, end)
+            if limits is not None:
+                reason = limits.exceeded(expansions, len(open_set))
+                if reason is not None:
+                    frontier = [current] + [index for priority, index in open_set if priority == cost_so_far[index]]
+                    path = DijkstraStrategy.cut_off(terrain, reason, frontier, source, target, workspace)
+                    break
+                if limits.beam_width is not None and len(open_set) > 2 * limits.beam_width:
+                    # Cheapest first would keep the cells nearest the start, so the beam keeps
+                    # the ones closest to the end
+                    closeness = DijkstraStrategy.closeness(terrain, target)
+                    dropped = trim_open_set(open_set, limits.beam_width, lambda entry: (closeness(entry[1]), entry[0]))
+                    cut.update(index for priority, index in dropped if priority == cost_so_far[index])
+                    cut_reason = 'beam_width'
+                    dropped_entries += len(dropped)
+                expansions += 1
 
-            # Get the neighbors of the current node and iterate through them
-            for neighbor in DijkstraStrategy.get_neighbors(grid, current):
-                # Calculate the new cost to reach the neighbor
-                new_cost = cost_so_far[current] + DijkstraStrategy.calculate_distance(current, neighbor)
-                # If the neighbor is not in the cost_so_far or the new cost is lower, update it
-                if neighbor not in cost_so_far or new_cost < cost_so_far[neighbor]:
+            # Get the neighbors of the current cell and iterate through them
+            edge_costs = cost_table[codes[current]]
+            if stats is None:
+                neighbors = terrain.neighbors(current, DijkstraStrategy.cardinal_directions)
+            else:
+                neighbors_began = time.perf_counter()
+                neighbors = terrain.neighbors(current, DijkstraStrategy.cardinal_directions)
+                stats.get_neighbors_seconds += time.perf_counter() - neighbors_began
+            for neighbor, direction in neighbors:
+                # Calculate the new cost to reach the neighbor, impassable cells cost infinity
+                new_cost = cost_so_far[current] + edge_costs[direction][codes[neighbor]]
+                if new_cost == math.inf:
+                    continue
+                # If the neighbor was not reached yet or the new cost is lower, update it
+                if new_cost < cost_so_far[neighbor]:
+                    if new_cost > max_cost:
+                        # The search stops at the last cell within the budget
+                        cut.add(current)
+                        cut_reason = cut_reason or 'max_cost'
+                        continue
                     cost_so_far[neighbor] = new_cost
                     priority = new_cost
                     # Push the neighbor into the open set with the updated priority
                     heapq.heappush(open_set, (priority, neighbor))
                     came_from[neighbor] = current
+                    touched.append(neighbor)
 
-        # Return an empty list if no path is found
-        return []
+        if path is None and cut:
+            # The open set ran out, but only because limits left cells unexpanded
+            path = DijkstraStrategy.cut_off(terrain, cut_reason, cut, source, target, workspace)
+        if stats is not None:
+            stats.record_end(pops_before, len(open_set), dropped_entries)
+        return path
+
+    @staticmethod
+    def cut_off(terrain: TerrainGrid, reason: str, frontier: Collection[int], source: int, target: int, workspace: SearchWorkspace) -> Cutoff:
+        # The frontier is ranked by straight-line distance to the end
+        closeness = DijkstraStrategy.closeness(terrain, target)
+        return cut_off(reason, frontier, source, workspace.came_from, workspace.cost, closeness)
+
+    @staticmethod
+    def closeness(terrain: TerrainGrid, target: int) -> Callable[[int], float]:
+        # Straight-line distance from a flat cell index to the target cell
+        width = terrain.width
+        target_x, target_y = divmod(target, width)
+
+        def distance(index: int) -> float:
+            x, y = divmod(index, width)
+            return math.hypot(x - target_x, y - target_y)
+
+        return distance
+
+    @staticmethod
+    def bucket_width(cost_table: CostTable) -> Tuple[float, float]:
+        """
+        Size the buckets of `bucket_search` for a compiled cost model.
+
+        Returns:
+            Tuple[float, float]: The bucket width, a hair under the cheapest step so rounding
+                never lands a step in the bucket it leaves, and the dearest finite step.
+        """
+        costs = np.asarray(cost_table, dtype=np.float64)
+        finite = costs[np.isfinite(costs)]
+        if finite.size == 0:
+            return float(1), float(0)
+        if finite.min() <= 0:
+            raise ValueError("The bucket queue needs every step to cost more than zero")
+        return float(finite.min()) * (1 - 1e-9), float(finite.max())
+
+    @staticmethod
+    def bucket_search(terrain: TerrainGrid, source: int, target: int, cost_table: CostTable, stats: Optional[SearchStats] = None, workspace: Optional[SearchWorkspace] = None) -> Optional[List[int]]:
+        """
+        The scalar expansion over Dial's circular bucket queue instead of a binary heap.
+
+        Bucket `k` holds the entries costing between `k * width` and `(k + 1) * width`.
+        As every step costs at least `width`, expanding a cell never adds to its own
+        bucket, so the cells of the lowest bucket are final and can be taken in any
+        order: pushes and pops are list appends and pops, with no comparisons at all.
+        Live entries never span more than the dearest step, so a ring of buckets that
+        long is reused as the costs grow.
+        """
+        codes = terrain.flat_codes
+        path = None
+        pops_before = 0 if stats is None else stats.heap_pops
+        width, longest = DijkstraStrategy.bucket_width(cost_table)
+
+        workspace = (workspace or SearchWorkspace.default(terrain)).prepare(terrain.size)
+        cost_so_far, came_from, touched = workspace.cost, workspace.came_from, workspace.touched
+        cost_so_far[source] = 0
+        touched.append(source)
+
+        buckets: List[List[Tuple[float, int]]] = [[] for _ in range(int(longest / width) + 2)]
+        ring = len(buckets)
+        buckets[0].append((0, source))
+        queued = 1  # Entries in all buckets
+        lowest = 0  # Number of the lowest bucket that may hold entries
+
+        while queued:
+            # Move on to the next bucket holding entries
+            bucket = buckets[lowest % ring]
+            while not bucket:
+                lowest += 1
+                bucket = buckets[lowest % ring]
+            current_priority, current = bucket.pop()
+            queued -= 1
+            if current_priority > cost_so_far[current]:
+                if stats is not None:
+                    stats.record_stale_pop(queued)
+                continue  # Stale entry left behind by a later improvement
+            if stats is not None:
+                stats.record_expansion(queued, current, current_priority)
+
+            if current == target:
+                path = DijkstraStrategy.timed_reconstruct_indices(came_from, source, target, stats)
+                break
+
+            edge_costs = cost_table[codes[current]]
+            if stats is None:
+                neighbors = terrain.neighbors(current, DijkstraStrategy.cardinal_directions)
+            else:
+                neighbors_began = time.perf_counter()
+                neighbors = terrain.neighbors(current, DijkstraStrategy.cardinal_directions)
+                stats.get_neighbors_seconds += time.perf_counter() - neighbors_began
+            for neighbor, direction in neighbors:
+                new_cost = current_priority + edge_costs[direction][codes[neighbor]]
+                if new_cost == math.inf:
+                    continue
+                if new_cost < cost_so_far[neighbor]:
+                    cost_so_far[neighbor] = new_cost
+                    buckets[int(new_cost / width) % ring].append((new_cost, neighbor))
+                    queued += 1
+                    came_from[neighbor] = current
+                    touched.append(neighbor)
+
+        if stats is not None:
+            stats.record_end(pops_before, queued)
+        return path
+
+    @staticmethod
+    def vectorized_search(terrain: TerrainGrid, source: int, target: int, cost_table: CostTable, stats: Optional[SearchStats] = None) -> Optional[List[int]]:
+        cost_so_far, came_from = DijkstraStrategy.settle(terrain, source, cost_table, (target,), stats=stats)
+        if cost_so_far[target] == math.inf:
+            return None
+        return DijkstraStrategy.timed_reconstruct_indices(came_from, source, target, stats)
+
+    @staticmethod
+    def settle(terrain: TerrainGrid, source: int, cost_table: CostTable, targets: Collection[int] = (), budget: float = math.inf, stats: Optional[SearchStats] = None) -> Tuple[array, array]:
+        """
+        Grow the shortest path tree of `source` with the vectorized expansion.
+
+        Args:
+            terrain (TerrainGrid): The grid to search.
+            source (int): The flat index of the root cell.
+            cost_table (CostTable): The compiled cost model.
+            targets (Collection[int]): Stop once all of these cells are settled. The whole
+                reachable grid is settled when empty.
+            budget (float): Stop before settling any cell that costs more than this.
+            stats (Optional[SearchStats]): Filled in with the counters and timings of the search.
+
+        Returns:
+            Tuple[array, array]: The cost to reach every cell (infinite if not reached) and
+                its predecessor in the tree (-1 for the root and unreached cells), by flat index.
+                Cells left in the open set when a budget or the targets stop the search keep
+                their tentative cost.
+        """
+        height, width = terrain.shape
+        directions = DijkstraStrategy.cardinal_directions
+        offsets = [direction.x * width + direction.y for direction in directions]
+        # Edge costs of all 8 directions are computed with NumPy a band of rows at a time,
+        # the first time the search reaches the band
+        band_rows = DijkstraStrategy.vectorized_band_rows
+        band_cells = band_rows * width
+        bands: List[Optional[np.ndarray]] = [None] * -(-height // band_rows)
+        pending = set(targets)
+
+        # Distances and predecessors live in flat arrays indexed by cell
+        cost_so_far = array('d', [math.inf]) * terrain.size
+        came_from = array('q', [-1]) * terrain.size
+        cost_so_far[source] = 0
+        open_set = [(0, source)]
+        pops_before = 0 if stats is None else stats.heap_pops
+
+        while open_set:
+            current_priority, current = heapq.heappop(open_set)
+            if current_priority > cost_so_far[current]:
+                if stats is not None:
+                    stats.record_stale_pop(len(open_set))
+                continue  # Stale entry left behind by a later improvement
+            if current_priority > budget:
+                if stats is not None:
+                    stats.heap_pops += 1  # Popped but left unsettled
+                break
+            if stats is not None:
+                stats.record_expansion(len(open_set), current, current_priority)
+            if current in pending:
+                pending.remove(current)
+                if not pending:
+                    break
+
+            band, cell = divmod(current, band_cells)
+            edge_costs = bands[band]
+            if edge_costs is None:
+                bands_began = time.perf_counter()
+                start_row = band * band_rows
+                edge_costs = bands[band] = terrain.edge_costs(cost_table, directions, start_row, min(start_row + band_rows, height))
+                if stats is not None:
+                    stats.get_neighbors_seconds += time.perf_counter() - bands_began
+            for offset, edge_cost in zip(offsets, edge_costs[cell].tolist()):
+                # Steps off the grid or into impassable cells cost infinity
+                if edge_cost == math.inf:
+                    continue
+                new_cost = current_priority + edge_cost
+                neighbor = current + offset
+                if new_cost < cost_so_far[neighbor]:
+                    cost_so_far[neighbor] = new_cost
+                    came_from[neighbor] = current
+                    heapq.heappush(open_set, (new_cost, neighbor))
+
+        if stats is not None:
+            stats.record_end(pops_before, len(open_set))
+        return cost_so_far, came_from
+
+    @staticmethod
+    def shortest_path_tree(grid: Grid, start: Node, *, cost_model: Optional[CostModel] = None, budget: float = math.inf) -> ShortestPathTree:
+        """
+        Grow the full shortest path tree of `start`, optionally only up to a cost budget.
+
+        Args:
+            grid (Grid): A list-of-lists grid or a `TerrainGrid`.
+            start (Node): The root of the tree.
+            cost_model (Optional[CostModel]): How steps are priced, geometric distance by default.
+            budget (float): Leave out every cell that costs more than this to reach.
+
+        Returns:
+            ShortestPathTree: The distance field and predecessor array of the tree.
+        """
+        terrain = as_terrain_grid(grid)
+        if not terrain.contains(start.position):
+            raise ValueError("Start must lie inside the grid")
+        source = terrain.index(start.position)
+        cost_model = cost_model or DistanceCostModel()
+        cost_table = cost_model.compile(terrain.palette_weights, DijkstraStrategy.step_lengths)
+        cost_so_far, came_from = DijkstraStrategy.settle(terrain, source, cost_table, budget=budget)
+        return ShortestPathTree.from_search(grid, terrain, source, cost_so_far, came_from, budget)
 
     @staticmethod
     def get_neighbors(grid: List[List[Node]], node: Node) -> List[Node]:
@@ -60,6 +405,15 @@ class DijkstraStrategy(PathfindingStrategy):
         # Calculate the Euclidean distance between two nodes
         return math.sqrt((node1.position.x - node2.position.x) ** 2 + (node1.position.y - node2.position.y) ** 2)
 
+    @staticmethod
+    def timed_reconstruct_indices(came_from: Dict[int, int], start: int, end: int, stats: Optional[SearchStats]) -> List[int]:
+        if stats is None:
+            return DijkstraStrategy.reconstruct_indices(came_from, start, end)
+        began = time.perf_counter()
+        path = DijkstraStrategy.reconstruct_indices(came_from, start, end)
+        stats.reconstruct_path_seconds += time.perf_counter() - began
+        return path
+
     @staticmethod
     def reconstruct_path(came_from: Dict[Node, Node], start: Node, end: Node) -> List[Node]:
         current = end
@@ -71,3 +425,16 @@ class DijkstraStrategy(PathfindingStrategy):
         # Reverse the path to get the correct order from start to end
         path.reverse()
         return path
+
+    @staticmethod
+    def reconstruct_indices(came_from: Dict[int, int], start: int, end: int) -> List[int]:
+        # `reconstruct_path` over flat cell indices, as the search records them
+        current = end
+        path = []
+        # Backtrack from the end cell to the start cell to reconstruct the path
+        while current != start:
+            path.append(current)
+            current = came_from[current]
+        # Reverse the path to get the correct order from start to end
+        path.reverse()
+        return path
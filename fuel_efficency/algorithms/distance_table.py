@@ -0,0 +1,150 @@
+import math
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from fuel_efficency.algorithms.cost_model import CostModel, CostTable, DistanceCostModel
+from fuel_efficency.algorithms.dijkstra import DijkstraStrategy
+from fuel_efficency.entities.node import Node
+from fuel_efficency.entities.terrain_grid import Grid, TerrainGrid, TerrainType, as_terrain_grid
+
+# The costs from one depot to every depot, and the paths when they are kept
+TableRow = Tuple[List[float], Optional[List[Optional[array]]]]
+
+# Grid, cost table and depots of a pool worker, set once by `_init_worker` and only read afterwards
+_worker_state: Dict[str, object] = {}
+
+
+@dataclass(slots=True)
+class DistanceTable:
+    """
+    Cheapest path costs between every pair of depots, with `DijkstraStrategy`'s movement.
+
+    Args:
+        grid (Grid): The grid the table was built on.
+        terrain (TerrainGrid): Its compact form.
+        depots (List[int]): The flat index of every depot, in table order.
+        costs (np.ndarray): `costs[i, j]` is the cost from depot `i` to depot `j`, infinite
+            when unreachable.
+        paths (Optional[List[List[Optional[array]]]]): `paths[i][j]` holds the cell indices of
+            the path from depot `i` to depot `j`, start excluded, or None when unreachable.
+            Only kept when the table was built with `paths=True`.
+    """
+    grid: Grid
+    terrain: TerrainGrid
+    depots: List[int]
+    costs: np.ndarray
+    paths: Optional[List[List[Optional[array]]]] = None
+
+    @classmethod
+    def build(cls, grid: Grid, depots: Sequence[Node], *, cost_model: Optional[CostModel] = None, workers: int = 1, paths: bool = False) -> 'DistanceTable':
+        """
+        Grow one single-source Dijkstra tree per depot, stopping once it reached every depot.
+
+        With several workers the depots are spread across a process pool. The terrain
+        codes are copied once into a shared memory block that every worker maps, so
+        the grid is never pickled; tasks carry nothing but a depot number.
+
+        Args:
+            grid (Grid): A list-of-lists grid or a `TerrainGrid`.
+            depots (Sequence[Node]): The depots, placed by their position.
+            cost_model (Optional[CostModel]): How steps are priced, geometric distance by default.
+            workers (int): Number of worker processes, 1 builds the table in this process.
+            paths (bool): Keep the path between every pair of depots, not only its cost.
+
+        Returns:
+            DistanceTable: The table, with depots in the given order.
+        """
+        terrain = as_terrain_grid(grid)
+        if workers < 1:
+            raise ValueError("Workers must be positive")
+        if not all(terrain.contains(depot.position) for depot in depots):
+            raise ValueError("Depots must lie inside the grid")
+        indices = [terrain.index(depot.position) for depot in depots]
+        cost_model = cost_model or DistanceCostModel()
+        cost_table = cost_model.compile(terrain.palette_weights, DijkstraStrategy.step_lengths)
+
+        if workers == 1 or len(indices) <= 1:
+            rows = [table_row(terrain, cost_table, indices, source, paths) for source in indices]
+        else:
+            rows = cls.build_rows(terrain, cost_table, indices, paths, min(workers, len(indices)))
+
+        costs = np.array([row_costs for row_costs, _ in rows], dtype=np.float64).reshape(len(indices), len(indices))
+        table_paths = [row_paths for _, row_paths in rows] if paths else None
+        return cls(grid, terrain, indices, costs, table_paths)
+
+    @staticmethod
+    def build_rows(terrain: TerrainGrid, cost_table: CostTable, depots: List[int], paths: bool, workers: int) -> List[TableRow]:
+        block = shared_memory.SharedMemory(create=True, size=max(terrain.size, 1))
+        try:
+            np.ndarray(terrain.shape, dtype=np.uint8, buffer=block.buf)[:] = terrain.codes
+            # Workers trust the counts instead of scanning the codes again
+            code_counts = np.bincount(terrain.codes.ravel(), minlength=len(terrain.palette)).tolist()
+            initargs = (block.name, terrain.shape, terrain.palette, code_counts, cost_table, depots, paths)
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as pool:
+                # A few tasks per worker even out trees of very different sizes
+                return list(pool.map(_table_row_in_worker, range(len(depots)), chunksize=max(1, len(depots) // (workers * 4))))
+        finally:
+            block.close()
+            block.unlink()
+
+    def cost(self, origin: int, destination: int) -> float:
+        """The cost from depot number `origin` to depot number `destination`."""
+        return float(self.costs[origin, destination])
+
+    def path(self, origin: int, destination: int) -> List[Node]:
+        """
+        The path from depot number `origin` to depot number `destination`.
+
+        Returns:
+            List[Node]: The path, start excluded, in the `find_path` format. Empty when unreachable.
+        """
+        if self.paths is None:
+            raise ValueError("Build the table with paths=True to keep its paths")
+        route = self.paths[origin][destination]
+        if route is None:
+            return []
+        return DijkstraStrategy.path_nodes(self.grid, self.terrain, route)
+
+
+def table_row(terrain: TerrainGrid, cost_table: CostTable, depots: List[int], source: int, paths: bool) -> TableRow:
+    """
+    Answer one row of a distance table with a single Dijkstra tree grown from `source`.
+
+    Returns:
+        TableRow: The cost to every depot, and the cell indices of the path to every depot
+            (None when unreachable) when `paths` is set.
+    """
+    cost_so_far, came_from = DijkstraStrategy.settle(terrain, source, cost_table, depots)
+    costs = [cost_so_far[depot] for depot in depots]
+    if not paths:
+        return costs, None
+    return costs, [
+        None if cost == math.inf else array('q', DijkstraStrategy.reconstruct_indices(came_from, source, depot))
+        for depot, cost in zip(depots, costs)
+    ]
+
+
+def _init_worker(name: str, shape: Tuple[int, int], palette: Tuple[TerrainType, ...], code_counts: List[int], cost_table: CostTable, depots: List[int], paths: bool):
+    try:
+        # The block belongs to the parent, which unlinks it, so workers do not track it
+        block = shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        block = shared_memory.SharedMemory(name=name)
+    codes = np.ndarray(shape, dtype=np.uint8, buffer=block.buf)
+    _worker_state.update(
+        block=block,  # Keeps the mapping open for as long as the worker lives
+        terrain=TerrainGrid(codes, palette, code_counts),
+        cost_table=cost_table,
+        depots=depots,
+        paths=paths,
+    )
+
+
+def _table_row_in_worker(number: int) -> TableRow:
+    depots = _worker_state['depots']
+    return table_row(_worker_state['terrain'], _worker_state['cost_table'], depots, depots[number], _worker_state['paths'])
@@ -0,0 +1,85 @@
+from typing import Hashable, List, Optional
+
+import numpy as np
+
+from fuel_efficency.algorithms.cluster_graph import ClusterGraph
+from fuel_efficency.algorithms.cost_model import CostModel, DistanceCostModel
+from fuel_efficency.algorithms.dijkstra import DijkstraStrategy
+from fuel_efficency.algorithms.path_finding import PathfindingStrategy
+from fuel_efficency.entities.node import Node
+from fuel_efficency.entities.terrain_grid import Grid, TerrainGrid, as_terrain_grid
+
+
+class HierarchicalStrategy(PathfindingStrategy):
+    """
+    Hierarchical pathfinding (HPA*) over the 8-direction movement model of `DijkstraStrategy`.
+
+    The grid is split into square clusters and abstracted into a `ClusterGraph` once;
+    queries route on the small abstract graph and only search cell by cell inside the
+    clusters the route passes through. Paths are valid and found whenever one exists,
+    but are not always the cheapest: they go through cluster entrances.
+
+    The graph of the last grid is kept and reused by later queries on the same grid
+    (the same `TerrainGrid` object, or any grid with the same cells). Edit cells with
+    `ClusterGraph.update_cells` on the graph returned by `prepare` to rebuild only the
+    clusters around them; cells edited any other way make the next query rebuild it all.
+
+    Args:
+        cluster_size (int): The side of a cluster, in cells.
+    """
+
+    def __init__(self, cluster_size: int = 16):
+        if cluster_size < 1:
+            raise ValueError("Cluster size must be positive")
+        self.cluster_size = cluster_size
+        self.graph: Optional[ClusterGraph] = None
+
+    def prepare(self, grid: Grid, cost_model: Optional[CostModel] = None) -> ClusterGraph:
+        """
+        Return the abstract graph of a grid, building it unless the last one still applies.
+
+        Args:
+            grid (Grid): A list-of-lists grid or a `TerrainGrid`.
+            cost_model (Optional[CostModel]): How steps are priced, geometric distance by default.
+
+        Returns:
+            ClusterGraph: The abstract graph used by `find_path`.
+        """
+        terrain = as_terrain_grid(grid)
+        cost_model = cost_model or DistanceCostModel()
+        if not self.reusable(terrain, cost_model):
+            self.graph = ClusterGraph(terrain, cost_model, self.cluster_size)
+        return self.graph
+
+    def reusable(self, terrain: TerrainGrid, cost_model: CostModel) -> bool:
+        graph = self.graph
+        if graph is None or graph.cost_model != cost_model:
+            return False
+        if graph.terrain is terrain:
+            # Cells edited with `set_cells` rather than `ClusterGraph.update_cells` need a new graph
+            return graph.version == terrain.version
+        # List grids are converted anew on every query, so compare the cells themselves
+        return graph.terrain.palette == terrain.palette and np.array_equal(graph.terrain.codes, terrain.codes)
+
+    def cache_key(self) -> Hashable:
+        # Routes are near-optimal and depend on where the cluster borders fall
+        return type(self), self.cluster_size
+
+    def find_path(self, grid: Grid, start: Node, end: Node, *, cost_model: Optional[CostModel] = None) -> List[Node]:
+        terrain = as_terrain_grid(grid)
+        endpoints = self.endpoint_indices(terrain, start, end)
+        if endpoints is None:
+            return []
+        path = self.prepare(terrain, cost_model).find_route(*endpoints)
+        if path is None:
+            # Return an empty list if no path is found
+            return []
+        return self.path_nodes(grid, terrain, path)
+
+    @staticmethod
+    def get_neighbors(grid: List[List[Node]], node: Node) -> List[Node]:
+        return DijkstraStrategy.get_neighbors(grid, node)
+
+    @staticmethod
+    def calculate_distance(node1: Node, node2: Node) -> float:
+        return DijkstraStrategy.calculate_distance(node1, node2)
@@ -0,0 +1,234 @@
+import heapq
+import math
+from typing import Dict, List, Optional, Tuple
+
+from fuel_efficency.algorithms.cost_model import CostModel, CostTable, DistanceCostModel
+from fuel_efficency.algorithms.dijkstra import DijkstraStrategy
+from fuel_efficency.algorithms.path_finding import PathfindingStrategy
+from fuel_efficency.entities.node import Node
+from fuel_efficency.entities.terrain_grid import Grid, TerrainGrid, as_terrain_grid
+
+Direction = Tuple[int, int]
+
+
+class JumpPointStrategy(PathfindingStrategy):
+    """
+    Jump Point Search over the 8-direction movement model of `DijkstraStrategy`.
+
+    Inside a region of equal weight, steps cost the same everywhere and most paths are
+    symmetric, so the search jumps along straight and diagonal runs and only stops at
+    jump points: the end, cells next to an impassable cell or the grid edge that force a
+    turn, and terrain boundary cells (a passable neighbour of a different weight).
+    Boundary cells fall back to a normal 8-direction expansion, which keeps path costs
+    identical to `DijkstraStrategy` under any cost model. Jump points are ordered by A*
+    with an admissible octile heuristic.
+    """
+
+    # Jump point search moves like DijkstraStrategy
+    cardinal_directions = DijkstraStrategy.cardinal_directions
+    step_lengths = DijkstraStrategy.step_lengths
+
+    @staticmethod
+    def find_path(grid: Grid, start: Node, end: Node, *, cost_model: Optional[CostModel] = None) -> List[Node]:
+        terrain = as_terrain_grid(grid)
+        endpoints = JumpPointStrategy.endpoint_indices(terrain, start, end)
+        if endpoints is None:
+            return []
+        source, target = endpoints
+        width = terrain.width
+        target_x, target_y = divmod(target, width)
+        cost_model = cost_model or DistanceCostModel()
+        cost_table = cost_model.compile(terrain.palette_weights, JumpPointStrategy.step_lengths)
+        scale = cost_model.unit_lower_bound(terrain.used_palette_weights)
+        jumper = Jumper(terrain, target, cost_table)
+
+        def heuristic(index: int) -> float:
+            # Octile distance, the geometric lower bound of 8-direction movement
+            dx, dy = abs(index // width - target_x), abs(index % width - target_y)
+            return scale * (max(dx, dy) + (math.sqrt(2) - 1) * min(dx, dy))
+
+        # Same open set discipline as AStarStrategy: (f_score, -g_score, cell) with lazy deletion
+        open_set = [(heuristic(source), 0, source)]
+        came_from: Dict[int, int] = {}
+        arrived_by: Dict[int, Optional[Direction]] = {source: None}
+        g_score = {source: 0}
+        closed = set()
+
+        while open_set:
+            _, _, current = heapq.heappop(open_set)
+            if current in closed:
+                continue  # Stale entry left behind by a later improvement
+            closed.add(current)
+
+            if current == target:
+                jump_points = JumpPointStrategy.reconstruct_path(came_from, source, target)
+                return JumpPointStrategy.path_nodes(grid, terrain, JumpPointStrategy.fill_jumps(jump_points, width))
+
+            x, y = divmod(current, width)
+            for dx, dy in jumper.directions(x, y, arrived_by[current]):
+                jump = jumper.jump(x, y, dx, dy)
+                if jump is None:
+                    continue
+                neighbor, cost = jump
+                if neighbor in closed:
+                    continue
+                tentative_g_score = g_score[current] + cost
+                if tentative_g_score < g_score.get(neighbor, math.inf):
+                    came_from[neighbor] = current
+                    arrived_by[neighbor] = (dx, dy)
+                    g_score[neighbor] = tentative_g_score
+                    heapq.heappush(open_set, (tentative_g_score + heuristic(neighbor), -tentative_g_score, neighbor))
+
+        # Return an empty list if no path is found
+        return []
+
+    @staticmethod
+    def fill_jumps(jump_points: List[int], width: int) -> List[int]:
+        # Jumps are straight or diagonal runs, so the skipped cells are found by stepping along them
+        path = []
+        for origin, destination in zip(jump_points, jump_points[1:]):
+            x, y = divmod(origin, width)
+            end_x, end_y = divmod(destination, width)
+            dx, dy = (end_x > x) - (end_x < x), (end_y > y) - (end_y < y)
+            while (x, y) != (end_x, end_y):
+                x, y = x + dx, y + dy
+                path.append(x * width + y)
+        return path
+
+    @staticmethod
+    def reconstruct_path(came_from: Dict[int, int], start: int, end: int) -> List[int]:
+        current = end
+        path = []
+        # Backtrack from the end jump point to the start cell
+        while current != start:
+            path.append(current)
+            current = came_from[current]
+        path.append(start)
+        path.reverse()
+        return path
+
+    @staticmethod
+    def get_neighbors(grid: List[List[Node]], node: Node) -> List[Node]:
+        return DijkstraStrategy.get_neighbors(grid, node)
+
+    @staticmethod
+    def calculate_distance(node1: Node, node2: Node) -> float:
+        return DijkstraStrategy.calculate_distance(node1, node2)
+
+
+class Jumper:
+    """
+    Pruning and jumping rules of a single jump point search.
+
+    Args:
+        terrain (TerrainGrid): The grid being searched.
+        target (int): The flat index of the end cell, where every jump stops.
+        cost_table (CostTable): The compiled cost model.
+    """
+
+    def __init__(self, terrain: TerrainGrid, target: int, cost_table: CostTable):
+        self.height, self.width = terrain.shape
+        self.target = target
+        self.cost_table = cost_table
+        self.codes = terrain.flat_codes
+        self.passable = terrain.passable.ravel().tolist()
+        self.boundaries = terrain.boundaries.ravel().tolist()
+        self.numbers = {(direction.x, direction.y): number for number, direction in enumerate(JumpPointStrategy.cardinal_directions)}
+        self.all_directions = list(self.numbers)
+        # Outcome of the straight run out of each cell, per direction number
+        self.straight_runs: List[Dict[int, Optional[Tuple[int, float]]]] = [{} for _ in self.numbers]
+
+    def blocked(self, x: int, y: int) -> bool:
+        return not (0 <= x < self.height and 0 <= y < self.width and self.passable[x * self.width + y])
+
+    def directions(self, x: int, y: int, arrived_by: Optional[Direction]) -> List[Direction]:
+        """
+        The pruned set of directions to jump in from a jump point.
+
+        Args:
+            x (int): Row of the jump point.
+            y (int): Column of the jump point.
+            arrived_by (Optional[Direction]): The direction of the jump that reached it, None at the start.
+
+        Returns:
+            List[Direction]: Every direction from the start and from terrain boundary cells, otherwise
+                the natural directions plus the forced ones.
+        """
+        if arrived_by is None or self.boundaries[x * self.width + y]:
+            return self.all_directions
+        dx, dy = arrived_by
+        if dx and dy:
+            directions = [(dx, dy), (dx, 0), (0, dy)]
+            if self.blocked(x - dx, y):
+                directions.append((-dx, dy))
+            if self.blocked(x, y - dy):
+                directions.append((dx, -dy))
+        elif dx:
+            directions = [(dx, 0)] + [(dx, side) for side in (-1, 1) if self.blocked(x, y + side)]
+        else:
+            directions = [(0, dy)] + [(side, dy) for side in (-1, 1) if self.blocked(x + side, y)]
+        return directions
+
+    def forced(self, x: int, y: int, dx: int, dy: int) -> bool:
+        # A cell has a forced neighbour when an obstacle beside it hides a cell only reachable through it
+        blocked = self.blocked
+        if dx and dy:
+            return (blocked(x - dx, y) and not blocked(x - dx, y + dy)) or (blocked(x, y - dy) and not blocked(x + dx, y - dy))
+        if dx:
+            return any(blocked(x, y + side) and not blocked(x + dx, y + side) for side in (-1, 1))
+        return any(blocked(x + side, y) and not blocked(x + side, y + dy) for side in (-1, 1))
+
+    def jump(self, x: int, y: int, dx: int, dy: int) -> Optional[Tuple[int, float]]:
+        """
+        Run from (x, y) in direction (dx, dy) until the next jump point.
+
+        Returns:
+            Optional[Tuple[int, float]]: The jump point's flat index and the cost of the run, or
+                None when the run hits an impassable cell or the grid edge first.
+        """
+        if not (dx and dy):
+            return self.jump_straight(x, y, dx, dy)
+        width, codes, boundaries = self.width, self.codes, self.boundaries
+        edge_costs = [row[self.numbers[(dx, dy)]] for row in self.cost_table]
+        cost = 0.0
+        while True:
+            if self.blocked(x + dx, y + dy):
+                return None
+            current = x * width + y
+            x, y = x + dx, y + dy
+            neighbor = x * width + y
+            cost += edge_costs[codes[current]][codes[neighbor]]
+            if neighbor == self.target or boundaries[neighbor] or self.forced(x, y, dx, dy):
+                return neighbor, cost
+            # A diagonal run stops where one of its straight runs finds a jump point
+            if self.jump_straight(x, y, dx, 0) is not None or self.jump_straight(x, y, 0, dy) is not None:
+                return neighbor, cost
+
+    def jump_straight(self, x: int, y: int, dx: int, dy: int) -> Optional[Tuple[int, float]]:
+        # Every cell a straight run crosses ends up at the same jump point, so the outcome is
+        # remembered for all of them; diagonal runs re-scan the same rows and columns a lot
+        width, codes, boundaries = self.width, self.codes, self.boundaries
+        number = self.numbers[(dx, dy)]
+        runs = self.straight_runs[number]
+        edge_costs = [row[number] for row in self.cost_table]
+        crossed = []  # (cell, cost of the run before leaving it)
+        cost = 0.0
+        while True:
+            current = x * width + y
+            if current in runs:
+                found = runs[current]
+                found = None if found is None else (found[0], cost + found[1])
+                break
+            crossed.append((current, cost))
+            if self.blocked(x + dx, y + dy):
+                found = None
+                break
+            x, y = x + dx, y + dy
+            neighbor = x * width + y
+            cost += edge_costs[codes[current]][codes[neighbor]]
+            if neighbor == self.target or boundaries[neighbor] or self.forced(x, y, dx, dy):
+                found = neighbor, cost
+                break
+        for cell, spent in crossed:
+            runs[cell] = None if found is None else (found[0], found[1] - spent)
+        return found
@@ -0,0 +1,300 @@
+import heapq
+import math
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from fuel_efficency.algorithms.cost_model import CostTable
+from fuel_efficency.entities.connectivity import label_components
+from fuel_efficency.entities.grid_file import PathLike
+from fuel_efficency.entities.node import Node
+from fuel_efficency.entities.position import Position
+from fuel_efficency.entities.terrain_grid import TerrainGrid, codes_fingerprint
+
+# (landmark cell, reverse) of one distance pass: costs from the landmark, or to it when reversed
+Pass = Tuple[int, bool]
+
+# Grid, cost table and directions of a pool worker, set once by `_init_worker` and only read afterwards
+_worker_state: Dict[str, object] = {}
+
+
+@dataclass(slots=True, eq=False)
+class Landmarks:
+    """
+    Landmark distances for the ALT (A*, landmarks, triangle inequality) heuristic.
+
+    For a landmark `L`, the triangle inequality bounds the cost of any path from `v`
+    to `t` from below by `d(L, t) - d(L, v)` and by `d(v, L) - d(t, L)`. Both terms
+    are kept, as cost models such as `SlopeCostModel` price a step differently in
+    each direction. The largest bound over every landmark follows the terrain
+    weights, unlike a geometric distance, so A* expands far fewer cells.
+
+    Build them with `AStarStrategy.build_landmarks`, which uses its movement model, and
+    keep them next to the grid with `save` and `load`: they stay valid for as long
+    as the grid's codes and the cost model are unchanged. The codes are fingerprinted
+    once, which is what every search checks the grid against.
+
+    Args:
+        cells (np.ndarray): The flat index of every landmark.
+        forward (np.ndarray): `forward[k, v]` is the cost from landmark `k` to cell `v`,
+            infinite when unreachable.
+        backward (np.ndarray): `backward[k, v]` is the cost from cell `v` to landmark `k`.
+        codes (np.ndarray): The terrain codes of the grid they were built on.
+        cost_table (np.ndarray): The compiled cost model they were built with.
+        directions (np.ndarray): The (dx, dy) movement offsets they were built with.
+    """
+    cells: np.ndarray
+    forward: np.ndarray
+    backward: np.ndarray
+    codes: np.ndarray
+    cost_table: np.ndarray
+    directions: np.ndarray
+    _fingerprint: bytes = field(default=b'', init=False, repr=False)
+    _rows: Optional[List[Tuple[memoryview, memoryview]]] = field(default=None, init=False, repr=False)
+
+    def __post_init__(self):
+        # Hashed once, so checking the grid of a query costs a digest comparison
+        self._fingerprint = codes_fingerprint(self.codes)
+
+    @classmethod
+    def build(cls, terrain: TerrainGrid, cost_table: CostTable, directions: Sequence[Position], count: int = 8, cells: Optional[Sequence[int]] = None, workers: int = 1) -> 'Landmarks':
+        """
+        Pick the landmarks and compute their distances to and from every cell.
+
+        Every landmark takes two independent Dijkstra passes, which are spread across
+        a process pool when `workers` > 1.
+
+        Args:
+            terrain (TerrainGrid): The grid.
+            cost_table (CostTable): The compiled cost model of the searches.
+            directions (Sequence[Position]): The movement offsets of the searches.
+            count (int): The number of landmarks picked when `cells` is not given.
+            cells (Optional[Sequence[int]]): The flat index of every landmark, picked by
+                `spread_landmarks` when not given.
+            workers (int): Number of worker processes, 1 builds them in this process.
+
+        Returns:
+            Landmarks: The landmark distances.
+        """
+        if workers < 1:
+            raise ValueError("Workers must be positive")
+        if cells is None:
+            cells = Landmarks.spread_landmarks(terrain, count)
+        cells = [int(cell) for cell in cells]
+        if not cells:
+            raise ValueError("At least one landmark is needed")
+        if not all(0 <= cell < terrain.size for cell in cells):
+            raise ValueError("Landmarks must lie inside the grid")
+
+        passes: List[Pass] = [(cell, reverse) for reverse in (False, True) for cell in cells]
+        if workers == 1:
+            rows = [landmark_distances(terrain, cost_table, directions, cell, reverse) for cell, reverse in passes]
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(passes)), initializer=_init_worker, initargs=(terrain, cost_table, directions)) as pool:
+                rows = list(pool.map(_landmark_distances_in_worker, passes))
+
+        distances = np.stack(rows).reshape(2, len(cells), terrain.size)
+        return cls(
+            np.array(cells, dtype=np.int64),
+            distances[0],
+            distances[1],
+            terrain.codes.copy(),
+            np.asarray(cost_table, dtype=np.float64),
+            np.array([(direction.x, direction.y) for direction in directions], dtype=np.int64),
+        )
+
+    @staticmethod
+    def spread_landmarks(terrain: TerrainGrid, count: int) -> List[int]:
+        """
+        Spread landmarks evenly around the edge of the grid.
+
+        Landmarks behind the far end of a route give the tightest bounds, and on a grid
+        the routes of most queries point towards some part of its edge. Each landmark is
+        the passable cell of the largest component nearest to its point on the edge.
+
+        Args:
+            terrain (TerrainGrid): The grid.
+            count (int): The number of landmarks wanted.
+
+        Returns:
+            List[int]: The flat index of every landmark, fewer than `count` on tiny grids.
+        """
+        if count < 1:
+            raise ValueError("The landmark count must be positive")
+        labels, components = label_components(terrain.passable)
+        if components == 0:
+            raise ValueError("The grid has no passable cell")
+        largest = int(np.argmax(np.bincount(labels[labels >= 0])))
+        rows, columns = np.nonzero(labels == largest)
+
+        # Points every `perimeter / count` cells along the edge, clockwise from the top left
+        height, width = terrain.shape
+        perimeter = max(2 * (height + width) - 4, 1)
+        landmarks: List[int] = []
+        for number in range(count):
+            along = number * perimeter // count
+            if along < width:
+                x, y = 0, along
+            elif along < width + height - 1:
+                x, y = along - width + 1, width - 1
+            elif along < 2 * width + height - 2:
+                x, y = height - 1, 2 * width + height - 3 - along
+            else:
+                x, y = perimeter - along, 0
+            nearest = int(np.argmin((rows - x) ** 2 + (columns - y) ** 2))
+            cell = int(rows[nearest]) * width + int(columns[nearest])
+            if cell not in landmarks:
+                landmarks.append(cell)
+        return landmarks
+
+    def check(self, terrain: TerrainGrid, cost_table: CostTable, directions: Sequence[Position]):
+        """Raise ValueError unless the landmarks were built for this grid and movement model."""
+        offsets = np.array([(direction.x, direction.y) for direction in directions], dtype=np.int64)
+        if (
+            not isinstance(terrain, TerrainGrid)
+            or terrain.fingerprint != self._fingerprint
+            or not np.array_equal(self.directions, offsets)
+            or not np.array_equal(self.cost_table, np.asarray(cost_table, dtype=np.float64))
+        ):
+            raise ValueError("The landmarks were built for another grid or cost model")
+
+    def lower_bound(self, target: int) -> Callable[[int], float]:
+        """
+        A lower bound on the cost from any cell to `target`.
+
+        Only the distances of the target are read up front, the bound of a cell is
+        computed from its distances when asked for, so a query pays for the cells it
+        reaches rather than for the whole grid.
+
+        Args:
+            target (int): The flat index of the target cell.
+
+        Returns:
+            Callable[[int], float]: The bound of a cell by flat index, infinite for the
+                cells the landmarks prove cannot reach the target.
+        """
+        if self._rows is None:
+            # Memoryviews hand out Python floats far faster than indexing the arrays does
+            self._rows = [
+                (memoryview(np.ascontiguousarray(forward)), memoryview(np.ascontiguousarray(backward)))
+                for forward, backward in zip(self.forward, self.backward)
+            ]
+        terms = [(forward, forward[target], backward, backward[target]) for forward, backward in self._rows]
+
+        def bound(index: int) -> float:
+            best = float(0)
+            for forward, forward_target, backward, backward_target in terms:
+                # Terms where both distances are infinite are NaN, which says nothing and
+                # never compares greater
+                term = forward_target - forward[index]
+                if term > best:
+                    best = term
+                term = backward[index] - backward_target
+                if term > best:
+                    best = term
+            return best
+
+        return bound
+
+    def save(self, path: PathLike):
+        """
+        Write the landmarks to a `.npz` file, next to their grid file for instance.
+
+        Args:
+            path (PathLike): The file to write.
+        """
+        with open(path, 'wb') as file:
+            np.savez(
+                file,
+                cells=self.cells,
+                forward=self.forward,
+                backward=self.backward,
+                codes=self.codes,
+                cost_table=self.cost_table,
+                directions=self.directions,
+            )
+
+    @classmethod
+    def load(cls, path: PathLike) -> 'Landmarks':
+        """
+        Read landmarks written by `save`.
+
+        Args:
+            path (PathLike): The landmark file.
+
+        Returns:
+            Landmarks: The landmarks. Searches check they match the grid they are used on.
+        """
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                data['cells'],
+                data['forward'],
+                data['backward'],
+                data['codes'],
+                data['cost_table'],
+                data['directions'],
+            )
+
+    def nodes(self, terrain: TerrainGrid) -> List[Node]:
+        """The landmark cells as nodes of `terrain`."""
+        return [terrain.node_at(int(cell)) for cell in self.cells]
+
+
+def landmark_distances(terrain: TerrainGrid, cost_table: CostTable, directions: Sequence[Position], landmark: int, reverse: bool) -> np.ndarray:
+    """
+    The cost from a landmark to every cell, or from every cell to it when `reverse` is set.
+
+    Args:
+        terrain (TerrainGrid): The grid.
+        cost_table (CostTable): The compiled cost model.
+        directions (Sequence[Position]): The movement offsets.
+        landmark (int): The flat index of the landmark.
+        reverse (bool): Follow the steps backwards, which prices paths towards the landmark.
+
+    Returns:
+        np.ndarray: float64 costs by flat index, infinite when unreachable.
+    """
+    height, width = terrain.shape
+    size = terrain.size
+    offsets = [direction.x * width + direction.y for direction in directions]
+    steps = len(offsets)
+    # edges[cell * steps + number] is the cost of the step out of `cell` in direction `number`,
+    # infinite off the grid, so a step wrapping around a row edge is never taken
+    edges = terrain.edge_costs(cost_table, directions, 0, height).ravel().tolist()
+
+    distances = array('d', [math.inf]) * size
+    distances[landmark] = 0
+    open_set = [(float(0), landmark)]
+    while open_set:
+        cost, current = heapq.heappop(open_set)
+        if cost > distances[current]:
+            continue  # Stale entry left behind by a later improvement
+        for number, offset in enumerate(offsets):
+            if reverse:
+                # The step into `current` from the cell behind it
+                neighbor = current - offset
+                if not 0 <= neighbor < size:
+                    continue
+                edge_cost = edges[neighbor * steps + number]
+            else:
+                neighbor = current + offset
+                edge_cost = edges[current * steps + number]
+            if edge_cost == math.inf:
+                continue
+            new_cost = cost + edge_cost
+            if new_cost < distances[neighbor]:
+                distances[neighbor] = new_cost
+                heapq.heappush(open_set, (new_cost, neighbor))
+    return np.frombuffer(distances, dtype=np.float64)
+
+
+def _init_worker(terrain: TerrainGrid, cost_table: CostTable, directions: Sequence[Position]):
+    _worker_state.update(terrain=terrain, cost_table=cost_table, directions=directions)
+
+
+def _landmark_distances_in_worker(landmark_pass: Pass) -> np.ndarray:
+    landmark, reverse = landmark_pass
+    return landmark_distances(_worker_state['terrain'], _worker_state['cost_table'], _worker_state['directions'], landmark, reverse)
@@ -1,11 +1,15 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import FrozenSet, Hashable, Iterable, List, Optional, Tuple
 
 from fuel_efficency.entities.node import Node
+from fuel_efficency.entities.terrain_grid import Grid, TerrainGrid
 
 
 class PathfindingStrategy(ABC):
 
+    # Keyword options `find_path` accepts, `Context` only forwards the ones listed here
+    supported_options: FrozenSet[str] = frozenset({'cost_model'})
+
     @abstractmethod
     def find_path(grid:List[List[Node]], start:Node, end:Node):
         pass # pragma: no cover
@@ -17,3 +21,47 @@ class PathfindingStrategy(ABC):
     @abstractmethod
     def calculate_distance(node1:Node, node2: Node) -> float:
         pass # pragma: no cover
+
+    def cache_key(self) -> Hashable:
+        """
+        Identify the routes this strategy finds, for `RouteCache` keys.
+
+        Strategies whose instances can be configured to find other routes add that
+        configuration to the key, so differently configured instances never share routes.
+        """
+        return type(self)
+
+    @staticmethod
+    def endpoint_indices(terrain: TerrainGrid, start: Node, end: Node) -> Optional[Tuple[int, int]]:
+        """
+        Resolve the start and end nodes to flat cell indices.
+
+        Args:
+            terrain (TerrainGrid): The grid being searched.
+            start (Node): The start node.
+            end (Node): The end node.
+
+        Returns:
+            Optional[Tuple[int, int]]: The (start, end) indices, or None when either lies outside the grid.
+        """
+        if not (terrain.contains(start.position) and terrain.contains(end.position)):
+            return None
+        return terrain.index(start.position), terrain.index(end.position)
+
+    @staticmethod
+    def path_nodes(grid: Grid, terrain: TerrainGrid, indices: Iterable[int]) -> List[Node]:
+        """
+        Turn the cell indices of a path into nodes.
+
+        Args:
+            grid (Grid): The grid passed to `find_path`.
+            terrain (TerrainGrid): Its compact form.
+            indices (Iterable[int]): The flat cell indices of the path.
+
+        Returns:
+            List[Node]: The path nodes. List-of-lists grids hand back their own node objects.
+        """
+        if grid is terrain:
+            return [terrain.node_at(index) for index in indices]
+        width = terrain.width
+        return [grid[index // width][index % width] for index in indices]
@@ -0,0 +1,172 @@
+from array import array
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Sequence, Tuple
+
+from fuel_efficency.algorithms.cost_model import CostTable
+from fuel_efficency.algorithms.path_finding import PathfindingStrategy
+from fuel_efficency.entities.node import Node
+from fuel_efficency.entities.position import Position
+from fuel_efficency.entities.terrain_grid import Grid, TerrainGrid
+
+# A run of `count` steps in direction code `direction`
+Run = Tuple[int, int]
+
+# Direction codes number the 8 unit steps row by row, (dx + 1) * 3 + (dy + 1), so code 4
+# (no move) never appears
+NO_MOVE = 4
+
+# Longest run one byte pair of `encode` holds, longer runs are split
+MAX_ENCODED_RUN = 255
+
+
+def direction_code(dx: int, dy: int) -> int:
+    """The direction code of a unit step, raising ValueError for anything else."""
+    if not (-1 <= dx <= 1 and -1 <= dy <= 1) or dx == dy == 0:
+        raise ValueError("Paths only move between neighbouring cells")
+    return (dx + 1) * 3 + (dy + 1)
+
+
+@dataclass(slots=True, eq=False)
+class PathResult:
+    """
+    A path held as a compact array of flat cell indices, returned by `find_path(..., compact=True)`.
+
+    A list of `Node` objects costs a few hundred bytes per step, this costs 4. Nodes are
+    only built when iterated or indexed, and the route can be sent as run-length
+    direction codes, which shrinks the straight stretches of long routes to two bytes.
+
+    Args:
+        grid (Grid): The grid the path was found on.
+        terrain (TerrainGrid): Its compact form.
+        source (int): The flat index of the start cell, which is not part of the path.
+        indices (array): The flat index of every cell of the path, start excluded.
+        cost (float): The total fuel cost of the path under the cost model it was found with.
+    """
+    grid: Grid
+    terrain: TerrainGrid
+    source: int
+    indices: array
+    cost: float
+
+    @classmethod
+    def from_route(cls, grid: Grid, terrain: TerrainGrid, source: int, route: Iterable[int], cost_table: CostTable, directions: Sequence[Position]) -> 'PathResult':
+        """
+        Wrap the cell indices of a path and price it.
+
+        Args:
+            grid (Grid): The grid the path was found on.
+            terrain (TerrainGrid): Its compact form.
+            source (int): The flat index of the start cell.
+            route (Iterable[int]): The flat cell indices of the path, start excluded.
+            cost_table (CostTable): The compiled cost model of the search.
+            directions (Sequence[Position]): The movement directions the cost table is indexed by.
+
+        Returns:
+            PathResult: The path, with its cost summed from the start like the search did.
+        """
+        # Indices fit in 32 bits on any grid below 2**31 cells, which halves the array
+        indices = array('i' if terrain.size < 2 ** 31 else 'q', route)
+        numbers = {(direction.x, direction.y): number for number, direction in enumerate(directions)}
+        codes, width = terrain.flat_codes, terrain.width
+        cost = float(0)
+        previous = source
+        for index in indices:
+            (x, y), (previous_x, previous_y) = divmod(index, width), divmod(previous, width)
+            cost += cost_table[codes[previous]][numbers[(x - previous_x, y - previous_y)]][codes[index]]
+            previous = index
+        return cls(grid, terrain, source, indices, cost)
+
+    @classmethod
+    def decode(cls, grid: Grid, terrain: TerrainGrid, source: int, runs: Iterable[Run], cost: float) -> 'PathResult':
+        """
+        Rebuild a path from its start cell and the runs of `run_length`.
+
+        Args:
+            grid (Grid): The grid the path was found on.
+            terrain (TerrainGrid): Its compact form.
+            source (int): The flat index of the start cell.
+            runs (Iterable[Run]): The (direction code, count) runs of the path.
+            cost (float): The total cost of the path, which the runs do not carry.
+
+        Returns:
+            PathResult: The path.
+        """
+        height, width = terrain.shape
+        indices = array('i' if terrain.size < 2 ** 31 else 'q')
+        x, y = divmod(source, width)
+        for direction, count in runs:
+            if direction == NO_MOVE or not 0 <= direction < 9:
+                raise ValueError("Unknown direction code")
+            dx, dy = divmod(direction, 3)
+            for _ in range(count):
+                x, y = x + dx - 1, y + dy - 1
+                if not (0 <= x < height and 0 <= y < width):
+                    raise ValueError("The runs leave the grid")
+                indices.append(x * width + y)
+        return cls(grid, terrain, source, indices, cost)
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __bool__(self) -> bool:
+        return len(self.indices) > 0
+
+    def __iter__(self) -> Iterator[Node]:
+        # Nodes are built one at a time, list-of-lists grids hand back their own node objects
+        if self.grid is self.terrain:
+            node_at = self.terrain.node_at
+            for index in self.indices:
+                yield node_at(index)
+        else:
+            grid, width = self.grid, self.terrain.width
+            for index in self.indices:
+                yield grid[index // width][index % width]
+
+    def __getitem__(self, number: int) -> Node:
+        return PathfindingStrategy.path_nodes(self.grid, self.terrain, (self.indices[number],))[0]
+
+    def nodes(self) -> List[Node]:
+        """The path as the list of nodes `find_path` returns without `compact`."""
+        return PathfindingStrategy.path_nodes(self.grid, self.terrain, self.indices)
+
+    def run_length(self) -> List[Run]:
+        """
+        The path as runs of identical steps from the start.
+
+        Returns:
+            List[Run]: (direction code, count) pairs. Direction codes number the steps
+                `(dx + 1) * 3 + (dy + 1)`, so 0 is (-1, -1), 1 is (-1, 0) and 8 is (1, 1).
+        """
+        runs: List[Run] = []
+        width = self.terrain.width
+        previous_x, previous_y = divmod(self.source, width)
+        direction, count = -1, 0
+        for index in self.indices:
+            x, y = divmod(index, width)
+            step = direction_code(x - previous_x, y - previous_y)
+            if step == direction:
+                count += 1
+            else:
+                if count:
+                    runs.append((direction, count))
+                direction, count = step, 1
+            previous_x, previous_y = x, y
+        if count:
+            runs.append((direction, count))
+        return runs
+
+    def encode(self) -> bytes:
+        """The runs of `run_length` as (direction code, count) byte pairs, longer runs split."""
+        encoded = bytearray()
+        for direction, count in self.run_length():
+            while count > 0:
+                encoded += bytes((direction, min(count, MAX_ENCODED_RUN)))
+                count -= MAX_ENCODED_RUN
+        return bytes(encoded)
+
+    @staticmethod
+    def decode_runs(encoded: bytes) -> List[Run]:
+        """The runs held by the bytes of `encode`."""
+        if len(encoded) % 2:
+            raise ValueError("Encoded paths hold (direction code, count) byte pairs")
+        return list(zip(encoded[::2], encoded[1::2]))
@@ -0,0 +1,72 @@
+import sys
+from array import array
+from collections import OrderedDict
+from typing import Hashable, NamedTuple, Optional
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    bytes: int
+
+
+class RouteCache:
+    """
+    Bounded LRU cache of routes, stored as compact arrays of flat cell indices.
+
+    The cache is bounded both by entry count and by the bytes held by the stored
+    routes; the least recently used routes are evicted first.
+
+    Args:
+        max_entries (int): Maximum number of cached routes.
+        max_bytes (int): Maximum bytes held by the cached routes.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024):
+        if max_entries < 1 or max_bytes < 1:
+            raise ValueError("Cache bounds must be positive")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._routes: 'OrderedDict[Hashable, array]' = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: Hashable) -> Optional[array]:
+        """Return the cell indices cached under `key` and mark them recently used, or None."""
+        route = self._routes.get(key)
+        if route is None:
+            self._misses += 1
+            return None
+        self._routes.move_to_end(key)
+        self._hits += 1
+        return route
+
+    def put(self, key: Hashable, route: array):
+        """Cache the cell indices of a route, evicting least recently used routes to fit."""
+        size = sys.getsizeof(route)
+        if size > self.max_bytes:
+            return
+        previous = self._routes.pop(key, None)
+        if previous is not None:
+            self._bytes -= sys.getsizeof(previous)
+        self._routes[key] = route
+        self._bytes += size
+        while len(self._routes) > self.max_entries or self._bytes > self.max_bytes:
+            _, evicted = self._routes.popitem(last=False)
+            self._bytes -= sys.getsizeof(evicted)
+            self._evictions += 1
+
+    def clear(self):
+        """Drop every cached route, counters are kept."""
+        self._routes.clear()
+        self._bytes = 0
+
+    def cache_info(self) -> CacheInfo:
+        return CacheInfo(self._hits, self._misses, self._evictions, len(self._routes), self._bytes)
+
+    def __len__(self) -> int:
+        return len(self._routes)
@@ -0,0 +1,144 @@
+import heapq
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, List, NamedTuple, Optional, Sequence
+
+from fuel_efficency.algorithms.path_finding import PathfindingStrategy
+from fuel_efficency.entities.node import Node
+from fuel_efficency.entities.terrain_grid import Grid, TerrainGrid
+
+
+@dataclass(frozen=True, slots=True)
+class SearchLimits:
+    """
+    Bounds on the work and memory of one search, for strategies that accept `limits=`.
+
+    A search that hits a bound returns a `LimitReached` instead of a path, so one
+    pathological query cannot grow the open set until the process runs out of memory.
+
+    Args:
+        max_expansions (Optional[int]): Stop after expanding this many cells.
+        max_open_set (Optional[int]): Stop once the open set holds this many entries. Checked
+            after every expansion, so it may overshoot by one cell's neighbours.
+        max_cost (Optional[float]): Never extend a path beyond this cost. A* prunes on its
+            cost estimate through the cell, which never overestimates.
+        beam_width (Optional[int]): Trim the open set back to its best `beam_width` entries
+            whenever it doubles: the lowest estimates for A*, and for Dijkstra, which has no
+            estimate, the cells closest to the end. Paths found this way may cost more than
+            the cheapest one.
+    """
+    max_expansions: Optional[int] = None
+    max_open_set: Optional[int] = None
+    max_cost: Optional[float] = None
+    beam_width: Optional[int] = None
+
+    def __post_init__(self):
+        for name in ('max_expansions', 'max_open_set', 'beam_width'):
+            value = getattr(self, name)
+            if value is not None and (not isinstance(value, int) or value < 1):
+                raise ValueError(f"{name} must be a positive integer")
+        if self.max_cost is not None and not self.max_cost >= 0:
+            raise ValueError("max_cost must not be negative")
+
+    def exceeded(self, expansions: int, open_set_size: int) -> Optional[str]:
+        """The name of the work bound reached after `expansions` expansions, or None."""
+        if self.max_expansions is not None and expansions >= self.max_expansions:
+            return 'max_expansions'
+        if self.max_open_set is not None and open_set_size >= self.max_open_set:
+            return 'max_open_set'
+        return None
+
+
+class Cutoff(NamedTuple):
+    # What a search stopped by a limit hands back to its `find_path`, by flat cell index
+    reason: str
+    frontier: List[int]
+    partial: List[int]
+    partial_cost: float
+
+
+@dataclass(slots=True)
+class LimitReached:
+    """
+    Returned by `find_path` instead of a path when a `SearchLimits` bound stopped the search.
+
+    It is falsy, empty and never cached, like the empty list returned when there is no
+    path, so callers that only test for a path keep working.
+
+    Args:
+        reason (str): The bound that was hit: 'max_expansions', 'max_open_set', 'max_cost'
+            or 'beam_width'.
+        frontier (List[Node]): The cells reached but left unexpanded, closest to the end first.
+            For 'max_cost' these are the cells the budget stopped the search at.
+        partial (List[Node]): The path to the first frontier cell, start excluded.
+        partial_cost (float): The cost of `partial`.
+    """
+    reason: str
+    frontier: List[Node]
+    partial: List[Node]
+    partial_cost: float
+
+    @classmethod
+    def from_cutoff(cls, cutoff: Cutoff, grid: Grid, terrain: TerrainGrid) -> 'LimitReached':
+        return cls(
+            cutoff.reason,
+            PathfindingStrategy.path_nodes(grid, terrain, cutoff.frontier),
+            PathfindingStrategy.path_nodes(grid, terrain, cutoff.partial),
+            cutoff.partial_cost,
+        )
+
+    def __bool__(self) -> bool:
+        return False
+
+    def __len__(self) -> int:
+        return 0
+
+    def __iter__(self):
+        return iter(())
+
+
+def trim_open_set(open_set: list, beam_width: int, rank: Optional[Callable[[tuple], Any]] = None) -> list:
+    """
+    Keep the `beam_width` best entries of a heap in place and return the dropped ones.
+
+    Args:
+        open_set (list): The heap.
+        beam_width (int): The number of entries to keep.
+        rank (Optional[Callable[[tuple], Any]]): Sort key of the entries, their heap order by default.
+
+    Returns:
+        list: The dropped entries.
+    """
+    open_set.sort(key=rank)
+    dropped = open_set[beam_width:]
+    del open_set[beam_width:]
+    if rank is not None:
+        heapq.heapify(open_set)
+    # Otherwise a sorted list already is a valid heap
+    return dropped
+
+
+def cut_off(reason: str, frontier: Iterable[int], source: int, came_from: Sequence[int], cost_so_far: Sequence[float], closeness: Callable[[int], float]) -> Cutoff:
+    """
+    Describe a search stopped by a limit.
+
+    Args:
+        reason (str): The bound that was hit.
+        frontier (Iterable[int]): The cells reached but left unexpanded, repeats allowed.
+        source (int): The start cell.
+        came_from (Sequence[int]): The predecessor of every reached cell.
+        cost_so_far (Sequence[float]): The cost of every reached cell.
+        closeness (Callable[[int], float]): Distance estimate from a cell to the end.
+
+    Returns:
+        Cutoff: The frontier, closest to the end first with ties to the cheapest, and the
+            path to its first cell.
+    """
+    frontier = sorted(set(frontier), key=lambda index: (closeness(index), cost_so_far[index], index))
+    partial = []
+    if frontier:
+        current = frontier[0]
+        while current != source:
+            partial.append(current)
+            current = came_from[current]
+        partial.reverse()
+    return Cutoff(reason, frontier, partial, cost_so_far[frontier[0]] if frontier else float(0))
@@ -0,0 +1,70 @@
+from dataclasses import dataclass, field, fields
+from typing import Callable, Dict, Optional, Union
+
+# Called with the flat index and priority of every expanded cell
+Trace = Callable[[int, float], None]
+
+
+@dataclass(slots=True)
+class SearchStats:
+    """
+    Counters and timings of one search, filled in by strategies that accept `stats=`.
+
+    Strategies only touch the object when one is passed, so searches without stats
+    pay a single `is not None` check per popped cell.
+
+    Attributes:
+        nodes_expanded (int): Cells taken off the open set and expanded, the end cell included.
+        heap_pushes (int): Entries pushed onto the open set.
+        heap_pops (int): Entries popped from the open set.
+        stale_pops (int): Popped entries superseded by a cheaper push, skipped without expanding.
+        peak_open_set (int): Largest number of entries held by the open set at once.
+        get_neighbors_seconds (float): Time spent listing (or pricing, for the vectorized
+            expansion) the neighbours of expanded cells.
+        calculate_distance_seconds (float): Time spent in heuristic distance estimates.
+        reconstruct_path_seconds (float): Time spent rebuilding the path from predecessors.
+        total_seconds (float): Wall time of the whole `find_path` call.
+        cache_hit (bool): The route came from a `RouteCache`, so nothing was searched.
+        trace (Optional[Trace]): Called with the index and priority of every expanded cell.
+    """
+    nodes_expanded: int = 0
+    heap_pushes: int = 0
+    heap_pops: int = 0
+    stale_pops: int = 0
+    peak_open_set: int = 0
+    get_neighbors_seconds: float = float(0)
+    calculate_distance_seconds: float = float(0)
+    reconstruct_path_seconds: float = float(0)
+    total_seconds: float = float(0)
+    cache_hit: bool = False
+    trace: Optional[Trace] = field(default=None, repr=False, compare=False)
+
+    def record_expansion(self, open_set_size: int, index: int, priority: float):
+        # Pops are counted with the open set size they left behind, pushes are not counted
+        # one by one: each push was either popped, dropped or is still queued when the search ends
+        self.heap_pops += 1
+        self.nodes_expanded += 1
+        self.peak_open_set = max(self.peak_open_set, open_set_size + 1)
+        if self.trace is not None:
+            self.trace(index, priority)
+
+    def record_stale_pop(self, open_set_size: int):
+        self.heap_pops += 1
+        self.stale_pops += 1
+        self.peak_open_set = max(self.peak_open_set, open_set_size + 1)
+
+    def record_end(self, pops_before: int, open_set_size: int, dropped: int = 0):
+        """
+        Close the counts of a search that started with `pops_before` pops on record.
+
+        Args:
+            pops_before (int): `heap_pops` when the search started.
+            open_set_size (int): Entries still queued when the search ended.
+            dropped (int): Entries discarded unpopped, by beam trims, which were pushed too.
+        """
+        self.heap_pushes += self.heap_pops - pops_before + open_set_size + dropped
+        self.peak_open_set = max(self.peak_open_set, open_set_size)
+
+    def as_dict(self) -> Dict[str, Union[int, float, bool]]:
+        """The counters and timings, ready to export to a metrics pipeline."""
+        return {item.name: getattr(self, item.name) for item in fields(self) if item.name != 'trace'}
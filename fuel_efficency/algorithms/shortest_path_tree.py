@@ -0,0 +1,88 @@
+import math
+from dataclasses import dataclass
+from typing import List
+
+import numpy as np
+
+from fuel_efficency.algorithms.path_finding import PathfindingStrategy
+from fuel_efficency.entities.node import Node
+from fuel_efficency.entities.terrain_grid import Grid, TerrainGrid
+
+
+@dataclass(slots=True)
+class ShortestPathTree:
+    """
+    Every shortest path out of one source cell.
+
+    Args:
+        grid (Grid): The grid the tree was grown on.
+        terrain (TerrainGrid): Its compact form.
+        source (int): The flat index of the root cell.
+        distances (np.ndarray): Cost to reach every cell, shaped like the grid, infinite when
+            unreachable or beyond the budget.
+        predecessors (np.ndarray): Flat index of the previous cell on the path to every cell,
+            -1 for the root and unreached cells.
+    """
+    grid: Grid
+    terrain: TerrainGrid
+    source: int
+    distances: np.ndarray
+    predecessors: np.ndarray
+
+    @classmethod
+    def from_search(cls, grid: Grid, terrain: TerrainGrid, source: int, cost_so_far, came_from, budget: float = math.inf) -> 'ShortestPathTree':
+        """
+        Wrap the flat `cost_so_far` and `came_from` arrays of a finished search.
+
+        Args:
+            grid (Grid): The grid the tree was grown on.
+            terrain (TerrainGrid): Its compact form.
+            source (int): The flat index of the root cell.
+            cost_so_far: Buffer of float64 costs by flat index.
+            came_from: Buffer of int64 predecessors by flat index.
+            budget (float): Cells costing more than this are dropped from the tree.
+
+        Returns:
+            ShortestPathTree: The tree.
+        """
+        distances = np.frombuffer(cost_so_far, dtype=np.float64).reshape(terrain.shape).copy()
+        predecessors = np.frombuffer(came_from, dtype=np.int64)
+        # Indices fit in 32 bits on any grid below 2**31 cells, which halves the array
+        predecessors = predecessors.astype(np.int32 if terrain.size < 2 ** 31 else np.int64)
+        # Cells still open when the search stopped only hold a tentative cost
+        outside = distances.ravel() > budget
+        distances.ravel()[outside] = math.inf
+        predecessors[outside] = -1
+        return cls(grid, terrain, source, distances, predecessors)
+
+    def cost_to(self, end: Node) -> float:
+        """The cost of the cheapest path to `end`, infinite if it is not in the tree."""
+        if not self.terrain.contains(end.position):
+            return math.inf
+        return float(self.distances[end.position.x, end.position.y])
+
+    def path_to(self, end: Node) -> List[Node]:
+        """
+        Pull the path to `end` out of the tree in O(path length).
+
+        Args:
+            end (Node): The target node.
+
+        Returns:
+            List[Node]: The path, start excluded, in the `find_path` format. Empty if `end`
+                is not in the tree.
+        """
+        if self.cost_to(end) == math.inf:
+            return []
+        current = self.terrain.index(end.position)
+        path = []
+        while current != self.source:
+            path.append(current)
+            current = int(self.predecessors[current])
+        path.reverse()
+        return PathfindingStrategy.path_nodes(self.grid, self.terrain, path)
+
+    def reachable(self, budget: float = math.inf) -> np.ndarray:
+        """Boolean mask, shaped like the grid, of the cells reachable within `budget`."""
+        return np.isfinite(self.distances) & (self.distances <= budget)
+
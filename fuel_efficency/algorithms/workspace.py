@@ -0,0 +1,122 @@
+import math
+import threading
+from array import array
+from typing import List, Optional
+
+from fuel_efficency.entities.terrain_grid import TerrainGrid
+from fuel_efficency.entities.tiled_grid import TiledGrid
+
+
+class SearchWorkspace:
+    """
+    Preallocated per-cell search state, reused from one query to the next.
+
+    Costs, predecessors and closed flags live in flat arrays indexed by `x * width + y`,
+    sized for the largest grid searched so far. A search records every cell it writes
+    in `touched`, so `prepare` only clears those cells instead of reallocating, and
+    falls back to refilling the whole arrays when most of them were written anyway.
+
+    A workspace holds the state of one search at a time: searches running in other
+    threads use `SearchWorkspace.default()`, which is per thread, or their own workspace.
+
+    Attributes:
+        cost (array): The best known cost of every cell, infinite when not reached.
+        came_from (array): The predecessor of every reached cell, -1 otherwise.
+        closed (bytearray): 1 for the cells whose cost is final.
+        touched (List[int]): The cells written since the last reset, possibly repeated.
+    """
+
+    _local = threading.local()
+
+    def __init__(self, size: int = 0):
+        if size < 0:
+            raise ValueError("Workspace size must not be negative")
+        self.allocate(size)
+
+    def allocate(self, size: int):
+        self.cost = array('d', [math.inf]) * size
+        self.came_from = array('q', [-1]) * size
+        self.closed = bytearray(size)
+        self.touched: List[int] = []
+
+    @classmethod
+    def default(cls, terrain: Optional[TerrainGrid] = None) -> 'SearchWorkspace':
+        """
+        The workspace shared by the searches of the calling thread.
+
+        Args:
+            terrain (Optional[TerrainGrid]): The grid to search. Tiled grids get the thread's
+                `SparseSearchWorkspace`, as arrays spanning the whole map would not fit in memory.
+        """
+        if isinstance(terrain, TiledGrid):
+            workspace = getattr(cls._local, 'sparse', None)
+            if workspace is None:
+                workspace = cls._local.sparse = SparseSearchWorkspace()
+            return workspace
+        workspace = getattr(cls._local, 'workspace', None)
+        if workspace is None:
+            workspace = cls._local.workspace = cls()
+        return workspace
+
+    @property
+    def size(self) -> int:
+        return len(self.cost)
+
+    def prepare(self, size: int) -> 'SearchWorkspace':
+        """
+        Get the workspace ready for a search over `size` cells.
+
+        Args:
+            size (int): The number of cells of the grid to search.
+
+        Returns:
+            SearchWorkspace: The workspace itself, with every cell unreached and open.
+        """
+        if size > self.size:
+            # Growing reallocates, and the new arrays start out clean
+            self.allocate(size)
+        elif len(self.touched) * 4 > self.size:
+            # Refilling in C beats clearing most cells one by one
+            self.allocate(self.size)
+        else:
+            cost, came_from, closed = self.cost, self.came_from, self.closed
+            for index in self.touched:
+                cost[index] = math.inf
+                came_from[index] = -1
+                closed[index] = 0
+            self.touched.clear()
+        return self
+
+
+class _Unset(dict):
+    # A dict reading `default` for the keys it does not hold, without storing it
+    __slots__ = ('default',)
+
+    def __init__(self, default):
+        super().__init__()
+        self.default = default
+
+    def __missing__(self, key):
+        return self.default
+
+
+class SparseSearchWorkspace(SearchWorkspace):
+    """
+    Search state kept in dicts holding only the reached cells, for grids too large for
+    per-cell arrays. Cells it does not hold read as unreached and open, like the cleared
+    cells of a `SearchWorkspace`, so strategies use either one the same way.
+    """
+
+    def allocate(self, size: int):
+        self.cost = _Unset(math.inf)
+        self.came_from = _Unset(-1)
+        self.closed = _Unset(0)
+        self.touched: List[int] = []
+
+    def prepare(self, size: int) -> 'SparseSearchWorkspace':
+        # The dicts never hold more than the cells of the last search, whatever the grid size
+        self.cost.clear()
+        self.came_from.clear()
+        self.closed.clear()
+        self.touched.clear()
+        return self
@@ -0,0 +1,170 @@
+from typing import Iterable, List, Tuple
+
+import numpy as np
+
+
+def label_components(passable: np.ndarray) -> Tuple[np.ndarray, int]:
+    """
+    Label the 8-connected components of the passable cells of a grid.
+
+    Cells are grouped into horizontal runs, runs touching a run of the next row
+    (diagonally included) are joined, and the run graph is reduced with vectorized
+    hooking and pointer jumping, so nothing loops over cells in Python.
+
+    Args:
+        passable (np.ndarray): 2D boolean array of the cells that can be entered.
+
+    Returns:
+        Tuple[np.ndarray, int]: An int32 array shaped like `passable`, holding the component
+            number of every passable cell (numbered from 0 in row-major order of their
+            first cell) and -1 elsewhere, and the number of components.
+    """
+    height, width = passable.shape
+    labels = np.full((height, width), -1, dtype=np.int32)
+    if not passable.any():
+        return labels, 0
+
+    # Horizontal runs of passable cells, in row-major order, as [start, end) columns
+    framed = np.zeros((height, width + 2), dtype=np.int8)
+    framed[:, 1:-1] = passable
+    steps = np.diff(framed, axis=1)
+    start_rows, starts = np.nonzero(steps == 1)
+    _, ends = np.nonzero(steps == -1)
+    lengths = ends - starts
+
+    # Runs of consecutive rows touch when their column ranges, widened by one for the
+    # diagonals, overlap. Keys sort the runs by (row, column) across the whole grid, so
+    # the touching runs of the previous row are found by two binary searches per run.
+    stride = width + 2
+    start_keys = start_rows * stride + starts
+    end_keys = start_rows * stride + ends
+    below = np.flatnonzero(start_rows > 0)
+    previous_row = (start_rows[below] - 1) * stride
+    first = np.searchsorted(end_keys, previous_row + starts[below], 'left')
+    last = np.searchsorted(start_keys, previous_row + ends[below], 'right')
+    counts = np.maximum(last - first, 0)
+    upper = np.repeat(below, counts)
+    lower = np.repeat(first - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+
+    # Hook every root onto the smallest root it touches, then flatten the trees, until
+    # both ends of every edge share a root
+    roots = np.arange(len(starts))
+    while upper.size:
+        upper_roots, lower_roots = roots[upper], roots[lower]
+        if np.array_equal(upper_roots, lower_roots):
+            break
+        smallest = np.minimum(upper_roots, lower_roots)
+        np.minimum.at(roots, upper_roots, smallest)
+        np.minimum.at(roots, lower_roots, smallest)
+        while True:
+            jumped = roots[roots]
+            if np.array_equal(jumped, roots):
+                break
+            roots = jumped
+
+    # Roots are the smallest run of their component, so numbering them in order numbers
+    # components by their first cell
+    components, run_labels = np.unique(roots, return_inverse=True)
+    labels[passable] = np.repeat(run_labels.astype(np.int32), lengths)
+    return labels, len(components)
+
+
+class ConnectivityIndex:
+    """
+    Component labels of a grid's passable cells, for O(1) reachability checks.
+
+    Every strategy moves between neighbouring cells and cannot enter impassable ones,
+    so cells of different 8-connected components can never be joined by a path. The
+    check is exact for 8-direction strategies and a safe filter for 4-direction ones.
+
+    Labels are joined through a union-find over label numbers, so opening a cell only
+    merges labels. Closing one can split its component, so that component alone is
+    labelled again.
+
+    Args:
+        passable (np.ndarray): 2D boolean array of the cells that can be entered.
+    """
+
+    def __init__(self, passable: np.ndarray):
+        labels, count = label_components(passable)
+        self.labels = labels
+        self.parent: List[int] = list(range(count))
+
+    @property
+    def component_count(self) -> int:
+        # Labels given up by a split keep their slot in `parent` but mark no cell
+        labels = self.labels[self.labels >= 0]
+        return int(np.unique(self.roots()[labels]).size)
+
+    def roots(self) -> np.ndarray:
+        """The root of every label, as an array indexed by label."""
+        roots = np.array(self.parent, dtype=np.int64)
+        while True:
+            jumped = roots[roots]
+            if np.array_equal(jumped, roots):
+                return roots
+            roots = jumped
+
+    def find(self, label: int) -> int:
+        """The root label of the component holding `label`."""
+        parent = self.parent
+        root = label
+        while parent[root] != root:
+            root = parent[root]
+        # Path compression, so later finds take one step
+        while parent[label] != root:
+            parent[label], label = root, parent[label]
+        return root
+
+    def component(self, index: int) -> int:
+        """The component of a flat cell index, -1 for impassable cells."""
+        label = int(self.labels.flat[index])
+        return -1 if label < 0 else self.find(label)
+
+    def connected(self, source: int, target: int) -> bool:
+        """Whether a path can join two flat cell indices: both passable and in one component."""
+        component = self.component(source)
+        return component >= 0 and component == self.component(target)
+
+    def update(self, opened: Iterable[int], closed: Iterable[int]):
+        """
+        Follow cells that became passable (`opened`) or impassable (`closed`).
+
+        Args:
+            opened (Iterable[int]): Flat indices of the cells that can now be entered.
+            closed (Iterable[int]): Flat indices of the cells that no longer can.
+        """
+        labels = self.labels
+        width = labels.shape[1]
+        flat = labels.reshape(-1)
+        closed = list(closed)
+
+        split = {self.component(index) for index in closed} - {-1}
+        flat[list(closed)] = -1
+        for root in split:
+            self.relabel(root)
+
+        for index in opened:
+            if flat[index] >= 0:
+                continue
+            # A new label, joined with every component around the cell
+            label = flat[index] = len(self.parent)
+            self.parent.append(label)
+            x, y = divmod(index, width)
+            around = labels[max(x - 1, 0):x + 2, max(y - 1, 0):y + 2]
+            for neighbour in {self.find(int(other)) for other in around[around >= 0].tolist()}:
+                if neighbour != label:
+                    self.parent[neighbour] = label
+
+    def relabel(self, root: int):
+        # Label the remaining cells of a component that lost cells from scratch, inside its bounding box
+        members = (self.labels >= 0) & (self.roots()[np.maximum(self.labels, 0)] == root)
+        if not members.any():
+            return
+        rows, columns = np.flatnonzero(members.any(axis=1)), np.flatnonzero(members.any(axis=0))
+        box = (slice(rows[0], rows[-1] + 1), slice(columns[0], columns[-1] + 1))
+        pieces, count = label_components(members[box])
+        first = len(self.parent)
+        self.parent.extend(range(first, first + count))
+        inside = pieces >= 0
+        self.labels[box][inside] = pieces[inside] + first
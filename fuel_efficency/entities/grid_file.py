@@ -0,0 +1,202 @@
+import os
+import struct
+from typing import BinaryIO, Dict, NamedTuple, Tuple, Type, Union
+
+import numpy as np
+
+from fuel_efficency.entities.down_hill import DownHill
+from fuel_efficency.entities.node import Node
+from fuel_efficency.entities.plateau import Plateau
+from fuel_efficency.entities.terrain_grid import Grid, TerrainGrid, TerrainType, as_terrain_grid
+from fuel_efficency.entities.tiled_grid import DEFAULT_MAX_BYTES, TiledGrid
+from fuel_efficency.entities.up_hill import UpHill
+from fuel_efficency.entities.valley import Valley
+
+PathLike = Union[str, 'os.PathLike[str]']
+
+# File layout, little-endian:
+#   header   magic, version, palette size, height, width, offset of the codes
+#   palette  one (terrain class name, weight) entry per code
+#   counts   number of cells of every code, as uint64
+#   codes    height * width uint8 terrain codes in row-major (`x * width + y`) order,
+#            starting on a page boundary so every page holds a fixed range of cells
+GRID_FILE_MAGIC = b'FUELGRID'
+GRID_FILE_VERSION = 1
+PAGE_SIZE = 4096
+_HEADER = struct.Struct('<8sHHQQQ')
+_PALETTE_ENTRY = struct.Struct('<32sd')
+
+# Tiled files have the same layout with a tile size after the width, and hold the codes
+# tile by tile: tiles in row-major order, each `tile_size * tile_size` codes in row-major
+# order, padded with 0 past the grid's edge, so one read fetches a whole tile
+TILED_FILE_MAGIC = b'FUELTILE'
+TILED_FILE_VERSION = 1
+DEFAULT_TILE_SIZE = 256
+_TILED_HEADER = struct.Struct('<8sHHQQQQ')
+
+# Terrain classes a grid file can name, by class name
+TERRAIN_CLASSES: Dict[str, Type[Node]] = {node_type.__name__: node_type for node_type in (Valley, Plateau, UpHill, DownHill)}
+
+
+class GridFileHeader(NamedTuple):
+    height: int
+    width: int
+    palette: Tuple[TerrainType, ...]
+    code_counts: Tuple[int, ...]
+    data_offset: int
+
+
+def save_grid(path: PathLike, grid: Grid):
+    """
+    Write a grid to a binary grid file.
+
+    Args:
+        path (PathLike): The file to write.
+        grid (Grid): A list-of-lists grid or a `TerrainGrid`.
+    """
+    terrain = as_terrain_grid(grid)
+    palette = pack_palette(terrain.palette)
+    counts = np.bincount(terrain.codes.ravel(), minlength=len(terrain.palette)).astype('<u8').tobytes()
+    header_size = _HEADER.size + len(palette) + len(counts)
+    data_offset = -(-header_size // PAGE_SIZE) * PAGE_SIZE
+
+    with open(path, 'wb') as file:
+        file.write(_HEADER.pack(GRID_FILE_MAGIC, GRID_FILE_VERSION, len(terrain.palette), terrain.height, terrain.width, data_offset))
+        file.write(palette)
+        file.write(counts)
+        file.write(bytes(data_offset - header_size))
+        terrain.codes.tofile(file)
+
+
+def read_header(path: PathLike) -> GridFileHeader:
+    """
+    Read the header of a grid file without touching its codes.
+
+    Args:
+        path (PathLike): The grid file.
+
+    Returns:
+        GridFileHeader: The grid shape, palette, code counts and where the codes start.
+    """
+    with open(path, 'rb') as file:
+        fixed = file.read(_HEADER.size)
+        if len(fixed) < _HEADER.size or fixed[:len(GRID_FILE_MAGIC)] != GRID_FILE_MAGIC:
+            raise ValueError("Not a grid file")
+        _, version, palette_size, height, width, data_offset = _HEADER.unpack(fixed)
+        if version != GRID_FILE_VERSION:
+            raise ValueError(f"Unsupported grid file version {version}")
+        palette, code_counts = read_palette(file, palette_size)
+    if os.path.getsize(path) < data_offset + height * width:
+        raise ValueError("Truncated grid file")
+    return GridFileHeader(height, width, palette, code_counts, data_offset)
+
+
+def pack_palette(palette: Tuple[TerrainType, ...]) -> bytes:
+    # One (class name, weight) entry per code, for the terrain classes files can name
+    packed = b''
+    for node_type, weight in palette:
+        name = node_type.__name__
+        if TERRAIN_CLASSES.get(name) is not node_type:
+            raise ValueError(f"Unknown terrain type {name}")
+        packed += _PALETTE_ENTRY.pack(name.encode('ascii'), weight)
+    return packed
+
+
+def read_palette(file: BinaryIO, palette_size: int) -> Tuple[Tuple[TerrainType, ...], Tuple[int, ...]]:
+    # The palette and code counts following a header
+    palette = []
+    for name, weight in _PALETTE_ENTRY.iter_unpack(file.read(palette_size * _PALETTE_ENTRY.size)):
+        name = name.rstrip(b'\0').decode('ascii')
+        if name not in TERRAIN_CLASSES:
+            raise ValueError(f"Unknown terrain type {name}")
+        palette.append((TERRAIN_CLASSES[name], weight))
+    code_counts = np.frombuffer(file.read(palette_size * 8), dtype='<u8')
+    if len(palette) != palette_size or len(code_counts) != palette_size:
+        raise ValueError("Truncated grid file")
+    return tuple(palette), tuple(code_counts.tolist())
+
+
+def load_grid(path: PathLike, copy_on_write: bool = False) -> TerrainGrid:
+    """
+    Open a grid file as a `TerrainGrid` whose codes are memory-mapped.
+
+    Nothing but the header is read up front: the operating system pages codes in as
+    a search visits them, so a search only touches the pages of the rows it crosses.
+
+    Args:
+        path (PathLike): The grid file.
+        copy_on_write (bool): Allow `TerrainGrid.set_cells`, keeping the changes in memory
+            only. The grid is read-only otherwise; save it again to persist changes, so the
+            code counts in the header stay right.
+
+    Returns:
+        TerrainGrid: The grid, backed by the file.
+    """
+    header = read_header(path)
+    shape = (header.height, header.width)
+    if header.height * header.width:
+        codes = np.memmap(path, dtype=np.uint8, mode='c' if copy_on_write else 'r', offset=header.data_offset, shape=shape)
+    else:
+        codes = np.zeros(shape, dtype=np.uint8)
+    return TerrainGrid(codes, header.palette, header.code_counts)
+
+
+def save_tiled_grid(path: PathLike, grid: Grid, tile_size: int = DEFAULT_TILE_SIZE):
+    """
+    Write a grid to a tiled grid file, for `load_tiled_grid`.
+
+    The codes are written one band of tile rows at a time, so a memory-mapped grid is
+    converted without being read into memory whole.
+
+    Args:
+        path (PathLike): The file to write.
+        grid (Grid): A list-of-lists grid or a `TerrainGrid`.
+        tile_size (int): The side of a tile, in cells.
+    """
+    if tile_size < 1:
+        raise ValueError("Tile size must be positive")
+    terrain = as_terrain_grid(grid)
+    height, width = terrain.shape
+    palette = pack_palette(terrain.palette)
+    counts = np.bincount(terrain.codes.ravel(), minlength=len(terrain.palette)).astype('<u8').tobytes()
+    header_size = _TILED_HEADER.size + len(palette) + len(counts)
+    data_offset = -(-header_size // PAGE_SIZE) * PAGE_SIZE
+    tiles_across = -(-width // tile_size)
+
+    with open(path, 'wb') as file:
+        file.write(_TILED_HEADER.pack(TILED_FILE_MAGIC, TILED_FILE_VERSION, len(terrain.palette), height, width, tile_size, data_offset))
+        file.write(palette)
+        file.write(counts)
+        file.write(bytes(data_offset - header_size))
+        for top in range(0, height, tile_size):
+            band = np.zeros((tile_size, tiles_across * tile_size), dtype=np.uint8)
+            rows = terrain.codes[top:top + tile_size]
+            band[:len(rows), :width] = rows
+            # (row, tile, column) to (tile, row, column) puts every tile's cells together
+            band.reshape(tile_size, tiles_across, tile_size).transpose(1, 0, 2).tofile(file)
+
+
+def load_tiled_grid(path: PathLike, max_bytes: int = DEFAULT_MAX_BYTES, prefetch: bool = True) -> TiledGrid:
+    """
+    Open a tiled grid file. Nothing but the header is read up front.
+
+    Args:
+        path (PathLike): The tiled grid file.
+        max_bytes (int): The most tile codes kept in memory, a prefetched tile included.
+        prefetch (bool): Read the next tile ahead of a search crossing tiles.
+
+    Returns:
+        TiledGrid: The grid, reading its tiles from the file as searches need them.
+    """
+    with open(path, 'rb') as file:
+        fixed = file.read(_TILED_HEADER.size)
+        if len(fixed) < _TILED_HEADER.size or fixed[:len(TILED_FILE_MAGIC)] != TILED_FILE_MAGIC:
+            raise ValueError("Not a tiled grid file")
+        _, version, palette_size, height, width, tile_size, data_offset = _TILED_HEADER.unpack(fixed)
+        if version != TILED_FILE_VERSION:
+            raise ValueError(f"Unsupported tiled grid file version {version}")
+        palette, code_counts = read_palette(file, palette_size)
+    tiles = -(-height // tile_size) * -(-width // tile_size) if tile_size else 0
+    if os.path.getsize(path) < data_offset + tiles * tile_size * tile_size:
+        raise ValueError("Truncated tiled grid file")
+    return TiledGrid(path, (height, width), tile_size, palette, code_counts, data_offset, max_bytes, prefetch)
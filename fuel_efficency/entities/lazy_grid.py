@@ -0,0 +1,134 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Iterator
+
+from fuel_efficency.entities.node import Node
+from fuel_efficency.entities.position import Position
+
+if TYPE_CHECKING:
+    # TerrainGrid hands out lazy views of itself, so it is only imported for annotations
+    from fuel_efficency.entities.terrain_grid import TerrainGrid
+
+# Enough nodes for the cells a point-to-point query usually touches on large maps
+DEFAULT_MAX_NODES = 1 << 16
+
+
+@dataclass(slots=True, eq=False)
+class LazyGrid:
+    """
+    List-of-lists view of a `TerrainGrid` that builds `Node` objects when they are read.
+
+    It answers `grid[x][y]`, `len(grid)` and `len(grid[0])` like a `List[List[Node]]`, so
+    code written for object grids keeps working, but memory follows the cells that are
+    read instead of the map size. The most recently read nodes are kept, so reading a
+    cell again hands back the same object while it stays cached.
+
+    Strategies search the backing `TerrainGrid` directly and only read the nodes of the
+    path they return. Assigning a node to a cell changes the terrain code of the cell.
+
+    Args:
+        terrain (TerrainGrid): The compact grid holding the cells.
+        max_nodes (int): Maximum number of nodes kept, least recently read dropped first.
+    """
+    terrain: 'TerrainGrid'
+    max_nodes: int = DEFAULT_MAX_NODES
+    _nodes: 'OrderedDict[int, Node]' = field(default_factory=OrderedDict, init=False, repr=False)
+
+    def __post_init__(self):
+        if not isinstance(self.max_nodes, int) or self.max_nodes < 1:
+            raise ValueError("Max nodes must be a positive integer")
+
+    def __len__(self) -> int:
+        return self.terrain.height
+
+    def __getitem__(self, x: int) -> '_LazyRow':
+        return _LazyRow(self, self.terrain_row(x))
+
+    def __iter__(self) -> Iterator['_LazyRow']:
+        for x in range(self.terrain.height):
+            yield _LazyRow(self, x)
+
+    @property
+    def cached(self) -> int:
+        """Number of nodes currently kept."""
+        return len(self._nodes)
+
+    def terrain_row(self, x: int) -> int:
+        # Rows are indexed like list rows, negative indices included
+        height = self.terrain.height
+        if not isinstance(x, int):
+            raise TypeError("Grid rows are indexed by int")
+        if not -height <= x < height:
+            raise IndexError("Grid row index out of range")
+        return x % height
+
+    def node_at(self, index: int) -> Node:
+        """
+        The node of a flat cell index, built on first read.
+
+        Args:
+            index (int): The flat cell index.
+
+        Returns:
+            Node: The cached node of the cell, or a new one that is cached from now on.
+        """
+        nodes = self._nodes
+        node = nodes.get(index)
+        if node is not None:
+            nodes.move_to_end(index)
+            return node
+        node = nodes[index] = self.terrain.node_at(index)
+        if len(nodes) > self.max_nodes:
+            nodes.popitem(last=False)
+        return node
+
+    def set_node(self, index: int, node: Node):
+        """
+        Give a cell the terrain type and weight of a node, which is cached as the cell's node.
+
+        Args:
+            index (int): The flat cell index.
+            node (Node): The new node of the cell.
+        """
+        terrain = self.terrain
+        terrain.set_cells({Position.interned(*divmod(index, terrain.width)): terrain.code_of(node)})
+        nodes = self._nodes
+        nodes[index] = node
+        nodes.move_to_end(index)
+        if len(nodes) > self.max_nodes:
+            nodes.popitem(last=False)
+
+    def clear(self):
+        """Drop every cached node, for instance after editing the terrain behind the view's back."""
+        self._nodes.clear()
+
+
+@dataclass(slots=True, eq=False)
+class _LazyRow:
+    # One row of a `LazyGrid`, handed out by `grid[x]`
+    grid: LazyGrid
+    x: int
+
+    def __len__(self) -> int:
+        return self.grid.terrain.width
+
+    def __getitem__(self, y: int) -> Node:
+        return self.grid.node_at(self.index(y))
+
+    def __setitem__(self, y: int, node: Node):
+        if not isinstance(node, Node):
+            raise TypeError("Grid cells hold Node objects")
+        self.grid.set_node(self.index(y), node)
+
+    def __iter__(self) -> Iterator[Node]:
+        start = self.x * self.grid.terrain.width
+        for index in range(start, start + self.grid.terrain.width):
+            yield self.grid.node_at(index)
+
+    def index(self, y: int) -> int:
+        width = self.grid.terrain.width
+        if not isinstance(y, int):
+            raise TypeError("Grid cells are indexed by int")
+        if not -width <= y < width:
+            raise IndexError("Grid column index out of range")
+        return self.x * width + y % width
@@ -4,8 +4,15 @@ from typing import Protocol
 from fuel_efficency.entities.position import Position
 
 
-@dataclass(slots=True)
+@dataclass(slots=True, eq=False)
 class Node():
+    """
+    A grid cell: nodes are equal when they share a position, and ordered by weight.
+
+    The comparison and hashing dunders live here only. Subclasses are declared with
+    `@dataclass(slots=True, eq=False)` so dataclass does not generate field-by-field
+    replacements for them.
+    """
     weight: float
     position: 'Position' = Position()
 
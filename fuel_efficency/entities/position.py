@@ -1,12 +1,21 @@
 import sys
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import Optional
 
 
-@dataclass(slots=True)
+@dataclass(frozen=True, slots=True)
 class Position:
+    """
+    An immutable grid coordinate. Its hash is computed once, when it is created, so
+    dict and set lookups keyed by positions or nodes do not rebuild it every time.
+    """
     x: int = sys.maxsize
     y: int = sys.maxsize
+    _hash: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, '_hash', hash((self.x, self.y)))
 
     def __add__(self, other:'Position') -> Optional['Position']:
         """
@@ -43,9 +52,27 @@ class Position:
         return Position(self.x - other.x, self.y - other.y)
 
     def __hash__(self):
-        return hash((self.x, self.y))
+        return self._hash
 
     def __eq__(self, other):
         if not isinstance(other, Position):
             return NotImplemented
         return self.x == other.x and self.y == other.y
+
+    @staticmethod
+    @lru_cache(maxsize=1 << 16)
+    def interned(x: int, y: int) -> 'Position':
+        """
+        The shared Position of a coordinate.
+
+        Positions are immutable, so grids hand out one object per cell instead of building a
+        new one for every node they create. The most recently used coordinates are kept.
+
+        Args:
+            x (int): The row.
+            y (int): The column.
+
+        Returns:
+            Position: The same object for the same coordinate while it stays cached.
+        """
+        return Position(x, y)
@@ -0,0 +1,383 @@
+import hashlib
+import math
+from dataclasses import InitVar, dataclass, field
+from typing import List, Mapping, Optional, Sequence, Tuple, Type, Union
+
+import numpy as np
+
+from fuel_efficency.entities.connectivity import ConnectivityIndex
+from fuel_efficency.entities.down_hill import DownHill
+from fuel_efficency.entities.lazy_grid import DEFAULT_MAX_NODES, LazyGrid
+from fuel_efficency.entities.node import Node
+from fuel_efficency.entities.plateau import Plateau
+from fuel_efficency.entities.position import Position
+from fuel_efficency.entities.tiled_grid import TiledGrid
+from fuel_efficency.entities.up_hill import UpHill
+from fuel_efficency.entities.valley import Valley
+
+# A terrain type is a node class together with the weight its cells carry
+TerrainType = Tuple[Type[Node], float]
+
+DEFAULT_PALETTE: Tuple[TerrainType, ...] = (
+    (Valley, float(1)),
+    (Plateau, float(1)),
+    (UpHill, float(2)),
+    (DownHill, float(0.5)),
+)
+
+# Terrain codes are stored as uint8, so a palette holds at most 256 terrain types
+MAX_PALETTE_SIZE = 256
+
+
+@dataclass(slots=True)
+class TerrainGrid:
+    """
+    Compact, array-backed terrain grid.
+
+    Every cell is stored as a one byte terrain code that indexes `palette`, so a
+    4000x4000 map costs 16MB instead of 16M `Node` objects. Cells are addressed
+    like the list-of-lists grids (`grid[x][y]`) and flattened as `x * width + y`.
+
+    Args:
+        codes (np.ndarray): 2D uint8 array of terrain codes, shaped (height, width).
+        palette (Tuple[TerrainType, ...]): The (node class, weight) pair of every code.
+        code_counts (Optional[Sequence[int]]): The number of cells of every code, when already
+            known. The codes are then trusted instead of scanned, so a memory-mapped grid is
+            not read in full just to be opened.
+    """
+    codes: np.ndarray
+    palette: Tuple[TerrainType, ...] = DEFAULT_PALETTE
+    code_counts: InitVar[Optional[Sequence[int]]] = None
+    _weights: Optional[np.ndarray] = field(default=None, init=False, repr=False, compare=False)
+    _boundaries: Optional[np.ndarray] = field(default=None, init=False, repr=False, compare=False)
+    _used_codes: Optional[np.ndarray] = field(default=None, init=False, repr=False, compare=False)
+    _connectivity: Optional[ConnectivityIndex] = field(default=None, init=False, repr=False, compare=False)
+    _fingerprint: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
+    _version: int = field(default=0, init=False, repr=False, compare=False)
+
+    def __post_init__(self, code_counts: Optional[Sequence[int]]):
+        codes = np.ascontiguousarray(self.codes, dtype=np.uint8)
+        if codes.ndim != 2:
+            raise ValueError("Terrain codes must be a 2D array")
+        if len(self.palette) > MAX_PALETTE_SIZE:
+            raise ValueError(f"A terrain palette holds at most {MAX_PALETTE_SIZE} terrain types")
+        if code_counts is not None:
+            if len(code_counts) > len(self.palette) or sum(code_counts) != codes.size:
+                raise ValueError("Terrain code counts do not match the grid")
+            self._used_codes = np.flatnonzero(np.asarray(code_counts))
+        elif codes.size and int(codes.max()) >= len(self.palette):
+            raise ValueError("Terrain code out of palette range")
+        self.codes = codes
+        self.palette = tuple(self.palette)
+
+    @classmethod
+    def filled(cls, height: int, width: int, node_type: Type[Node] = Valley) -> 'TerrainGrid':
+        """
+        Create a grid where every cell has the same terrain type.
+
+        Args:
+            height (int): Number of rows, i.e. `len(grid)`.
+            width (int): Number of columns, i.e. `len(grid[0])`.
+            node_type (Type[Node]): The terrain class of every cell.
+
+        Returns:
+            TerrainGrid: The uniform grid.
+        """
+        palette = list(DEFAULT_PALETTE)
+        terrain = (node_type, float(node_type().weight))
+        if terrain not in palette:
+            palette.append(terrain)
+        return cls(np.full((height, width), palette.index(terrain), dtype=np.uint8), tuple(palette))
+
+    @classmethod
+    def from_nodes(cls, grid: List[List[Node]]) -> 'TerrainGrid':
+        """
+        Build a compact grid from a list-of-lists grid of `Node` objects.
+
+        Args:
+            grid (List[List[Node]]): The object grid, indexed as `grid[x][y]`.
+
+        Returns:
+            TerrainGrid: The compact grid.
+        """
+        palette = list(DEFAULT_PALETTE)
+        lookup = {terrain: code for code, terrain in enumerate(palette)}
+        width = len(grid[0]) if grid else 0
+        codes = np.empty((len(grid), width), dtype=np.uint8)
+        for x, row in enumerate(grid):
+            if len(row) != width:
+                raise ValueError("All grid rows must have the same length")
+            for y, node in enumerate(row):
+                terrain = (type(node), float(node.weight))
+                code = lookup.get(terrain)
+                if code is None:
+                    if len(palette) == MAX_PALETTE_SIZE:
+                        raise ValueError(f"A terrain palette holds at most {MAX_PALETTE_SIZE} terrain types")
+                    code = lookup[terrain] = len(palette)
+                    palette.append(terrain)
+                codes[x, y] = code
+        return cls(codes, tuple(palette))
+
+    def to_nodes(self) -> List[List[Node]]:
+        """
+        Expand the grid into the list-of-lists representation.
+
+        Returns:
+            List[List[Node]]: One `Node` per cell, with its position set.
+        """
+        palette = self.palette
+        return [
+            [palette[code][0](weight=palette[code][1], position=Position(x, y)) for y, code in enumerate(row)]
+            for x, row in enumerate(self.codes.tolist())
+        ]
+
+    def lazy(self, max_nodes: int = DEFAULT_MAX_NODES) -> LazyGrid:
+        """
+        A list-of-lists view of the grid that only builds the `Node` objects that are read.
+
+        Args:
+            max_nodes (int): Maximum number of nodes the view keeps.
+
+        Returns:
+            LazyGrid: The view, backed by this grid.
+        """
+        return LazyGrid(self, max_nodes)
+
+    @property
+    def height(self) -> int:
+        return self.codes.shape[0]
+
+    @property
+    def width(self) -> int:
+        return self.codes.shape[1]
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.codes.shape
+
+    @property
+    def size(self) -> int:
+        return self.codes.size
+
+    @property
+    def flat_codes(self) -> memoryview:
+        """Zero-copy flat view of the terrain codes, indexable by cell index from Python."""
+        return memoryview(self.codes).cast('B')
+
+    @property
+    def palette_weights(self) -> np.ndarray:
+        return np.array([weight for _, weight in self.palette], dtype=np.float64)
+
+    @property
+    def used_palette_weights(self) -> np.ndarray:
+        """The weights of the terrain codes that actually appear in the grid."""
+        if self._used_codes is None:
+            self._used_codes = np.flatnonzero(np.bincount(self.codes.ravel(), minlength=len(self.palette)))
+        return self.palette_weights[self._used_codes]
+
+    @property
+    def version(self) -> int:
+        """Number of `set_cells` calls that changed a cell, so state derived from the codes can tell it is stale."""
+        return self._version
+
+    @property
+    def fingerprint(self) -> bytes:
+        """Digest of the shape and codes, hashed once and again after `set_cells` changes a cell."""
+        if self._fingerprint is None:
+            self._fingerprint = codes_fingerprint(self.codes)
+        return self._fingerprint
+
+    @property
+    def weights(self) -> np.ndarray:
+        """The weight of every cell as a float64 array shaped like `codes`."""
+        if self._weights is None:
+            self._weights = self.palette_weights[self.codes]
+        return self._weights
+
+    @property
+    def passable(self) -> np.ndarray:
+        """Boolean array of the cells that can be entered (finite weight)."""
+        return np.isfinite(self.weights)
+
+    @property
+    def boundaries(self) -> np.ndarray:
+        """
+        Boolean array of the terrain boundary cells: passable cells with at least one passable
+        8-neighbour of a different weight. Cached, as it only depends on the codes.
+        """
+        if self._boundaries is None:
+            height, width = self.codes.shape
+            weights = self.weights
+            passable = self.passable
+            boundaries = np.zeros((height, width), dtype=bool)
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    if dx == dy == 0:
+                        continue
+                    # Compare every cell with its neighbour at (dx, dy), where one exists
+                    here = (slice(max(-dx, 0), height - max(dx, 0)), slice(max(-dy, 0), width - max(dy, 0)))
+                    there = (slice(max(dx, 0), height - max(-dx, 0)), slice(max(dy, 0), width - max(-dy, 0)))
+                    boundaries[here] |= passable[there] & (weights[here] != weights[there])
+            self._boundaries = boundaries & passable
+        return self._boundaries
+
+    @property
+    def connectivity(self) -> ConnectivityIndex:
+        """
+        The connected components of the passable cells, built on first use. Unlike the
+        other caches it is kept up to date by `set_cells` instead of being rebuilt.
+        """
+        if self._connectivity is None:
+            self._connectivity = ConnectivityIndex(self.passable)
+        return self._connectivity
+
+    @property
+    def has_connectivity(self) -> bool:
+        """Whether `connectivity` was already built, so reading it is O(1)."""
+        return self._connectivity is not None
+
+    def code_of(self, node: Node) -> int:
+        """
+        Return the terrain code of a node's type and weight, adding it to the palette when new.
+
+        Args:
+            node (Node): A node of the wanted terrain type and weight.
+
+        Returns:
+            int: The palette index of the terrain type.
+        """
+        terrain = (type(node), float(node.weight))
+        if terrain in self.palette:
+            return self.palette.index(terrain)
+        if len(self.palette) == MAX_PALETTE_SIZE:
+            raise ValueError(f"A terrain palette holds at most {MAX_PALETTE_SIZE} terrain types")
+        self.palette = self.palette + (terrain,)
+        return len(self.palette) - 1
+
+    def set_cells(self, changes: Mapping[Position, int]) -> List[int]:
+        """
+        Change the terrain code of some cells in place.
+
+        Args:
+            changes (Mapping[Position, int]): The new terrain code of every changed cell.
+
+        Returns:
+            List[int]: The flat indices of the cells whose code actually changed.
+        """
+        changed = []
+        opened, closed = [], []
+        for position, code in changes.items():
+            if not self.contains(position):
+                raise ValueError("Changed cells must lie inside the grid")
+            if not 0 <= code < len(self.palette):
+                raise ValueError("Terrain code out of palette range")
+            old_code = self.codes[position.x, position.y]
+            if old_code != code:
+                self.codes[position.x, position.y] = code
+                index = self.index(position)
+                changed.append(index)
+                was_passable, passable = math.isfinite(self.palette[old_code][1]), math.isfinite(self.palette[code][1])
+                if passable != was_passable:
+                    (opened if passable else closed).append(index)
+        if changed:
+            # Everything derived from the codes is rebuilt on next use, but the connectivity
+            # index, which only follows the cells that were opened or closed
+            self._weights = self._boundaries = self._used_codes = self._fingerprint = None
+            self._version += 1
+            if self._connectivity is not None and (opened or closed):
+                self._connectivity.update(opened, closed)
+        return changed
+
+    def contains(self, position: Position) -> bool:
+        return 0 <= position.x < self.height and 0 <= position.y < self.width
+
+    def index(self, position: Position) -> int:
+        """Return the flat cell index of a position."""
+        return position.x * self.width + position.y
+
+    def position(self, index: int) -> Position:
+        """Return the position of a flat cell index."""
+        return Position.interned(*divmod(index, self.width))
+
+    def node_at(self, index: int) -> Node:
+        """Build the `Node` object of a flat cell index."""
+        x, y = divmod(index, self.width)
+        node_type, weight = self.palette[self.codes[x, y]]
+        return node_type(weight=weight, position=Position.interned(x, y))
+
+    def neighbors(self, index: int, directions: Sequence[Position]) -> List[Tuple[int, int]]:
+        """
+        List the in-bounds neighbours of a cell.
+
+        Args:
+            index (int): The flat cell index.
+            directions (Sequence[Position]): The movement offsets to try.
+
+        Returns:
+            List[Tuple[int, int]]: (neighbour index, direction number) pairs.
+        """
+        height, width = self.codes.shape
+        x, y = divmod(index, width)
+        neighbors = []
+        for number, direction in enumerate(directions):
+            nx, ny = x + direction.x, y + direction.y
+            if 0 <= nx < height and 0 <= ny < width:
+                neighbors.append((nx * width + ny, number))
+        return neighbors
+
+    def edge_costs(self, cost_table: Sequence, directions: Sequence[Position], start_row: int, stop_row: int) -> np.ndarray:
+        """
+        Cost of every unit step out of a band of rows, computed for all directions at once.
+
+        Args:
+            cost_table (Sequence): `cost_table[source_code][direction][target_code]`, as built by `CostModel.compile`.
+            directions (Sequence[Position]): The unit movement offsets.
+            start_row (int): First row (x) of the band.
+            stop_row (int): Row after the last one of the band.
+
+        Returns:
+            np.ndarray: A (cells in band, directions) float64 array, in flat index order, that is
+                infinite where the step leaves the grid or enters an impassable cell.
+        """
+        height, width = self.codes.shape
+        palette_size = len(self.palette)
+        rows = stop_row - start_row
+        # The border is masked by a one cell frame coded as an extra, impassable terrain
+        table = np.full((palette_size + 1, len(directions), palette_size + 1), np.inf)
+        table[:palette_size, :, :palette_size] = cost_table
+        framed = np.full((rows + 2, width + 2), palette_size, dtype=np.intp)
+        first, last = max(start_row - 1, 0), min(stop_row + 1, height)
+        framed[first - start_row + 1:last - start_row + 1, 1:-1] = self.codes[first:last]
+        codes = framed[1:-1, 1:-1]
+        costs = np.empty((rows, width, len(directions)))
+        for number, direction in enumerate(directions):
+            targets = framed[1 + direction.x:1 + direction.x + rows, 1 + direction.y:1 + direction.y + width]
+            costs[:, :, number] = table[codes, number, targets]
+        return costs.reshape(rows * width, len(directions))
+
+Grid = Union[List[List[Node]], TerrainGrid, LazyGrid, TiledGrid]
+
+
+def codes_fingerprint(codes: np.ndarray) -> bytes:
+    """A digest telling apart grids of different shapes or terrain codes."""
+    digest = hashlib.blake2b(repr(codes.shape).encode(), digest_size=16)
+    digest.update(np.ascontiguousarray(codes, dtype=np.uint8).data)
+    return digest.digest()
+
+
+def as_terrain_grid(grid: Grid) -> TerrainGrid:
+    """
+    Return `grid` as a `TerrainGrid`, converting list-of-lists grids and unwrapping lazy views.
+    Tiled grids offer the cell interface of `TerrainGrid` and are returned as they are.
+
+    A list-of-lists grid is read cell by cell on every call, since its nodes can be replaced
+    at any time, so each search on one costs O(cells) before it starts. Callers that route
+    on the same grid many times should build a `TerrainGrid` once, with
+    `TerrainGrid.from_nodes` (or `.lazy()` for a view that still indexes like a list), and
+    search that instead.
+    """
+    if isinstance(grid, (TerrainGrid, TiledGrid)):
+        return grid
+    if isinstance(grid, LazyGrid):
+        return grid.terrain
+    return TerrainGrid.from_nodes(grid)
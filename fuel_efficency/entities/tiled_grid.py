@@ -0,0 +1,258 @@
+import os
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from fuel_efficency.entities.node import Node
+from fuel_efficency.entities.position import Position
+
+if TYPE_CHECKING:
+    # TerrainGrid passes tiled grids through `as_terrain_grid`, so it is only imported for annotations
+    from fuel_efficency.entities.terrain_grid import TerrainType
+
+# Resident tiles of a grid opened without a ceiling, 64MB of codes
+DEFAULT_MAX_BYTES = 64 << 20
+
+
+@dataclass(slots=True)
+class TileStats:
+    """
+    Counters of a `TiledGrid`'s tile cache.
+
+    Args:
+        loads (int): Tiles read from disk because a search needed them.
+        hits (int): Tiles a search moved into that were already resident.
+        evictions (int): Tiles dropped to stay under the memory ceiling.
+        prefetches (int): Tiles read ahead of the search.
+        prefetch_hits (int): Prefetched tiles a search then moved into.
+    """
+    loads: int = 0
+    hits: int = 0
+    evictions: int = 0
+    prefetches: int = 0
+    prefetch_hits: int = 0
+
+
+class TiledGrid:
+    """
+    Terrain grid read from a tiled grid file one square tile at a time.
+
+    Codes are stored tile by tile on disk and only the tiles a search enters are read,
+    into an LRU that holds at most `max_bytes` of codes, so maps far larger than memory
+    can be searched. It offers the cell interface `TerrainGrid` offers the strategies,
+    which is what `as_terrain_grid` hands them, so `DijkstraStrategy` and `AStarStrategy`
+    cross tile boundaries without knowing about tiles.
+
+    When a search moves into a tile that was not resident, the next tile in the same
+    direction is read in a background thread, so a search heading one way finds it
+    loaded. Open tiled grids with `load_tiled_grid` and write them with `save_tiled_grid`.
+
+    Args:
+        path (Union[str, os.PathLike]): The tiled grid file.
+        shape (Tuple[int, int]): The (height, width) of the grid.
+        tile_size (int): The side of a tile, in cells.
+        palette (Tuple[TerrainType, ...]): The (node class, weight) pair of every code.
+        code_counts (Sequence[int]): The number of cells of every code.
+        data_offset (int): Where the first tile starts in the file.
+        max_bytes (int): The most tile codes kept in memory, a prefetched tile included.
+        prefetch (bool): Read the next tile ahead of the search.
+    """
+
+    def __init__(self, path: Union[str, 'os.PathLike[str]'], shape: Tuple[int, int], tile_size: int, palette: Tuple['TerrainType', ...], code_counts: Sequence[int], data_offset: int, max_bytes: int = DEFAULT_MAX_BYTES, prefetch: bool = True):
+        if tile_size < 1:
+            raise ValueError("Tile size must be positive")
+        self.path = os.fspath(path)
+        self.height, self.width = shape
+        self.tile_size = tile_size
+        self.palette = tuple(palette)
+        self.code_counts = tuple(code_counts)
+        self.data_offset = data_offset
+        self.tile_bytes = tile_size * tile_size
+        self.tiles_across = -(-self.width // tile_size)
+        # A tile being read ahead takes memory too
+        self.max_tiles = max_bytes // self.tile_bytes - (1 if prefetch else 0)
+        if self.max_tiles < 1:
+            raise ValueError("The memory ceiling must hold at least one tile besides the prefetched one")
+        self.prefetch = prefetch
+        self.stats = TileStats()
+        self._tiles: 'OrderedDict[int, bytes]' = OrderedDict()
+        self._pending: Dict[int, Future] = {}
+        self._prefetcher: Optional[ThreadPoolExecutor] = None
+        # The tile of the last code read, checked before anything else
+        self._last_tile = -1
+        self._last_codes = b''
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.height, self.width
+
+    @property
+    def size(self) -> int:
+        return self.height * self.width
+
+    @property
+    def resident(self) -> int:
+        """Number of tiles in memory."""
+        return len(self._tiles)
+
+    @property
+    def resident_bytes(self) -> int:
+        return len(self._tiles) * self.tile_bytes
+
+    @property
+    def flat_codes(self) -> '_TileCodes':
+        """Terrain codes indexable by flat cell index, like `TerrainGrid.flat_codes`."""
+        return _TileCodes(self)
+
+    @property
+    def palette_weights(self) -> np.ndarray:
+        return np.array([weight for _, weight in self.palette], dtype=np.float64)
+
+    @property
+    def used_palette_weights(self) -> np.ndarray:
+        """The weights of the terrain codes that actually appear in the grid."""
+        return self.palette_weights[np.flatnonzero(np.asarray(self.code_counts))]
+
+    @property
+    def has_connectivity(self) -> bool:
+        # Labelling components reads every cell, which is what tiling avoids
+        return False
+
+    def contains(self, position: Position) -> bool:
+        return 0 <= position.x < self.height and 0 <= position.y < self.width
+
+    def index(self, position: Position) -> int:
+        """Return the flat cell index of a position."""
+        return position.x * self.width + position.y
+
+    def position(self, index: int) -> Position:
+        """Return the position of a flat cell index."""
+        return Position.interned(*divmod(index, self.width))
+
+    def node_at(self, index: int) -> Node:
+        """Build the `Node` object of a flat cell index."""
+        x, y = divmod(index, self.width)
+        node_type, weight = self.palette[self.code(index)]
+        return node_type(weight=weight, position=Position.interned(x, y))
+
+    def neighbors(self, index: int, directions: Sequence[Position]) -> List[Tuple[int, int]]:
+        """
+        List the in-bounds neighbours of a cell.
+
+        Args:
+            index (int): The flat cell index.
+            directions (Sequence[Position]): The movement offsets to try.
+
+        Returns:
+            List[Tuple[int, int]]: (neighbour index, direction number) pairs.
+        """
+        height, width = self.height, self.width
+        x, y = divmod(index, width)
+        neighbors = []
+        for number, direction in enumerate(directions):
+            nx, ny = x + direction.x, y + direction.y
+            if 0 <= nx < height and 0 <= ny < width:
+                neighbors.append((nx * width + ny, number))
+        return neighbors
+
+    def code(self, index: int) -> int:
+        """The terrain code of a flat cell index, reading its tile when it is not resident."""
+        x, y = divmod(index, self.width)
+        tile_size = self.tile_size
+        tile_x, cell_x = divmod(x, tile_size)
+        tile_y, cell_y = divmod(y, tile_size)
+        tile = tile_x * self.tiles_across + tile_y
+        if tile != self._last_tile:
+            self._last_codes = self.tile(tile)
+            self._last_tile = tile
+        return self._last_codes[cell_x * tile_size + cell_y]
+
+    def tile(self, tile: int) -> bytes:
+        """
+        The codes of a tile, row-major, read from disk unless resident.
+
+        Args:
+            tile (int): The tile number, `tile_x * tiles_across + tile_y`.
+
+        Returns:
+            bytes: `tile_size * tile_size` codes. Cells past the grid's edge hold 0.
+        """
+        tiles = self._tiles
+        codes = tiles.get(tile)
+        if codes is not None:
+            tiles.move_to_end(tile)
+            self.stats.hits += 1
+            return codes
+        pending = self._pending.pop(tile, None)
+        if pending is not None:
+            codes = pending.result()
+            self.stats.prefetch_hits += 1
+        else:
+            codes = self.read_tile(tile)
+            self.stats.loads += 1
+        tiles[tile] = codes
+        while len(tiles) > self.max_tiles:
+            tiles.popitem(last=False)
+            self.stats.evictions += 1
+        if self.prefetch and self._last_tile >= 0:
+            self.prefetch_after(self._last_tile, tile)
+        return codes
+
+    def prefetch_after(self, previous: int, tile: int):
+        # Read the tile one step further in the direction the search moved
+        previous_x, previous_y = divmod(previous, self.tiles_across)
+        tile_x, tile_y = divmod(tile, self.tiles_across)
+        next_x, next_y = 2 * tile_x - previous_x, 2 * tile_y - previous_y
+        tiles_down = -(-self.height // self.tile_size)
+        if not (0 <= next_x < tiles_down and 0 <= next_y < self.tiles_across):
+            return
+        upcoming = next_x * self.tiles_across + next_y
+        if upcoming in self._tiles or upcoming in self._pending or self._pending:
+            return  # Resident, on its way, or another read ahead still runs
+        if self._prefetcher is None:
+            self._prefetcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix='tile-prefetch')
+        self._pending[upcoming] = self._prefetcher.submit(self.read_tile, upcoming)
+        self.stats.prefetches += 1
+
+    def read_tile(self, tile: int) -> bytes:
+        # Every read opens the file, so the prefetch thread never shares a file position
+        with open(self.path, 'rb') as file:
+            file.seek(self.data_offset + tile * self.tile_bytes)
+            codes = file.read(self.tile_bytes)
+        if len(codes) != self.tile_bytes:
+            raise ValueError("Truncated tiled grid file")
+        return codes
+
+    def clear(self):
+        """Drop every resident tile."""
+        self._tiles.clear()
+        self._last_tile, self._last_codes = -1, b''
+
+    def close(self):
+        """Stop the prefetch thread and drop every resident tile."""
+        if self._prefetcher is not None:
+            self._prefetcher.shutdown(cancel_futures=True)
+            self._prefetcher = None
+        self._pending.clear()
+        self.clear()
+
+    def __enter__(self) -> 'TiledGrid':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+@dataclass(slots=True, eq=False)
+class _TileCodes:
+    # The `flat_codes` of a `TiledGrid`
+    grid: TiledGrid
+
+    def __getitem__(self, index: int) -> int:
+        return self.grid.code(index)
+
+    def __len__(self) -> int:
+        return self.grid.size
@@ -0,0 +1,33 @@
+import math
+
+import numpy as np
+
+from fuel_efficency.algorithms.cost_model import CostModel
+from fuel_efficency.entities.terrain_grid import DEFAULT_PALETTE, Grid, TerrainGrid, as_terrain_grid
+from fuel_efficency.entities.valley import Valley
+
+# The default terrain types plus an impassable one, whose code is WALL
+WALLED_PALETTE = DEFAULT_PALETTE + ((Valley, math.inf),)
+WALL = len(DEFAULT_PALETTE)
+
+
+def create_random_terrain(height: int, width: int, seed: int, impassable: float = 0.0) -> TerrainGrid:
+    # Uniformly random default terrain, with about `impassable` of the cells walled off
+    rng = np.random.default_rng(seed)
+    codes = rng.integers(0, WALL, (height, width))
+    if impassable:
+        codes[rng.random((height, width)) < impassable] = WALL
+    return TerrainGrid(codes.astype(np.uint8), WALLED_PALETTE)
+
+
+def path_cost(grid: Grid, start, path, cost_model: CostModel) -> float:
+    # Steps are priced with the weights of the grid cells, whatever node objects the path holds
+    steps = [start] + list(path)
+    weights = as_terrain_grid(grid).weights
+    return sum(
+        cost_model.edge_cost(
+            weights[a.position.x, a.position.y], weights[b.position.x, b.position.y],
+            math.dist((a.position.x, a.position.y), (b.position.x, b.position.y)),
+        )
+        for a, b in zip(steps, steps[1:])
+    )
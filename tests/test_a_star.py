@@ -0,0 +1,69 @@
+import random
+
+import numpy as np
+import pytest
+
+from fuel_efficency.algorithms.a_star import AStarStrategy
+from fuel_efficency.algorithms.cost_model import DistanceCostModel, WeightedCostModel
+from fuel_efficency.algorithms.dijkstra import DijkstraStrategy
+from fuel_efficency.algorithms.landmarks import landmark_distances
+from fuel_efficency.entities.position import Position
+from fuel_efficency.entities.terrain_grid import TerrainGrid
+from fuel_efficency.entities.valley import Valley
+from tests.helpers import create_random_terrain, path_cost
+
+
+@pytest.mark.parametrize("side", [1, 2, 5, 40])
+def test_astar_path_is_shortest(side: int):
+    terrain = TerrainGrid.filled(side, side)
+    rng = random.Random(side)
+    for _ in range(10):
+        start = Position(rng.randrange(side), rng.randrange(side))
+        end = Position(rng.randrange(side), rng.randrange(side))
+
+        path = AStarStrategy.find_path(terrain, Valley(position=start), Valley(position=end))
+
+        assert len(path) == abs(start.x - end.x) + abs(start.y - end.y)
+        if path:
+            assert path[-1].position == end
+        steps = [start] + [node.position for node in path]
+        assert all(abs(a.x - b.x) + abs(a.y - b.y) == 1 for a, b in zip(steps, steps[1:]))
+
+
+def test_astar_large_grid_finishes():
+    terrain = TerrainGrid.filled(300, 300)
+
+    path = AStarStrategy.find_path(terrain, Valley(position=Position(0, 0)), Valley(position=Position(299, 299)))
+
+    assert len(path) == 598
+
+
+@pytest.mark.parametrize("cost_model", [DistanceCostModel(), WeightedCostModel()])
+def test_astar_path_costs_match_exact_distances(cost_model):
+    # Ties may pick any of several shortest paths, so only the cost is compared
+    rng = np.random.default_rng(7)
+    for seed in range(20):
+        terrain = create_random_terrain(15, 15, seed, impassable=0.2)
+        passable = np.flatnonzero(terrain.passable)
+        source, target = rng.choice(passable, 2).tolist()
+        cost_table = cost_model.compile(terrain.palette_weights, AStarStrategy.step_lengths)
+        exact = landmark_distances(terrain, cost_table, AStarStrategy.allowed_directions, source, False)[target]
+        start, end = terrain.node_at(source), terrain.node_at(target)
+
+        path = AStarStrategy.find_path(terrain, start, end, cost_model=cost_model)
+
+        if np.isinf(exact):
+            assert path == []
+        else:
+            assert path_cost(terrain, start, path, cost_model) == pytest.approx(exact)
+
+
+@pytest.mark.parametrize("strategy, keeps_start", [(AStarStrategy, True), (DijkstraStrategy, False)])
+def test_reconstruct_path_still_takes_nodes(strategy, keeps_start):
+    grid = TerrainGrid.filled(1, 3).to_nodes()
+    start, middle, end = grid[0]
+
+    path = strategy.reconstruct_path({middle: start, end: middle}, start, end)
+
+    assert path == ([start] if keeps_start else []) + [middle, end]
+    assert strategy.reconstruct_indices({1: 0, 2: 1}, 0, 2) == ([0] if keeps_start else []) + [1, 2]
@@ -0,0 +1,163 @@
+import asyncio
+import time
+
+import pytest
+
+from fuel_efficency.algorithms.async_router import AsyncRouter, RouterBusy
+from fuel_efficency.algorithms.context import Context
+from fuel_efficency.algorithms.cost_model import WeightedCostModel
+from fuel_efficency.algorithms.dijkstra import DijkstraStrategy
+from fuel_efficency.entities.grid_file import save_grid
+from fuel_efficency.entities.position import Position
+from fuel_efficency.entities.terrain_grid import TerrainGrid
+from fuel_efficency.entities.up_hill import UpHill
+from fuel_efficency.entities.valley import Valley
+
+
+class SlowStrategy(DijkstraStrategy):
+    # Dijkstra that takes its time, to keep searches in flight while the test looks at them
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    def find_path(self, grid, start, end, **options):
+        time.sleep(self.delay)
+        return DijkstraStrategy.find_path(grid, start, end, **options)
+
+
+def create_hill_grid():
+    grid = [[Valley(position=Position(x, y)) for y in range(10)] for x in range(10)]
+    for x in range(1, 9):
+        grid[x][5] = UpHill(position=Position(x, 5))
+    return grid
+
+
+def test_paths_match_context():
+    grid = create_hill_grid()
+    queries = [(grid[0][0], grid[9][9]), (grid[4][0], grid[4][9]), (grid[9][0], grid[0][9])]
+
+    async def route():
+        async with AsyncRouter(grid, cost_model=WeightedCostModel(), workers=2) as router:
+            return await asyncio.gather(*(router.find_path(start, end) for start, end in queries))
+
+    paths = asyncio.run(route())
+
+    for (start, end), path in zip(queries, paths):
+        expected = Context(_grid=grid, _start=start, _end=end, _cost_model=WeightedCostModel()).run()
+        assert path == expected
+        # List-of-lists grids get their own nodes back
+        assert all(node is grid[node.position.x][node.position.y] for node in path)
+
+
+def test_grid_file_is_loaded_by_workers(tmp_path):
+    terrain = TerrainGrid.from_nodes(create_hill_grid())
+    save_grid(tmp_path / 'grid.bin', terrain)
+
+    async def route():
+        async with AsyncRouter(tmp_path / 'grid.bin') as router:
+            return await router.find_path(terrain.node_at(0), terrain.node_at(99))
+
+    assert asyncio.run(route()) == DijkstraStrategy.find_path(terrain, terrain.node_at(0), terrain.node_at(99))
+
+
+def test_off_grid_query_returns_empty_path():
+    async def route():
+        async with AsyncRouter(TerrainGrid.filled(3, 3)) as router:
+            return await router.find_path(Valley(position=Position(0, 0)), Valley(position=Position(5, 5)))
+
+    assert asyncio.run(route()) == []
+
+
+def test_identical_queries_are_coalesced():
+    terrain = TerrainGrid.filled(5, 5)
+    start, end = terrain.node_at(0), terrain.node_at(24)
+
+    async def route():
+        async with AsyncRouter(terrain, SlowStrategy(0.2), max_pending=1) as router:
+            first = asyncio.ensure_future(router.find_path(start, end))
+            second = asyncio.ensure_future(router.find_path(start, end))
+            await asyncio.sleep(0.05)
+            pending = router.pending
+            paths = await asyncio.gather(first, second)
+            return pending, paths, router.pending
+
+    pending, (first, second), pending_after = asyncio.run(route())
+
+    assert pending == 1
+    assert first == second == DijkstraStrategy.find_path(terrain, start, end)
+    assert pending_after == 0
+
+
+def test_full_router_turns_queries_away():
+    terrain = TerrainGrid.filled(5, 5)
+
+    async def route():
+        async with AsyncRouter(terrain, SlowStrategy(0.2), max_pending=1) as router:
+            first = asyncio.ensure_future(router.find_path(terrain.node_at(0), terrain.node_at(24)))
+            await asyncio.sleep(0)
+            with pytest.raises(RouterBusy):
+                await router.find_path(terrain.node_at(0), terrain.node_at(4))
+            await first
+            # The slot is free again once the first search is done
+            return await router.find_path(terrain.node_at(0), terrain.node_at(4))
+
+    assert len(asyncio.run(route())) == 4
+
+
+def test_timeout_frees_the_slot():
+    terrain = TerrainGrid.filled(5, 5)
+
+    async def route():
+        async with AsyncRouter(terrain, SlowStrategy(0.5), timeout=0.05) as router:
+            with pytest.raises(asyncio.TimeoutError):
+                await router.find_path(terrain.node_at(0), terrain.node_at(24))
+            return router.pending
+
+    assert asyncio.run(route()) == 0
+
+
+def test_cancelling_one_caller_keeps_the_search_for_the_others():
+    terrain = TerrainGrid.filled(5, 5)
+    start, end = terrain.node_at(0), terrain.node_at(24)
+
+    async def route():
+        async with AsyncRouter(terrain, SlowStrategy(0.2)) as router:
+            first = asyncio.ensure_future(router.find_path(start, end))
+            second = asyncio.ensure_future(router.find_path(start, end))
+            await asyncio.sleep(0.05)
+            first.cancel()
+            path = await second
+            with pytest.raises(asyncio.CancelledError):
+                await first
+
+            # With no caller left, the search is dropped
+            third = asyncio.ensure_future(router.find_path(start, terrain.node_at(4)))
+            await asyncio.sleep(0)
+            third.cancel()
+            await asyncio.gather(third, return_exceptions=True)
+            return path, router.pending
+
+    path, pending = asyncio.run(route())
+
+    assert len(path) == 4
+    assert pending == 0
+
+
+def test_closed_router_refuses_queries():
+    async def route():
+        router = AsyncRouter(TerrainGrid.filled(3, 3))
+        await router.close()
+        await router.find_path(Valley(position=Position(0, 0)), Valley(position=Position(2, 2)))
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(route())
+
+
+@pytest.mark.parametrize("options", [dict(workers=0), dict(max_pending=0), dict(timeout=0)])
+def test_invalid_options_raise(options):
+    with pytest.raises(ValueError):
+        AsyncRouter(TerrainGrid.filled(3, 3), **options)
+
+
+def test_invalid_strategy_raises():
+    with pytest.raises(TypeError):
+        AsyncRouter(TerrainGrid.filled(3, 3), "dijkstra")
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from fuel_efficency.algorithms.batch import route_groups
+from fuel_efficency.algorithms.context import Context
+from fuel_efficency.algorithms.cost_model import WeightedCostModel
+from fuel_efficency.algorithms.dijkstra import DijkstraStrategy
+from fuel_efficency.entities.position import Position
+from fuel_efficency.entities.terrain_grid import TerrainGrid
+from fuel_efficency.entities.valley import Valley
+from tests.helpers import create_random_terrain
+
+
+def create_pairs(height: int, width: int, count: int, sources: int, seed: int):
+    rng = np.random.default_rng(seed)
+    starts = [Valley(position=Position(int(rng.integers(height)), int(rng.integers(width)))) for _ in range(sources)]
+    return [
+        (starts[int(rng.integers(sources))], Valley(position=Position(int(rng.integers(height)), int(rng.integers(width)))))
+        for _ in range(count)
+    ]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_run_batch_matches_run(workers: int):
+    terrain = TerrainGrid(np.random.default_rng(3).integers(0, 4, (20, 30)).astype(np.uint8))
+    pairs = create_pairs(20, 30, count=25, sources=4, seed=workers)
+    pairs.append((Valley(position=Position(0, 0)), Valley(position=Position(50, 50))))  # Off the grid
+    context = Context(_strategy=DijkstraStrategy(), _grid=terrain, _cost_model=WeightedCostModel())
+
+    paths = context.run_batch(pairs, workers=workers)
+
+    assert len(paths) == len(pairs)
+    assert paths[-1] == []
+    for (start, end), path in zip(pairs, paths):
+        expected = DijkstraStrategy.find_path(terrain, start, end, cost_model=WeightedCostModel())
+        assert [node.position for node in path] == [node.position for node in expected]
+
+
+def test_run_batch_returns_list_grid_nodes():
+    grid = [[Valley(position=Position(x, y)) for y in range(3)] for x in range(3)]
+    context = Context(_grid=grid)
+
+    paths = context.run_batch([(grid[0][0], grid[2][2]), (grid[0][0], grid[0][0])])
+
+    assert paths[0][0] is grid[1][1] and paths[0][1] is grid[2][2]
+    assert paths[1] == []
+
+
+def test_route_groups_in_workers_match_serial():
+    # Workers map the codes of a walled grid, unreachable targets included
+    terrain = create_random_terrain(25, 25, seed=5, impassable=0.3)
+    cost_table = WeightedCostModel().compile(terrain.palette_weights, DijkstraStrategy.step_lengths)
+    rng = np.random.default_rng(5)
+    groups = [(int(source), rng.integers(0, terrain.size, 6).tolist()) for source in rng.integers(0, terrain.size, 5)]
+
+    parallel = route_groups(terrain, cost_table, groups, workers=2)
+
+    assert parallel == route_groups(terrain, cost_table, groups)
+    assert any(path is None for answers in parallel for path in answers)
@@ -0,0 +1,48 @@
+import json
+
+import numpy as np
+
+from benchmarks import compare, suite
+
+
+def test_terrain_and_queries_are_reproducible():
+    first, second = suite.generate_terrain(40, 'hilly', seed=3), suite.generate_terrain(40, 'hilly', seed=3)
+
+    assert np.array_equal(first.codes, second.codes)
+    assert first.shape == (40, 40)
+    assert suite.generate_queries(40, 3, seed=3) == suite.generate_queries(40, 3, seed=3)
+
+
+def test_heap_counting_is_restored_afterwards():
+    terrain = suite.generate_terrain(8, 'flat', seed=0)
+    start, end = suite.generate_queries(8, 1, seed=0)[0]
+    record = suite.measure('dijkstra', terrain, start, end, suite.COST_MODELS['weighted'])
+
+    assert record['heap_pushes'] > 0 and record['heap_pops'] >= record['nodes_expanded'] > 0
+    assert suite.sys.modules['fuel_efficency.algorithms.dijkstra'].heapq is suite.heapq
+
+
+def test_counts_a_strategy_cannot_report_are_left_out():
+    terrain = suite.generate_terrain(16, 'hilly', seed=0)
+    start, end = suite.generate_queries(16, 1, seed=0)[0]
+    bucketed = suite.measure('dijkstra_bucketed', terrain, start, end, suite.COST_MODELS['weighted'])
+    bidirectional = suite.measure('bidirectional', terrain, start, end, suite.COST_MODELS['weighted'])
+    context = suite.measure('context', terrain, start, end, suite.COST_MODELS['weighted'])
+
+    assert bucketed['nodes_expanded'] > 0 and bucketed['heap_pushes'] is bucketed['heap_pops'] is None
+    assert bidirectional['nodes_expanded'] is None and bidirectional['heap_pops'] > 0
+    assert context['nodes_expanded'] > 0
+
+
+def test_suite_writes_comparable_results(tmp_path, capsys):
+    baseline, candidate = tmp_path / 'baseline.json', tmp_path / 'candidate.json'
+    arguments = ['--sizes', '16', '--mixes', 'flat', '--strategies', 'dijkstra', 'dijkstra_bucketed', '--queries', '2', '--repeat', '1']
+    suite.main(arguments + ['--output', str(baseline)])
+    suite.main(arguments + ['--output', str(candidate)])
+
+    results = json.loads(baseline.read_text())['results']
+    assert len(results) == 4
+    assert {'wall_time', 'nodes_expanded', 'heap_pushes', 'heap_pops', 'peak_memory_bytes'} <= results[0].keys()
+    assert compare.main([str(baseline), str(candidate), '--threshold', '1e9']) == 0
+    output = capsys.readouterr().out
+    assert 'dijkstra_bucketed' in output and 'n/a' in output
@@ -0,0 +1,51 @@
+import math
+
+import numpy as np
+import pytest
+
+from fuel_efficency.algorithms.a_star import AStarStrategy
+from fuel_efficency.algorithms.bidirectional import BidirectionalStrategy
+from fuel_efficency.algorithms.context import Context
+from fuel_efficency.algorithms.cost_model import DistanceCostModel, SlopeCostModel, WeightedCostModel
+from fuel_efficency.algorithms.dijkstra import DijkstraStrategy
+from fuel_efficency.entities.position import Position
+from fuel_efficency.entities.terrain_grid import TerrainGrid
+from fuel_efficency.entities.valley import Valley
+from tests.helpers import create_random_terrain, path_cost
+
+
+@pytest.mark.parametrize("reference", [DijkstraStrategy, AStarStrategy])
+@pytest.mark.parametrize("heuristic", [False, True])
+@pytest.mark.parametrize("cost_model", [DistanceCostModel(), WeightedCostModel(), SlopeCostModel()])
+def test_bidirectional_matches_reference_cost(reference, heuristic: bool, cost_model):
+    directions = reference.cardinal_directions if reference is DijkstraStrategy else reference.allowed_directions
+    strategy = BidirectionalStrategy(directions, heuristic=heuristic)
+    rng = np.random.default_rng(7)
+    for seed in range(6):
+        terrain = create_random_terrain(14, 17, seed, impassable=0.15)
+        start = Valley(position=Position(int(rng.integers(14)), int(rng.integers(17))))
+        end = Valley(position=Position(int(rng.integers(14)), int(rng.integers(17))))
+
+        expected = reference.find_path(terrain, start, end, cost_model=cost_model)
+        path = strategy.find_path(terrain, start, end, cost_model=cost_model)
+
+        assert (path == []) == (expected == [])
+        if path:
+            assert path[-1] == end
+            assert path_cost(terrain, start, path, cost_model) == pytest.approx(path_cost(terrain, start, expected, cost_model))
+
+
+def test_bidirectional_same_start_and_end():
+    terrain = TerrainGrid.filled(3, 3)
+    node = Valley(position=Position(1, 1))
+
+    assert BidirectionalStrategy().find_path(terrain, node, node) == []
+
+
+def test_bidirectional_swaps_into_context():
+    grid = [[Valley(position=Position(x, y)) for y in range(3)] for x in range(3)]
+    context = Context(_strategy=BidirectionalStrategy(), _grid=grid, _start=grid[0][0], _end=grid[2][2])
+
+    assert context.run() == [grid[1][1], grid[2][2]]
+    assert len(context.strategy.get_neighbors(grid, grid[0][0])) == 3
+    assert context.strategy.calculate_distance(grid[0][0], grid[1][1]) == pytest.approx(math.sqrt(2))
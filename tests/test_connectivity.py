@@ -0,0 +1,126 @@
+from collections import deque
+
+import numpy as np
+import pytest
+
+from fuel_efficency.algorithms.a_star import AStarStrategy
+from fuel_efficency.algorithms.context import Context
+from fuel_efficency.algorithms.dijkstra import DijkstraStrategy
+from fuel_efficency.entities.connectivity import ConnectivityIndex, label_components
+from fuel_efficency.entities.position import Position
+from fuel_efficency.entities.terrain_grid import TerrainGrid
+from tests.helpers import WALL, WALLED_PALETTE
+
+
+def flood_labels(passable: np.ndarray):
+    # Reference labelling, one breadth-first flood per component
+    height, width = passable.shape
+    labels = np.full((height, width), -1)
+    count = 0
+    for x in range(height):
+        for y in range(width):
+            if not passable[x, y] or labels[x, y] >= 0:
+                continue
+            labels[x, y] = count
+            queue = deque([(x, y)])
+            while queue:
+                cx, cy = queue.popleft()
+                for nx in range(max(cx - 1, 0), min(cx + 2, height)):
+                    for ny in range(max(cy - 1, 0), min(cy + 2, width)):
+                        if passable[nx, ny] and labels[nx, ny] < 0:
+                            labels[nx, ny] = count
+                            queue.append((nx, ny))
+            count += 1
+    return labels, count
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_labels_match_flood_fill(seed: int):
+    rng = np.random.default_rng(seed)
+    passable = rng.random(tuple(rng.integers(1, 20, 2))) < rng.random()
+
+    labels, count = label_components(passable)
+    expected, expected_count = flood_labels(passable)
+
+    assert count == expected_count
+    assert np.array_equal(labels, expected)
+
+
+def test_diagonal_cells_are_connected():
+    passable = np.eye(4, dtype=bool)
+
+    labels, count = label_components(passable)
+
+    assert count == 1
+    assert labels.tolist()[3] == [-1, -1, -1, 0]
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_updates_match_a_fresh_index(seed: int):
+    rng = np.random.default_rng(seed)
+    passable = rng.random((10, 12)) < 0.6
+    index = ConnectivityIndex(passable)
+    for _ in range(15):
+        cells = rng.choice(passable.size, 3, replace=False).tolist()
+        opened = [cell for cell in cells if not passable.flat[cell]]
+        closed = [cell for cell in cells if passable.flat[cell]]
+        passable.flat[cells] = ~passable.flat[cells]
+
+        index.update(opened, closed)
+
+        expected, count = flood_labels(passable)
+        assert index.component_count == count
+        components = [index.component(cell) for cell in range(passable.size)]
+        # Both labellings split the cells the same way
+        pairs = set(zip(expected.ravel().tolist(), components))
+        assert all((label < 0) == (component < 0) for label, component in pairs)
+        assert len(pairs) == len({label for label, _ in pairs}) == len({component for _, component in pairs})
+        for cell, other in rng.integers(0, passable.size, (20, 2)).tolist():
+            assert index.connected(cell, other) == (expected.flat[cell] >= 0 and expected.flat[cell] == expected.flat[other])
+
+
+def create_walled_terrain() -> TerrainGrid:
+    # A wall across the grid, with a one cell gap at its top end
+    codes = np.zeros((8, 8), dtype=np.uint8)
+    codes[1:, 4] = WALL
+    return TerrainGrid(codes, WALLED_PALETTE)
+
+
+def test_set_cells_keeps_the_index_up_to_date():
+    terrain = create_walled_terrain()
+    left, right = terrain.index(Position(7, 0)), terrain.index(Position(7, 7))
+    assert terrain.connectivity.connected(left, right)
+
+    terrain.set_cells({Position(0, 4): WALL})
+    assert not terrain.connectivity.connected(left, right)
+
+    # Terrain changes between passable types leave the index alone
+    terrain.set_cells({Position(3, 1): 2})
+    terrain.set_cells({Position(5, 4): 1})
+    assert terrain.connectivity.connected(left, right)
+    assert terrain.connectivity.component_count == 1
+
+
+@pytest.mark.parametrize("strategy", [DijkstraStrategy(), AStarStrategy()])
+def test_context_answers_unreachable_queries_without_searching(strategy):
+    terrain = create_walled_terrain()
+    terrain.set_cells({Position(0, 4): WALL})
+    context = Context(_strategy=strategy, _grid=terrain, _start=terrain.node_at(0), _end=terrain.node_at(63), _collect_stats=True)
+
+    assert context.run() == []
+    assert context.last_stats.nodes_expanded > 0  # The index was never built
+
+    terrain.connectivity
+    assert context.run() == []
+    assert context.last_stats.nodes_expanded == 0
+
+    terrain.set_cells({Position(0, 4): 0})
+    assert len(context.run()) > 0
+
+
+def test_index_is_not_built_until_asked_for():
+    terrain = create_walled_terrain()
+
+    assert not terrain.has_connectivity
+    assert terrain.connectivity.component_count == 1
+    assert terrain.has_connectivity
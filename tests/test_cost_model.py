@@ -0,0 +1,125 @@
+import heapq
+import math
+import random
+
+import pytest
+
+from fuel_efficency.algorithms.a_star import AStarStrategy
+from fuel_efficency.algorithms.context import Context
+from fuel_efficency.algorithms.cost_model import CostModel, DistanceCostModel, SlopeCostModel, WeightedCostModel
+from fuel_efficency.algorithms.dijkstra import DijkstraStrategy
+from fuel_efficency.entities.down_hill import DownHill
+from fuel_efficency.entities.plateau import Plateau
+from fuel_efficency.entities.position import Position
+from fuel_efficency.entities.terrain_grid import TerrainGrid
+from fuel_efficency.entities.up_hill import UpHill
+from fuel_efficency.entities.valley import Valley
+from tests.helpers import path_cost
+
+
+def create_random_terrain_grid(height: int, width: int, seed: int):
+    rng = random.Random(seed)
+    kinds = [Valley, Plateau, UpHill, DownHill]
+    return [[rng.choice(kinds)(position=Position(x, y)) for y in range(width)] for x in range(height)]
+
+
+def reference_cost(grid, start, end, directions, cost_model: CostModel) -> float:
+    # Plain node-level Dijkstra used as ground truth
+    best = {start.position: 0.0}
+    queue = [(0.0, start.position.x, start.position.y)]
+    while queue:
+        cost, x, y = heapq.heappop(queue)
+        if (x, y) == (end.position.x, end.position.y):
+            return cost
+        for direction in directions:
+            nx, ny = x + direction.x, y + direction.y
+            if 0 <= nx < len(grid) and 0 <= ny < len(grid[0]):
+                length = math.hypot(direction.x, direction.y)
+                new_cost = cost + cost_model.edge_cost(grid[x][y].weight, grid[nx][ny].weight, length)
+                if new_cost < best.get(Position(nx, ny), math.inf):
+                    best[Position(nx, ny)] = new_cost
+                    heapq.heappush(queue, (new_cost, nx, ny))
+    return math.inf
+
+
+def test_compile_builds_lookup_table():
+    table = WeightedCostModel().compile([1.0, 2.0], [1.0, math.sqrt(2)])
+
+    assert table[0][0] == [1.0, 2.0]
+    assert table[1][1] == pytest.approx([math.sqrt(2), 2 * math.sqrt(2)])
+
+
+def test_impassable_cells_cost_infinity():
+    table = DistanceCostModel().compile([1.0, math.inf], [1.0])
+
+    assert table[0][0] == [1.0, math.inf]
+    assert table[1][0] == [math.inf, math.inf]
+    assert DistanceCostModel().unit_lower_bound([1.0, math.inf]) == 1.0
+
+
+def test_slope_cost_is_asymmetric():
+    model = SlopeCostModel(climb_factor=1.0, descent_factor=0.5)
+
+    assert model.edge_cost(1.0, 2.0, 1.0) == 3.0
+    assert model.edge_cost(2.0, 1.0, 1.0) == 0.5
+    assert model.unit_lower_bound([1.0, 2.0]) == 0.5
+    assert model.unit_lower_bound([0.5, 2.0]) == 0.0
+
+
+def test_negative_cost_rejected():
+    class Refund(CostModel):
+        def edge_cost(self, source_weight, target_weight, length):
+            return -length
+
+    with pytest.raises(ValueError):
+        Refund().compile([1.0], [1.0])
+
+
+def test_weighted_dijkstra_goes_around_uphill():
+    grid = [[Valley(position=Position(x, y)) for y in range(3)] for x in range(3)]
+    grid[1][1] = UpHill(position=Position(1, 1))
+
+    shortest = DijkstraStrategy.find_path(grid, grid[1][0], grid[1][2])
+    cheapest = DijkstraStrategy.find_path(grid, grid[1][0], grid[1][2], cost_model=WeightedCostModel())
+
+    assert grid[1][1] in shortest
+    assert grid[1][1] not in cheapest
+
+
+@pytest.mark.parametrize("strategy, directions", [
+    (DijkstraStrategy, DijkstraStrategy.cardinal_directions),
+    (AStarStrategy, AStarStrategy.allowed_directions),
+])
+@pytest.mark.parametrize("cost_model", [WeightedCostModel(), SlopeCostModel()])
+@pytest.mark.parametrize("seed", range(4))
+def test_strategies_find_cheapest_path(strategy, directions, cost_model, seed):
+    grid = create_random_terrain_grid(9, 12, seed)
+    start, end = grid[0][seed], grid[8][11 - seed]
+
+    path = strategy.find_path(TerrainGrid.from_nodes(grid), start, end, cost_model=cost_model)
+
+    assert path[-1] == end
+    assert path_cost(grid, start, path, cost_model) == pytest.approx(reference_cost(grid, start, end, directions, cost_model))
+
+
+def test_impassable_cells_are_avoided():
+    grid = [[Valley(position=Position(x, y)) for y in range(3)] for x in range(3)]
+    for y in range(2):
+        grid[1][y] = Valley(weight=math.inf, position=Position(1, y))
+
+    path = AStarStrategy.find_path(grid, grid[0][0], grid[2][0])
+
+    assert [node.position for node in path] == [Position(0, 1), Position(0, 2), Position(1, 2), Position(2, 2), Position(2, 1), Position(2, 0)]
+
+
+def test_context_passes_cost_model():
+    grid = [[Valley(position=Position(x, y)) for y in range(3)] for x in range(3)]
+    grid[1][1] = UpHill(position=Position(1, 1))
+    context = Context(_strategy=DijkstraStrategy(), _grid=grid, _start=grid[1][0], _end=grid[1][2])
+
+    context.cost_model = WeightedCostModel()
+
+    assert grid[1][1] not in context.run()
+    with pytest.raises(TypeError) as excinfo:
+        context.cost_model = "not a cost model"
+    assert "Cost model must be an instance of CostModel" in str(excinfo.value)
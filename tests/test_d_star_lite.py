@@ -0,0 +1,101 @@
+import math
+
+import numpy as np
+import pytest
+
+from fuel_efficency.algorithms.context import Context
+from fuel_efficency.algorithms.cost_model import DistanceCostModel, SlopeCostModel, WeightedCostModel
+from fuel_efficency.algorithms.d_star_lite import DStarLiteStrategy
+from fuel_efficency.algorithms.dijkstra import DijkstraStrategy
+from fuel_efficency.entities.down_hill import DownHill
+from fuel_efficency.entities.position import Position
+from fuel_efficency.entities.terrain_grid import TerrainGrid
+from fuel_efficency.entities.up_hill import UpHill
+from fuel_efficency.entities.valley import Valley
+from tests.helpers import WALLED_PALETTE, path_cost
+
+CHANGES = [
+    lambda position: Valley(position=position),
+    lambda position: UpHill(position=position),
+    lambda position: DownHill(position=position),
+    lambda position: Valley(weight=math.inf, position=position),
+    lambda position: UpHill(weight=float(5), position=position),
+]
+
+
+@pytest.mark.parametrize("cost_model", [DistanceCostModel(), WeightedCostModel(), SlopeCostModel()])
+@pytest.mark.parametrize("list_grid", [False, True])
+def test_replanning_matches_dijkstra_after_changes_and_moves(cost_model, list_grid: bool):
+    rng = np.random.default_rng(2)
+    for seed in range(10):
+        height, width = int(rng.integers(1, 15)), int(rng.integers(1, 15))
+        codes = rng.integers(0, 5, (height, width)).astype(np.uint8)
+        terrain = TerrainGrid(codes, WALLED_PALETTE)
+        grid = terrain.to_nodes() if list_grid else terrain
+        strategy = DStarLiteStrategy()
+        position = Position(int(rng.integers(height)), int(rng.integers(width)))
+        end = Valley(position=Position(int(rng.integers(height)), int(rng.integers(width))))
+
+        for step in range(6):
+            start = Valley(position=position)
+            path = strategy.find_path(grid, start, end, cost_model=cost_model)
+            current = TerrainGrid(strategy.terrain.codes.copy(), strategy.terrain.palette)
+            expected = DijkstraStrategy.find_path(current, start, end, cost_model=cost_model)
+
+            assert (path == []) == (expected == [])
+            if path:
+                assert path[-1] == end
+                assert path_cost(current, start, path, cost_model) == pytest.approx(path_cost(current, start, expected, cost_model))
+                if step % 2:
+                    position = path[0].position  # The vehicle advances one cell
+            strategy.update_cells(
+                CHANGES[rng.integers(len(CHANGES))](Position(int(rng.integers(height)), int(rng.integers(width))))
+                for _ in range(int(rng.integers(1, 4)))
+            )
+
+
+def test_replanning_repairs_less_than_a_fresh_search():
+    terrain = TerrainGrid(np.zeros((60, 60), dtype=np.uint8))
+    strategy = DStarLiteStrategy()
+    start, end = Valley(position=Position(0, 30)), Valley(position=Position(59, 30))
+    strategy.find_path(terrain, start, end, cost_model=WeightedCostModel())
+    fresh_expansions = strategy.expansions
+
+    strategy.update_cells([UpHill(position=Position(50, y)) for y in range(25, 28)])
+    path = strategy.find_path(terrain, start, end, cost_model=WeightedCostModel())
+
+    assert 0 < strategy.expansions < fresh_expansions
+    assert path == DijkstraStrategy.find_path(terrain, start, end, cost_model=WeightedCostModel())
+
+
+def test_moving_start_reuses_the_search():
+    terrain = TerrainGrid.filled(20, 20)
+    strategy = DStarLiteStrategy()
+    end = Valley(position=Position(19, 19))
+    path = strategy.find_path(terrain, Valley(position=Position(0, 0)), end)
+
+    assert strategy.find_path(terrain, path[0], end) == path[1:]
+    assert strategy.expansions == 0
+
+
+def test_update_cells_writes_list_grids():
+    grid = [[Valley(position=Position(x, y)) for y in range(3)] for x in range(3)]
+    strategy = DStarLiteStrategy()
+    strategy.find_path(grid, grid[0][0], grid[2][2])
+    wall = UpHill(weight=math.inf, position=Position(1, 1))
+
+    assert strategy.update_cells([wall]) == [4]
+    assert grid[1][1] is wall
+    assert Position(1, 1) not in [node.position for node in strategy.find_path(grid, grid[0][0], grid[2][2])]
+
+
+def test_update_cells_needs_a_search_first():
+    with pytest.raises(ValueError):
+        DStarLiteStrategy().update_cells([Valley(position=Position(0, 0))])
+
+
+def test_d_star_lite_in_context():
+    grid = [[Valley(position=Position(x, y)) for y in range(3)] for x in range(3)]
+    context = Context(_strategy=DStarLiteStrategy(), _grid=grid, _start=grid[0][0], _end=grid[2][2])
+
+    assert context.run() == [grid[1][1], grid[2][2]]
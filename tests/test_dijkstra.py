@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from fuel_efficency.algorithms.cost_model import DistanceCostModel, SlopeCostModel, WeightedCostModel
+from fuel_efficency.algorithms.dijkstra import DijkstraStrategy
+from fuel_efficency.entities.position import Position
+from fuel_efficency.entities.terrain_grid import TerrainGrid
+from fuel_efficency.entities.valley import Valley
+from tests.helpers import create_random_terrain, path_cost
+
+
+@pytest.mark.parametrize("height, width", [(1, 1), (1, 9), (9, 1), (7, 11), (150, 20)])
+@pytest.mark.parametrize("cost_model", [DistanceCostModel(), WeightedCostModel(), SlopeCostModel()])
+def test_vectorized_matches_scalar(height: int, width: int, cost_model):
+    terrain = create_random_terrain(height, width, seed=height * width, impassable=0.2)
+    rng = np.random.default_rng(width)
+    for _ in range(5):
+        start = Valley(position=Position(int(rng.integers(height)), int(rng.integers(width))))
+        end = Valley(position=Position(int(rng.integers(height)), int(rng.integers(width))))
+
+        scalar = DijkstraStrategy.find_path(terrain, start, end, cost_model=cost_model)
+        vectorized = DijkstraStrategy.find_path(terrain, start, end, cost_model=cost_model, vectorized=True)
+
+        assert [node.position for node in vectorized] == [node.position for node in scalar]
+
+
+def test_edge_costs_mask_borders():
+    terrain = TerrainGrid.filled(2, 3)
+
+    costs = terrain.edge_costs(DistanceCostModel().compile(terrain.palette_weights, DijkstraStrategy.step_lengths), DijkstraStrategy.cardinal_directions, 0, 2)
+
+    assert costs.shape == (6, 8)
+    # Top-left corner can only step right, down and diagonally down-right
+    assert np.isfinite(costs[0]).tolist() == [False, False, False, False, True, False, True, True]
+    assert np.isfinite(costs).sum() == 22
+
+
+@pytest.mark.parametrize("height, width", [(1, 1), (1, 9), (7, 11), (150, 20)])
+@pytest.mark.parametrize("cost_model", [DistanceCostModel(), WeightedCostModel()])
+def test_bucketed_matches_heap_costs(height: int, width: int, cost_model):
+    terrain = create_random_terrain(height, width, seed=height + width, impassable=0.2)
+    rng = np.random.default_rng(height)
+    for _ in range(5):
+        start = terrain.node_at(int(rng.integers(terrain.size)))
+        end = terrain.node_at(int(rng.integers(terrain.size)))
+
+        heap = DijkstraStrategy.find_path(terrain, start, end, cost_model=cost_model)
+        bucketed = DijkstraStrategy.find_path(terrain, start, end, cost_model=cost_model, bucketed=True)
+
+        assert bool(bucketed) == bool(heap)
+        assert path_cost(terrain, start, bucketed, cost_model) == pytest.approx(path_cost(terrain, start, heap, cost_model))
+
+
+def test_bucketed_on_flat_grid():
+    terrain = TerrainGrid.filled(30, 30)
+
+    path = DijkstraStrategy.find_path(terrain, terrain.node_at(0), terrain.node_at(terrain.size - 1), bucketed=True)
+
+    assert [node.position for node in path] == [Position(step, step) for step in range(1, 30)]
+
+
+def test_bucketed_rejects_free_steps():
+    terrain = create_random_terrain(5, 5, seed=0)
+
+    with pytest.raises(ValueError):
+        DijkstraStrategy.find_path(terrain, terrain.node_at(0), terrain.node_at(24), cost_model=SlopeCostModel(), bucketed=True)
@@ -0,0 +1,81 @@
+import math
+
+import numpy as np
+import pytest
+
+from fuel_efficency.algorithms.cost_model import WeightedCostModel
+from fuel_efficency.algorithms.dijkstra import DijkstraStrategy
+from fuel_efficency.algorithms.distance_table import DistanceTable
+from fuel_efficency.entities.position import Position
+from fuel_efficency.entities.terrain_grid import TerrainGrid
+from fuel_efficency.entities.valley import Valley
+from tests.helpers import WALL, create_random_terrain, path_cost
+
+
+def create_terrain(seed: int) -> TerrainGrid:
+    terrain = create_random_terrain(25, 18, seed, impassable=0.15)
+    # A walled-in corner no depot outside it can reach
+    corner = {Position(x, 3): WALL for x in range(3)} | {Position(3, y): WALL for y in range(4)}
+    terrain.set_cells({**corner, Position(1, 1): 0})
+    return terrain
+
+
+def create_depots(terrain: TerrainGrid, count: int, seed: int):
+    rng = np.random.default_rng(seed)
+    passable = np.flatnonzero(terrain.passable.ravel())
+    depots = [terrain.node_at(int(index)) for index in rng.choice(passable, count, replace=False)]
+    return depots + [terrain.node_at(terrain.index(Position(1, 1)))]
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_table_matches_find_path(workers: int):
+    terrain = create_terrain(0)
+    depots = create_depots(terrain, 8, seed=workers)
+    cost_model = WeightedCostModel()
+
+    table = DistanceTable.build(terrain, depots, cost_model=cost_model, workers=workers, paths=True)
+
+    assert table.costs.shape == (len(depots), len(depots))
+    for i, origin in enumerate(depots):
+        for j, destination in enumerate(depots):
+            expected = DijkstraStrategy.find_path(terrain, origin, destination, cost_model=cost_model)
+            if i == j:
+                assert table.cost(i, j) == 0 and table.path(i, j) == []
+            elif not expected:
+                assert table.cost(i, j) == math.inf and table.path(i, j) == []
+            else:
+                assert table.cost(i, j) == pytest.approx(path_cost(terrain, origin, expected, cost_model))
+                assert table.path(i, j) == expected
+
+
+def test_parallel_table_matches_serial():
+    terrain = create_terrain(1)
+    depots = create_depots(terrain, 12, seed=0)
+
+    serial = DistanceTable.build(terrain, depots, workers=1)
+    parallel = DistanceTable.build(terrain, depots, workers=2)
+
+    assert np.array_equal(serial.costs, parallel.costs)
+    assert serial.paths is None and parallel.paths is None
+
+
+def test_list_grid_paths_hand_back_grid_nodes():
+    grid = [[Valley(position=Position(x, y)) for y in range(4)] for x in range(4)]
+
+    table = DistanceTable.build(grid, [grid[0][0], grid[3][3]], paths=True)
+
+    assert table.cost(0, 1) == pytest.approx(3 * math.sqrt(2))
+    assert all(node is grid[node.position.x][node.position.y] for node in table.path(0, 1))
+
+
+def test_table_without_paths_raises_on_path():
+    table = DistanceTable.build(TerrainGrid.filled(3, 3), [Valley(position=Position(0, 0))])
+
+    with pytest.raises(ValueError):
+        table.path(0, 0)
+
+
+@pytest.mark.parametrize("depots, workers", [([Valley(position=Position(5, 5))], 1), ([Valley(position=Position(0, 0))], 0)])
+def test_invalid_arguments_raise(depots, workers):
+    with pytest.raises(ValueError):
+        DistanceTable.build(TerrainGrid.filled(3, 3), depots, workers=workers)
@@ -0,0 +1,58 @@
+import dataclasses
+import pickle
+
+import numpy as np
+import pytest
+
+from fuel_efficency.entities.down_hill import DownHill
+from fuel_efficency.entities.node import Node
+from fuel_efficency.entities.plateau import Plateau
+from fuel_efficency.entities.position import Position
+from fuel_efficency.entities.terrain_grid import TerrainGrid
+from fuel_efficency.entities.up_hill import UpHill
+from fuel_efficency.entities.valley import Valley
+
+NODE_TYPES = [DownHill, Plateau, UpHill, Valley]
+
+
+def test_position_is_immutable():
+    position = Position(1, 2)
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        position.x = 3
+
+
+def test_position_hash_is_precomputed_and_unchanged():
+    position = Position(4, 7)
+    assert hash(position) == hash((4, 7))
+    assert position == Position(4, 7) and position != Position(7, 4)
+    assert repr(position) == "Position(x=4, y=7)"
+    assert pickle.loads(pickle.dumps(position)) == position
+
+
+def test_interned_positions_are_shared():
+    assert Position.interned(3, 5) is Position.interned(3, 5)
+    assert Position.interned(3, 5) == Position(3, 5)
+
+
+@pytest.mark.parametrize("node_type", NODE_TYPES)
+def test_subclasses_share_the_node_dunders(node_type):
+    for name in ('__eq__', '__lt__', '__hash__'):
+        assert name not in vars(node_type)
+        assert getattr(node_type, name) is getattr(Node, name)
+
+
+@pytest.mark.parametrize("node_type", NODE_TYPES)
+def test_equality_semantics_are_unchanged(node_type):
+    node = node_type(position=Position(1, 1))
+    assert node == Valley(position=Position(1, 1))
+    assert node != Valley(position=Position(1, 2))
+    assert hash(node) == hash((Position(1, 1), node.weight))
+    assert Node(weight=0.1) < node
+    with pytest.raises(NotImplementedError):
+        node == Position(1, 1)
+
+
+def test_terrain_grid_hands_out_interned_positions():
+    terrain = TerrainGrid(np.zeros((3, 3), dtype=np.uint8))
+    assert terrain.position(4) is terrain.node_at(4).position
+    assert terrain.node_at(4) == Valley(position=Position(1, 1))
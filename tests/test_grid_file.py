@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+
+from fuel_efficency.algorithms.a_star import AStarStrategy
+from fuel_efficency.algorithms.dijkstra import DijkstraStrategy
+from fuel_efficency.entities.grid_file import PAGE_SIZE, load_grid, read_header, save_grid
+from fuel_efficency.entities.position import Position
+from fuel_efficency.entities.terrain_grid import DEFAULT_PALETTE, TerrainGrid
+from fuel_efficency.entities.up_hill import UpHill
+from fuel_efficency.entities.valley import Valley
+from tests.helpers import WALLED_PALETTE
+
+
+@pytest.fixture
+def terrain():
+    rng = np.random.default_rng(0)
+    codes = rng.integers(0, 5, (40, 70)).astype(np.uint8)
+    return TerrainGrid(codes, WALLED_PALETTE)
+
+
+def test_round_trip_keeps_codes_and_palette(tmp_path, terrain):
+    path = tmp_path / 'map.fgrid'
+    save_grid(path, terrain)
+    loaded = load_grid(path)
+
+    assert loaded.palette == terrain.palette
+    assert np.array_equal(loaded.codes, terrain.codes)
+    assert isinstance(loaded.codes.base, np.memmap)
+    assert loaded.used_palette_weights.tolist() == terrain.used_palette_weights.tolist()
+
+
+def test_header_is_read_without_the_codes(tmp_path, terrain):
+    path = tmp_path / 'map.fgrid'
+    save_grid(path, terrain)
+    header = read_header(path)
+
+    assert (header.height, header.width) == (40, 70)
+    assert header.data_offset % PAGE_SIZE == 0
+    assert header.code_counts == tuple(np.bincount(terrain.codes.ravel(), minlength=5).tolist())
+
+
+def test_list_grids_convert_to_and_from_files(tmp_path):
+    grid = [[Valley(position=Position(x, y)) for y in range(3)] for x in range(2)]
+    grid[1][2] = UpHill(position=Position(1, 2))
+    path = tmp_path / 'small.fgrid'
+    save_grid(path, grid)
+
+    assert load_grid(path).to_nodes() == grid
+    assert [type(node) for node in load_grid(path).to_nodes()[1]] == [Valley, Valley, UpHill]
+
+
+@pytest.mark.parametrize("strategy", [DijkstraStrategy, AStarStrategy])
+def test_strategies_run_on_loaded_grids(tmp_path, terrain, strategy):
+    path = tmp_path / 'map.fgrid'
+    save_grid(path, terrain)
+    start, end = Valley(position=Position(1, 2)), Valley(position=Position(38, 66))
+
+    assert strategy.find_path(load_grid(path), start, end) == strategy.find_path(terrain, start, end)
+
+
+def test_loaded_grids_are_read_only_unless_copy_on_write(tmp_path, terrain):
+    path = tmp_path / 'map.fgrid'
+    save_grid(path, terrain)
+    changes = {Position(0, 0): (int(terrain.codes[0, 0]) + 1) % 5}
+
+    with pytest.raises(ValueError):
+        load_grid(path).set_cells(changes)
+    assert load_grid(path, copy_on_write=True).set_cells(changes) == [0]
+    assert load_grid(path).codes[0, 0] == terrain.codes[0, 0]
+
+
+def test_empty_grids_round_trip(tmp_path):
+    path = tmp_path / 'empty.fgrid'
+    save_grid(path, TerrainGrid(np.zeros((0, 0), dtype=np.uint8)))
+
+    assert load_grid(path).shape == (0, 0)
+
+
+def test_invalid_files_are_rejected(tmp_path, terrain):
+    path = tmp_path / 'map.fgrid'
+    path.write_bytes(b'not a grid file')
+    with pytest.raises(ValueError):
+        load_grid(path)
+
+    save_grid(path, terrain)
+    path.write_bytes(path.read_bytes()[:-1])
+    with pytest.raises(ValueError):
+        load_grid(path)
+
+
+def test_unknown_terrain_types_cannot_be_saved(tmp_path):
+    class Swamp(Valley):
+        pass
+
+    with pytest.raises(ValueError):
+        save_grid(tmp_path / 'swamp.fgrid', TerrainGrid(np.zeros((1, 1), dtype=np.uint8), ((Swamp, 3.0),)))
+
+
+def test_code_counts_must_match_the_grid():
+    with pytest.raises(ValueError):
+        TerrainGrid(np.zeros((2, 2), dtype=np.uint8), DEFAULT_PALETTE, code_counts=(3,))
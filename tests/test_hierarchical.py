@@ -0,0 +1,128 @@
+import math
+
+import numpy as np
+import pytest
+
+from fuel_efficency.algorithms.cluster_graph import ClusterGraph
+from fuel_efficency.algorithms.context import Context
+from fuel_efficency.algorithms.cost_model import DistanceCostModel, SlopeCostModel, WeightedCostModel
+from fuel_efficency.algorithms.dijkstra import DijkstraStrategy
+from fuel_efficency.algorithms.hierarchical import HierarchicalStrategy
+from fuel_efficency.entities.position import Position
+from fuel_efficency.entities.terrain_grid import TerrainGrid
+from fuel_efficency.entities.valley import Valley
+from tests.helpers import WALL, WALLED_PALETTE, create_random_terrain, path_cost
+
+
+@pytest.mark.parametrize("cost_model", [DistanceCostModel(), WeightedCostModel(), SlopeCostModel()])
+@pytest.mark.parametrize("impassable", [0.0, 0.15, 0.4])
+def test_hierarchical_finds_valid_paths_whenever_dijkstra_does(cost_model, impassable: float):
+    rng = np.random.default_rng(9)
+    for seed in range(12):
+        height, width = int(rng.integers(1, 30)), int(rng.integers(1, 30))
+        terrain = create_random_terrain(height, width, seed, impassable)
+        strategy = HierarchicalStrategy(cluster_size=int(rng.integers(2, 8)))
+        start = Valley(position=Position(int(rng.integers(height)), int(rng.integers(width))))
+        end = Valley(position=Position(int(rng.integers(height)), int(rng.integers(width))))
+
+        expected = DijkstraStrategy.find_path(terrain, start, end, cost_model=cost_model)
+        path = strategy.find_path(terrain, start, end, cost_model=cost_model)
+
+        assert (path == []) == (expected == [])
+        if path:
+            steps = [start.position] + [node.position for node in path]
+            assert all(max(abs(a.x - b.x), abs(a.y - b.y)) == 1 for a, b in zip(steps, steps[1:]))
+            assert path[-1] == end
+            cost = path_cost(terrain, start, path, cost_model)
+            assert math.isfinite(cost)
+            assert cost >= path_cost(terrain, start, expected, cost_model) - 1e-9
+
+
+def test_hierarchical_is_optimal_inside_one_open_cluster():
+    terrain = TerrainGrid.filled(8, 8)
+    start, end = Valley(position=Position(0, 0)), Valley(position=Position(7, 5))
+
+    path = HierarchicalStrategy(cluster_size=8).find_path(terrain, start, end)
+
+    assert len(path) == 7
+    assert path_cost(terrain, start, path, DistanceCostModel()) == pytest.approx(5 * math.sqrt(2) + 2)
+
+
+def test_diagonal_only_crossings_keep_clusters_connected():
+    # The only way from the left cluster to the right one is the diagonal step (1, 1) -> (2, 2)
+    codes = np.full((4, 4), WALL, dtype=np.uint8)
+    codes[0:2, 0:2] = 0
+    codes[2:4, 2:4] = 0
+    terrain = TerrainGrid(codes, WALLED_PALETTE)
+
+    path = HierarchicalStrategy(cluster_size=2).find_path(terrain, Valley(position=Position(0, 0)), Valley(position=Position(3, 3)))
+
+    assert [node.position for node in path] == [Position(1, 1), Position(2, 2), Position(3, 3)]
+
+
+def test_graph_is_reused_across_queries():
+    grid = [[Valley(position=Position(x, y)) for y in range(6)] for x in range(6)]
+    strategy = HierarchicalStrategy(cluster_size=3)
+
+    graph = strategy.prepare(grid)
+    strategy.find_path(grid, grid[0][0], grid[5][5])
+    strategy.find_path(TerrainGrid.from_nodes(grid), grid[5][0], grid[0][5])
+
+    assert strategy.graph is graph
+    assert strategy.prepare(grid, WeightedCostModel()) is not graph
+
+
+def test_update_cells_matches_a_full_rebuild():
+    terrain = create_random_terrain(30, 30, 3, 0.2)
+    graph = ClusterGraph(terrain, SlopeCostModel(), cluster_size=5)
+    rng = np.random.default_rng(4)
+
+    for _ in range(5):
+        changes = {Position(int(x), int(y)): int(code) for x, y, code in rng.integers(0, [30, 30, 5], (8, 3))}
+        graph.update_cells(changes)
+        rebuilt = ClusterGraph(terrain, SlopeCostModel(), cluster_size=5)
+
+        assert graph.entrances == rebuilt.entrances
+        assert graph.inter == rebuilt.inter
+        assert graph.intra == rebuilt.intra
+
+
+def test_update_cells_reroutes_around_new_obstacles():
+    terrain = TerrainGrid(np.zeros((9, 9), dtype=np.uint8), WALLED_PALETTE)
+    strategy = HierarchicalStrategy(cluster_size=3)
+    start, end = Valley(position=Position(4, 0)), Valley(position=Position(4, 8))
+    assert Position(4, 4) in [node.position for node in strategy.find_path(terrain, start, end)]
+
+    wall = {Position(x, 4): WALL for x in range(8)}
+    graph = strategy.prepare(terrain)
+    graph.update_cells(wall)
+    path = strategy.find_path(terrain, start, end)
+
+    assert strategy.graph is graph
+    assert Position(8, 4) in [node.position for node in path]
+    assert all(node.position not in wall for node in path)
+
+
+def test_cells_edited_outside_the_graph_rebuild_it():
+    terrain = create_random_terrain(20, 20, 0)
+    strategy = HierarchicalStrategy(cluster_size=5)
+    start, end = terrain.node_at(0), terrain.node_at(399)
+    graph = strategy.prepare(terrain)
+    assert strategy.find_path(terrain, start, end)
+
+    terrain.set_cells({Position(x, 10): WALL for x in range(20)})
+
+    assert strategy.find_path(terrain, start, end) == DijkstraStrategy.find_path(terrain, start, end) == []
+    assert strategy.graph is not graph
+
+
+def test_hierarchical_rejects_empty_clusters():
+    with pytest.raises(ValueError):
+        HierarchicalStrategy(cluster_size=0)
+
+
+def test_hierarchical_in_context():
+    grid = [[Valley(position=Position(x, y)) for y in range(3)] for x in range(3)]
+    context = Context(_strategy=HierarchicalStrategy(cluster_size=2), _grid=grid, _start=grid[0][0], _end=grid[2][2])
+
+    assert context.run() == [grid[1][1], grid[2][2]]
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from fuel_efficency.algorithms.context import Context
+from fuel_efficency.algorithms.cost_model import DistanceCostModel, SlopeCostModel, WeightedCostModel
+from fuel_efficency.algorithms.dijkstra import DijkstraStrategy
+from fuel_efficency.algorithms.jump_point import JumpPointStrategy
+from fuel_efficency.entities.position import Position
+from fuel_efficency.entities.terrain_grid import TerrainGrid
+from fuel_efficency.entities.valley import Valley
+from tests.helpers import WALL, WALLED_PALETTE, path_cost
+
+
+def create_basin_terrain(height: int, width: int, seed: int, impassable: float) -> TerrainGrid:
+    # Mostly flat valley with a few rectangular patches of other terrain and scattered rocks
+    rng = np.random.default_rng(seed)
+    codes = np.zeros((height, width), dtype=np.uint8)
+    for _ in range(4):
+        x, y = rng.integers(height), rng.integers(width)
+        codes[x:x + rng.integers(1, 6), y:y + rng.integers(1, 6)] = rng.integers(0, 4)
+    codes[rng.random((height, width)) < impassable] = WALL
+    return TerrainGrid(codes, WALLED_PALETTE)
+
+
+@pytest.mark.parametrize("cost_model", [DistanceCostModel(), WeightedCostModel(), SlopeCostModel()])
+@pytest.mark.parametrize("impassable", [0.0, 0.1, 0.25])
+def test_jump_point_matches_dijkstra_cost(cost_model, impassable: float):
+    rng = np.random.default_rng(5)
+    for seed in range(15):
+        height, width = int(rng.integers(1, 20)), int(rng.integers(1, 25))
+        terrain = create_basin_terrain(height, width, seed, impassable)
+        start = Valley(position=Position(int(rng.integers(height)), int(rng.integers(width))))
+        end = Valley(position=Position(int(rng.integers(height)), int(rng.integers(width))))
+
+        expected = DijkstraStrategy.find_path(terrain, start, end, cost_model=cost_model)
+        path = JumpPointStrategy.find_path(terrain, start, end, cost_model=cost_model)
+
+        assert (path == []) == (expected == [])
+        if path:
+            steps = [start.position] + [node.position for node in path]
+            assert all(max(abs(a.x - b.x), abs(a.y - b.y)) == 1 for a, b in zip(steps, steps[1:]))
+            assert path[-1] == end
+            assert path_cost(terrain, start, path, cost_model) == pytest.approx(path_cost(terrain, start, expected, cost_model))
+
+
+def test_boundaries_mark_weight_changes():
+    terrain = TerrainGrid(np.array([[0, 0, 0, 0], [0, 2, 0, 1], [0, 0, 0, 0]], dtype=np.uint8))
+
+    # Plateau (code 1) weighs the same as Valley, so only the UpHill cell makes a boundary
+    assert terrain.boundaries.astype(int).tolist() == [[1, 1, 1, 0], [1, 1, 1, 0], [1, 1, 1, 0]]
+
+
+def test_jump_point_in_context():
+    grid = [[Valley(position=Position(x, y)) for y in range(3)] for x in range(3)]
+    context = Context(_strategy=JumpPointStrategy(), _grid=grid, _start=grid[0][0], _end=grid[2][2])
+
+    assert context.run() == [grid[1][1], grid[2][2]]
@@ -0,0 +1,124 @@
+import numpy as np
+import pytest
+
+from fuel_efficency.algorithms.a_star import AStarStrategy
+from fuel_efficency.algorithms.cost_model import SlopeCostModel, WeightedCostModel
+from fuel_efficency.algorithms.landmarks import Landmarks, landmark_distances
+from fuel_efficency.algorithms.search_stats import SearchStats
+from fuel_efficency.entities.position import Position
+from fuel_efficency.entities.terrain_grid import TerrainGrid
+from fuel_efficency.entities.valley import Valley
+from tests.helpers import WALLED_PALETTE
+
+COST_MODELS = [WeightedCostModel(), SlopeCostModel()]
+
+
+@pytest.fixture
+def terrain():
+    rng = np.random.default_rng(0)
+    codes = rng.choice([0, 2, 2, 3, 4], (40, 40)).astype(np.uint8)
+    return TerrainGrid(codes, WALLED_PALETTE)
+
+
+def random_queries(terrain, count, seed):
+    rng = np.random.default_rng(seed)
+    passable = np.flatnonzero(terrain.passable)
+    for source, target in rng.choice(passable, (count, 2)).tolist():
+        yield terrain.node_at(source), terrain.node_at(target)
+
+
+def test_reverse_distances_price_paths_towards_the_landmark(terrain):
+    cost_model = SlopeCostModel()
+    cost_table = cost_model.compile(terrain.palette_weights, AStarStrategy.step_lengths)
+    landmark = int(np.flatnonzero(terrain.passable)[0])
+    backward = landmark_distances(terrain, cost_table, AStarStrategy.allowed_directions, landmark, True)
+
+    for cell in np.flatnonzero(terrain.passable)[::97].tolist():
+        expected = landmark_distances(terrain, cost_table, AStarStrategy.allowed_directions, cell, False)[landmark]
+        assert backward[cell] == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("cost_model", COST_MODELS)
+def test_lower_bounds_never_overestimate(terrain, cost_model):
+    landmarks = AStarStrategy.build_landmarks(terrain, 6, cost_model=cost_model)
+    cost_table = cost_model.compile(terrain.palette_weights, AStarStrategy.step_lengths)
+    target = int(np.flatnonzero(terrain.passable)[-1])
+    # The true cost to the target is the reverse distance from it
+    exact = landmark_distances(terrain, cost_table, AStarStrategy.allowed_directions, target, True)
+
+    bound = landmarks.lower_bound(target)
+    bounds = np.array([bound(cell) for cell in range(terrain.size)])
+
+    assert np.all(bounds <= exact + 1e-9)
+    assert np.all(np.isinf(exact[np.isinf(bounds)]))
+
+
+@pytest.mark.parametrize("cost_model", COST_MODELS)
+def test_landmarks_keep_paths_optimal_and_expand_less(terrain, cost_model):
+    landmarks = AStarStrategy.build_landmarks(terrain, cost_model=cost_model)
+    plain, guided = SearchStats(), SearchStats()
+
+    for start, end in random_queries(terrain, 15, 1):
+        expected = AStarStrategy.find_path(terrain, start, end, cost_model=cost_model, stats=plain, compact=True)
+        result = AStarStrategy.find_path(terrain, start, end, cost_model=cost_model, stats=guided, compact=True, landmarks=landmarks)
+        assert bool(result) == bool(expected)
+        if expected:
+            assert result.cost == pytest.approx(expected.cost)
+
+    assert guided.nodes_expanded * 2 < plain.nodes_expanded
+
+
+def test_spread_landmarks_lie_on_the_largest_component(terrain):
+    cells = Landmarks.spread_landmarks(terrain, 8)
+
+    assert 1 < len(cells) <= 8 and len(set(cells)) == len(cells)
+    assert all(terrain.passable.flat[cell] for cell in cells)
+
+
+def test_parallel_build_matches_serial_build(terrain):
+    serial = AStarStrategy.build_landmarks(terrain, 3)
+    parallel = AStarStrategy.build_landmarks(terrain, 3, workers=2)
+
+    assert np.array_equal(serial.cells, parallel.cells)
+    assert np.array_equal(serial.forward, parallel.forward)
+    assert np.array_equal(serial.backward, parallel.backward)
+
+
+def test_landmarks_round_trip_through_a_file(tmp_path, terrain):
+    landmarks = AStarStrategy.build_landmarks(terrain, 4, cost_model=WeightedCostModel())
+    path = tmp_path / 'map.landmarks.npz'
+    landmarks.save(path)
+    loaded = Landmarks.load(path)
+
+    assert np.array_equal(loaded.forward, landmarks.forward)
+    assert loaded.nodes(terrain) == landmarks.nodes(terrain)
+    start, end = next(random_queries(terrain, 1, 2))
+    assert AStarStrategy.find_path(terrain, start, end, cost_model=WeightedCostModel(), landmarks=loaded) == AStarStrategy.find_path(terrain, start, end, cost_model=WeightedCostModel(), landmarks=landmarks)
+
+
+def test_landmarks_reject_another_grid_or_cost_model(terrain):
+    landmarks = AStarStrategy.build_landmarks(terrain, 2)
+    start, end = Valley(position=Position(0, 0)), Valley(position=Position(3, 3))
+
+    with pytest.raises(ValueError):
+        AStarStrategy.find_path(terrain, start, end, cost_model=WeightedCostModel(), landmarks=landmarks)
+    with pytest.raises(ValueError):
+        AStarStrategy.find_path(TerrainGrid.filled(40, 40), start, end, landmarks=landmarks)
+
+
+def test_landmarks_reject_a_grid_edited_after_the_build(terrain):
+    landmarks = AStarStrategy.build_landmarks(terrain, 2)
+    start, end = next(random_queries(terrain, 1, 3))
+    AStarStrategy.find_path(terrain, start, end, landmarks=landmarks)
+
+    terrain.set_cells({Position(0, 0): 4 if terrain.codes[0, 0] != 4 else 0})
+
+    with pytest.raises(ValueError):
+        AStarStrategy.find_path(terrain, start, end, landmarks=landmarks)
+
+
+def test_landmarks_must_lie_inside_the_grid(terrain):
+    with pytest.raises(ValueError):
+        AStarStrategy.build_landmarks(terrain, cells=[Valley(position=Position(50, 0))])
+    with pytest.raises(ValueError):
+        Landmarks.spread_landmarks(TerrainGrid(np.full((2, 2), 4, dtype=np.uint8), terrain.palette), 2)
@@ -0,0 +1,81 @@
+import pytest
+
+from fuel_efficency.algorithms.a_star import AStarStrategy
+from fuel_efficency.algorithms.context import Context
+from fuel_efficency.algorithms.d_star_lite import DStarLiteStrategy
+from fuel_efficency.algorithms.dijkstra import DijkstraStrategy
+from fuel_efficency.entities.lazy_grid import LazyGrid
+from fuel_efficency.entities.position import Position
+from fuel_efficency.entities.terrain_grid import TerrainGrid, as_terrain_grid
+from fuel_efficency.entities.up_hill import UpHill
+from fuel_efficency.entities.valley import Valley
+from tests.helpers import create_random_terrain
+
+
+def test_lazy_grid_reads_like_a_list_of_lists():
+    terrain = create_random_terrain(4, 6, 0)
+    nodes = terrain.to_nodes()
+    grid = terrain.lazy()
+
+    assert len(grid) == 4 and len(grid[0]) == 6
+    assert [list(row) for row in grid] == nodes
+    assert all(type(grid[x][y]) is type(nodes[x][y]) for x in range(4) for y in range(6))
+    assert grid[-1][-1] == nodes[3][5]
+    with pytest.raises(IndexError):
+        grid[4]
+    with pytest.raises(IndexError):
+        grid[0][6]
+
+
+def test_lazy_grid_builds_nodes_on_demand_within_its_bound():
+    grid = TerrainGrid.filled(100, 100).lazy(max_nodes=3)
+    assert grid.cached == 0
+
+    first = grid[0][0]
+    assert grid[0][0] is first
+    for y in range(1, 4):
+        grid[1][y]
+
+    assert grid.cached == 3
+    assert grid[0][0] is not first and grid[0][0] == first
+
+
+def test_max_nodes_must_be_positive():
+    with pytest.raises(ValueError):
+        LazyGrid(TerrainGrid.filled(2, 2), max_nodes=0)
+
+
+def test_assigning_a_node_changes_the_terrain():
+    terrain = TerrainGrid.filled(3, 3)
+    grid = terrain.lazy()
+    hill = UpHill(position=Position(1, 2))
+
+    grid[1][2] = hill
+
+    assert grid[1][2] is hill
+    assert type(terrain.node_at(5)) is UpHill
+    with pytest.raises(TypeError):
+        grid[1][2] = "hill"
+
+
+@pytest.mark.parametrize("strategy", [DijkstraStrategy(), AStarStrategy(), DStarLiteStrategy()])
+def test_strategies_search_lazy_grids(strategy):
+    terrain = create_random_terrain(20, 20, 3)
+    grid = terrain.lazy(max_nodes=64)
+    start, end = Valley(position=Position(0, 0)), Valley(position=Position(19, 17))
+
+    path = strategy.find_path(grid, start, end)
+
+    assert as_terrain_grid(grid) is terrain
+    assert path == strategy.find_path(terrain.to_nodes(), start, end)
+    assert grid.cached <= 64
+
+
+def test_context_defaults_to_a_lazy_grid():
+    context = Context()
+    assert isinstance(context.grid, LazyGrid)
+    assert context.grid.cached == 0
+
+    context.start = Valley(position=Position(0, 0))
+    context.end = Valley(position=Position(2, 2))
+    assert context.run() == [Valley(position=Position(1, 1)), Valley(position=Position(2, 2))]
@@ -0,0 +1,80 @@
+import math
+
+import pytest
+
+from fuel_efficency.algorithms.a_star import AStarStrategy
+from fuel_efficency.algorithms.cost_model import WeightedCostModel
+from fuel_efficency.algorithms.dijkstra import DijkstraStrategy
+from fuel_efficency.algorithms.path_result import PathResult
+from fuel_efficency.entities.position import Position
+from fuel_efficency.entities.terrain_grid import TerrainGrid
+from fuel_efficency.entities.valley import Valley
+from tests.helpers import create_random_terrain
+
+SEARCHES = [DijkstraStrategy.find_path, AStarStrategy.find_path]
+
+
+@pytest.mark.parametrize("search", SEARCHES)
+@pytest.mark.parametrize("as_nodes", [False, True])
+def test_compact_result_matches_the_node_list(search, as_nodes):
+    terrain = create_random_terrain(15, 15, 2)
+    grid = terrain.to_nodes() if as_nodes else terrain
+    start, end = Valley(position=Position(0, 0)), Valley(position=Position(14, 11))
+    expected = search(grid, start, end, cost_model=WeightedCostModel())
+
+    result = search(grid, start, end, cost_model=WeightedCostModel(), compact=True)
+
+    assert isinstance(result, PathResult)
+    assert len(result) == len(expected)
+    assert list(result) == expected and result.nodes() == expected
+    assert result[0] == expected[0] and result[-1] == expected[-1]
+    if as_nodes:
+        assert all(node is original for node, original in zip(result, expected))
+    assert result.indices.itemsize == 4
+
+
+def test_dijkstra_result_cost_is_the_search_cost():
+    terrain = create_random_terrain(20, 20, 5)
+    start, end = Valley(position=Position(0, 0)), Valley(position=Position(19, 13))
+    tree = DijkstraStrategy.shortest_path_tree(terrain, start)
+
+    result = DijkstraStrategy.find_path(terrain, start, end, compact=True)
+
+    assert math.isclose(result.cost, tree.cost_to(end))
+
+
+def test_compact_search_without_a_path_returns_an_empty_list():
+    terrain = TerrainGrid.filled(3, 3)
+    assert DijkstraStrategy.find_path(terrain, Valley(position=Position(0, 0)), Valley(position=Position(5, 5)), compact=True) == []
+
+
+def test_run_length_encoding_round_trips():
+    terrain = TerrainGrid.filled(1, 600)
+    start, end = Valley(position=Position(0, 0)), Valley(position=Position(0, 599))
+    result = DijkstraStrategy.find_path(terrain, start, end, compact=True)
+
+    assert result.run_length() == [(5, 599)]
+    encoded = result.encode()
+    assert encoded == bytes((5, 255, 5, 255, 5, 89))
+
+    decoded = PathResult.decode(terrain, terrain, result.source, PathResult.decode_runs(encoded), result.cost)
+    assert decoded.indices == result.indices
+    assert decoded.nodes() == result.nodes()
+
+
+def test_run_length_follows_turns():
+    terrain = TerrainGrid.filled(4, 4)
+    result = PathResult.from_route(terrain, terrain, 0, [5, 10, 11, 7], [[[1.0] * 4] * 8] * 4, DijkstraStrategy.cardinal_directions)
+
+    assert result.run_length() == [(8, 2), (5, 1), (1, 1)]
+    assert result.cost == 4.0
+
+
+def test_decode_rejects_bad_runs():
+    terrain = TerrainGrid.filled(2, 2)
+    with pytest.raises(ValueError):
+        PathResult.decode(terrain, terrain, 0, [(4, 1)], 0.0)
+    with pytest.raises(ValueError):
+        PathResult.decode(terrain, terrain, 0, [(8, 2)], 0.0)
+    with pytest.raises(ValueError):
+        PathResult.decode_runs(b'\x05')
@@ -0,0 +1,127 @@
+import math
+from array import array
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from fuel_efficency.algorithms.a_star import AStarStrategy
+from fuel_efficency.algorithms.bidirectional import BidirectionalStrategy
+from fuel_efficency.algorithms.context import Context
+from fuel_efficency.algorithms.cost_model import WeightedCostModel
+from fuel_efficency.algorithms.dijkstra import DijkstraStrategy
+from fuel_efficency.algorithms.hierarchical import HierarchicalStrategy
+from fuel_efficency.algorithms.route_cache import RouteCache
+from fuel_efficency.entities.position import Position
+from fuel_efficency.entities.terrain_grid import TerrainGrid
+from fuel_efficency.entities.valley import Valley
+from tests.helpers import WALL, WALLED_PALETTE
+
+
+def create_context(grid, cache: RouteCache) -> Context:
+    strategy = DijkstraStrategy()
+    strategy.find_path = MagicMock(side_effect=DijkstraStrategy.find_path)
+    context = Context(_strategy=strategy, _grid=grid, _cache=cache)
+    context.start = Valley(position=Position(0, 0))
+    context.end = Valley(position=Position(2, 2))
+    return context
+
+
+def test_lru_eviction_by_entries():
+    cache = RouteCache(max_entries=2)
+    cache.put('a', array('q', [1]))
+    cache.put('b', array('q', [2]))
+    cache.get('a')
+    cache.put('c', array('q', [3]))
+
+    assert cache.get('b') is None
+    assert cache.get('a') is not None and cache.get('c') is not None
+    assert cache.cache_info()[:4] == (3, 1, 1, 2)
+
+
+def test_lru_eviction_by_bytes():
+    route = array('q', range(100))
+    cache = RouteCache(max_bytes=2 * len(route) * route.itemsize + 200)
+    for key in range(3):
+        cache.put(key, array('q', range(100)))
+
+    assert len(cache) == 2 and cache.get(0) is None
+    assert cache.cache_info().bytes <= cache.max_bytes
+
+
+def test_invalid_bounds():
+    with pytest.raises(ValueError):
+        RouteCache(max_entries=0)
+
+
+def test_context_serves_repeated_queries_from_cache():
+    grid = [[Valley(position=Position(x, y)) for y in range(3)] for x in range(3)]
+    context = create_context(grid, RouteCache())
+
+    first = context.run()
+    second = context.run()
+
+    assert context.strategy.find_path.call_count == 1
+    assert second == first and second[0] is grid[1][1]
+    assert context.cache.cache_info()[:2] == (1, 1)
+
+
+def test_context_cache_key_changes():
+    cache = RouteCache()
+    context = create_context(TerrainGrid.filled(3, 3), cache)
+    context.run()
+
+    context.grid = TerrainGrid.filled(3, 3)
+    context.run()
+    context.cost_model = WeightedCostModel()
+    context.run()
+    context.end = Valley(position=Position(1, 2))
+    context.run()
+
+    assert context.strategy.find_path.call_count == 4
+    assert cache.cache_info().misses == 4
+    assert create_context(TerrainGrid.filled(3, 3), cache).cache_key() != context.cache_key()
+
+
+def test_differently_configured_strategies_do_not_share_routes():
+    grid = TerrainGrid.filled(6, 6)
+    cache = RouteCache()
+    context = Context(_grid=grid, _start=grid.node_at(0), _end=grid.node_at(35), _cache=cache)
+    context.strategy = BidirectionalStrategy()
+    diagonal = context.run()
+    context.strategy = BidirectionalStrategy(AStarStrategy.allowed_directions)
+    straight = context.run()
+
+    assert len(diagonal) == 5 and len(straight) == 10
+    assert straight == BidirectionalStrategy(AStarStrategy.allowed_directions).find_path(grid, grid.node_at(0), grid.node_at(35))
+    assert HierarchicalStrategy(cluster_size=2).cache_key() != HierarchicalStrategy(cluster_size=3).cache_key()
+    assert HierarchicalStrategy(cluster_size=2).cache_key() == HierarchicalStrategy(cluster_size=2).cache_key()
+    assert cache.cache_info().misses == 2
+
+
+@pytest.mark.parametrize("as_lazy", [False, True])
+def test_editing_the_grid_in_place_invalidates_cached_routes(as_lazy):
+    terrain = TerrainGrid(np.zeros((1, 5), dtype=np.uint8), WALLED_PALETTE)
+    grid = terrain.lazy() if as_lazy else terrain
+    context = Context(_grid=grid, _start=terrain.node_at(0), _end=terrain.node_at(4), _cache=RouteCache())
+    assert len(context.run()) == 4
+
+    terrain.set_cells({Position(0, 2): WALL})
+
+    assert context.run() == [] == DijkstraStrategy.find_path(terrain, terrain.node_at(0), terrain.node_at(4))
+
+
+def test_editing_a_list_grid_in_place_invalidates_cached_routes():
+    grid = TerrainGrid.filled(1, 5).to_nodes()
+    context = Context(_grid=grid, _start=grid[0][0], _end=grid[0][4], _cache=RouteCache())
+    assert len(context.run()) == 4
+
+    grid[0][2] = Valley(weight=math.inf, position=Position(0, 2))
+
+    assert context.run() == []
+
+
+def test_cache_setter_invalid_type():
+    with pytest.raises(TypeError) as excinfo:
+        Context(_strategy=AStarStrategy()).cache = {}
+    assert "Cache must be an instance of RouteCache" in str(excinfo.value)
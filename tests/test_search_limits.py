@@ -0,0 +1,164 @@
+import math
+
+import numpy as np
+import pytest
+
+from fuel_efficency.algorithms.a_star import AStarStrategy
+from fuel_efficency.algorithms.bidirectional import BidirectionalStrategy
+from fuel_efficency.algorithms.context import Context
+from fuel_efficency.algorithms.cost_model import WeightedCostModel
+from fuel_efficency.algorithms.d_star_lite import DStarLiteStrategy
+from fuel_efficency.algorithms.dijkstra import DijkstraStrategy
+from fuel_efficency.algorithms.hierarchical import HierarchicalStrategy
+from fuel_efficency.algorithms.jump_point import JumpPointStrategy
+from fuel_efficency.algorithms.route_cache import RouteCache
+from fuel_efficency.algorithms.search_limits import LimitReached, SearchLimits
+from fuel_efficency.algorithms.search_stats import SearchStats
+from fuel_efficency.entities.position import Position
+from fuel_efficency.entities.terrain_grid import TerrainGrid
+from tests.helpers import WALL, WALLED_PALETTE, create_random_terrain
+
+SEARCHES = [DijkstraStrategy.find_path, AStarStrategy.find_path]
+
+
+def create_walled_terrain(side: int = 30) -> TerrainGrid:
+    # The end sits in a sealed box, so an unlimited search explores the whole grid
+    codes = np.zeros((side, side), dtype=np.uint8)
+    codes[side - 4, side - 4:] = codes[side - 4:, side - 4] = WALL
+    return TerrainGrid(codes, WALLED_PALETTE)
+
+
+@pytest.mark.parametrize("search", SEARCHES)
+def test_limits_do_not_change_found_paths(search):
+    terrain = create_random_terrain(20, 20, 0)
+    start, end = terrain.node_at(0), terrain.node_at(399)
+    limits = SearchLimits(max_expansions=10 ** 6, max_open_set=10 ** 6, max_cost=10 ** 6)
+
+    assert search(terrain, start, end, cost_model=WeightedCostModel(), limits=limits) == search(terrain, start, end, cost_model=WeightedCostModel())
+
+
+@pytest.mark.parametrize("search", SEARCHES)
+def test_max_expansions_stops_the_search(search):
+    terrain = create_walled_terrain()
+    start, end = terrain.node_at(0), terrain.node_at(terrain.size - 1)
+    stats = SearchStats()
+
+    result = search(terrain, start, end, limits=SearchLimits(max_expansions=50), stats=stats)
+
+    assert isinstance(result, LimitReached)
+    assert not result and len(result) == 0 and list(result) == []
+    assert result.reason == 'max_expansions'
+    assert stats.nodes_expanded == 51  # Stats count the cell popped when the limit hit, like the end cell
+    assert result.frontier and result.partial[-1] == result.frontier[0]
+    # The partial path is a connected walk out of the start
+    previous = start.position
+    for node in result.partial:
+        assert max(abs(node.position.x - previous.x), abs(node.position.y - previous.y)) == 1
+        previous = node.position
+
+
+@pytest.mark.parametrize("search", SEARCHES)
+def test_max_open_set_stops_the_search(search):
+    terrain = create_walled_terrain()
+
+    result = search(terrain, terrain.node_at(0), terrain.node_at(terrain.size - 1), limits=SearchLimits(max_open_set=20))
+
+    assert isinstance(result, LimitReached) and result.reason == 'max_open_set'
+    # Superseded entries count towards the open set, but are not part of the frontier
+    assert 0 < len(result.frontier) <= 20 + 8
+
+
+@pytest.mark.parametrize("search", SEARCHES)
+def test_max_cost_bounds_the_search(search):
+    terrain = TerrainGrid.filled(20, 20)
+    start, end = terrain.node_at(0), terrain.node_at(terrain.index(Position(0, 15)))
+
+    result = search(terrain, start, end, limits=SearchLimits(max_cost=10))
+
+    assert isinstance(result, LimitReached) and result.reason == 'max_cost'
+    assert result.partial_cost <= 10
+    assert search(terrain, start, end, limits=SearchLimits(max_cost=15)) == search(terrain, start, end)
+
+
+def test_dijkstra_max_cost_frontier_is_the_budget_edge():
+    terrain = TerrainGrid.filled(20, 20)
+    start, end = terrain.node_at(0), terrain.node_at(terrain.index(Position(0, 15)))
+
+    result = DijkstraStrategy.find_path(terrain, start, end, limits=SearchLimits(max_cost=10))
+
+    assert result.frontier[0].position == Position(0, 10)
+    assert result.partial_cost == 10
+
+
+def test_a_star_max_cost_gives_up_at_the_start_when_the_estimate_is_over_budget():
+    terrain = TerrainGrid.filled(20, 20)
+    start, end = terrain.node_at(0), terrain.node_at(terrain.index(Position(0, 15)))
+
+    result = AStarStrategy.find_path(terrain, start, end, limits=SearchLimits(max_cost=10))
+
+    assert [node.position for node in result.frontier] == [start.position]
+    assert result.partial == [] and result.partial_cost == 0
+
+
+@pytest.mark.parametrize("search", SEARCHES)
+def test_beam_width_finds_a_path_or_reports_the_cut(search):
+    terrain = TerrainGrid.filled(20, 20)
+    start, end = terrain.node_at(0), terrain.node_at(399)
+
+    assert len(search(terrain, start, end, limits=SearchLimits(beam_width=4))) > 0
+
+    walled = create_walled_terrain()
+    result = search(walled, walled.node_at(0), walled.node_at(walled.size - 1), limits=SearchLimits(beam_width=4))
+    assert isinstance(result, LimitReached) and result.reason == 'beam_width'
+
+
+@pytest.mark.parametrize("search", SEARCHES)
+def test_unreachable_end_within_limits_is_an_empty_path(search):
+    terrain = create_walled_terrain(10)
+
+    assert search(terrain, terrain.node_at(0), terrain.node_at(99), limits=SearchLimits(max_expansions=1000)) == []
+
+
+def test_scalar_only_limits():
+    terrain = TerrainGrid.filled(3, 3)
+
+    with pytest.raises(ValueError):
+        DijkstraStrategy.find_path(terrain, terrain.node_at(0), terrain.node_at(8), vectorized=True, limits=SearchLimits(max_expansions=1))
+
+
+@pytest.mark.parametrize("options", [dict(max_expansions=0), dict(max_open_set=-1), dict(beam_width=1.5), dict(max_cost=-1.0), dict(max_cost=math.nan)])
+def test_invalid_limits_raise(options):
+    with pytest.raises(ValueError):
+        SearchLimits(**options)
+
+
+def test_context_forwards_limits_and_does_not_cache_cutoffs():
+    terrain = create_walled_terrain()
+    context = Context(_grid=terrain, _start=terrain.node_at(0), _end=terrain.node_at(terrain.size - 1), _cache=RouteCache())
+    context.limits = SearchLimits(max_expansions=10)
+
+    assert isinstance(context.run(), LimitReached)
+    assert len(context.cache) == 0
+
+    with pytest.raises(TypeError):
+        context.limits = 10
+
+
+@pytest.mark.parametrize("strategy", [BidirectionalStrategy(), JumpPointStrategy(), HierarchicalStrategy(), DStarLiteStrategy()])
+def test_context_rejects_limits_for_strategies_without_them(strategy):
+    terrain = create_walled_terrain()
+    context = Context(_grid=terrain, _start=terrain.node_at(0), _end=terrain.node_at(terrain.size - 1))
+    context.strategy = strategy
+    with pytest.raises(ValueError):
+        context.limits = SearchLimits(max_expansions=10)
+    assert context.limits is None
+
+    context.strategy = DijkstraStrategy()
+    context.limits = SearchLimits(max_expansions=10)
+    with pytest.raises(ValueError):
+        context.strategy = strategy
+    assert isinstance(context.strategy, DijkstraStrategy)
+
+    # Fields set at construction are checked when the search runs
+    with pytest.raises(ValueError):
+        Context(_strategy=strategy, _grid=terrain, _limits=SearchLimits(max_expansions=10)).run()
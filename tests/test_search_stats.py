@@ -0,0 +1,159 @@
+import heapq
+import types
+
+import pytest
+
+from fuel_efficency.algorithms.a_star import AStarStrategy
+from fuel_efficency.algorithms.bidirectional import BidirectionalStrategy
+from fuel_efficency.algorithms.context import Context
+from fuel_efficency.algorithms.cost_model import WeightedCostModel
+from fuel_efficency.algorithms.d_star_lite import DStarLiteStrategy
+from fuel_efficency.algorithms.dijkstra import DijkstraStrategy
+from fuel_efficency.algorithms.hierarchical import HierarchicalStrategy
+from fuel_efficency.algorithms.jump_point import JumpPointStrategy
+from fuel_efficency.algorithms.route_cache import RouteCache
+from fuel_efficency.algorithms.search_limits import SearchLimits
+from fuel_efficency.algorithms.search_stats import SearchStats
+from fuel_efficency.entities.position import Position
+from fuel_efficency.entities.terrain_grid import TerrainGrid
+from fuel_efficency.entities.up_hill import UpHill
+from fuel_efficency.entities.valley import Valley
+
+SEARCHES = [
+    lambda grid, start, end, **options: DijkstraStrategy.find_path(grid, start, end, cost_model=WeightedCostModel(), **options),
+    lambda grid, start, end, **options: DijkstraStrategy.find_path(grid, start, end, cost_model=WeightedCostModel(), vectorized=True, **options),
+    lambda grid, start, end, **options: DijkstraStrategy.find_path(grid, start, end, cost_model=WeightedCostModel(), bucketed=True, **options),
+    lambda grid, start, end, **options: AStarStrategy.find_path(grid, start, end, cost_model=WeightedCostModel(), **options),
+]
+
+
+def create_hill_grid():
+    grid = [[Valley(position=Position(x, y)) for y in range(12)] for x in range(12)]
+    for x in range(2, 10):
+        grid[x][6] = UpHill(position=Position(x, 6))
+    return grid
+
+
+@pytest.mark.parametrize("search", SEARCHES)
+def test_stats_do_not_change_the_path(search):
+    grid = create_hill_grid()
+
+    assert search(grid, grid[5][0], grid[6][11], stats=SearchStats()) == search(grid, grid[5][0], grid[6][11])
+
+
+@pytest.mark.parametrize("search", SEARCHES)
+def test_stats_counters_add_up(search):
+    grid = create_hill_grid()
+    expanded = []
+    stats = SearchStats(trace=lambda index, priority: expanded.append(index))
+
+    path = search(grid, grid[5][0], grid[6][11], stats=stats)
+
+    assert path
+    assert stats.nodes_expanded == len(expanded) == len(set(expanded))
+    assert stats.heap_pops == stats.nodes_expanded + stats.stale_pops
+    assert stats.heap_pushes >= stats.heap_pops
+    assert 0 < stats.peak_open_set <= stats.heap_pushes
+    assert expanded[-1] == 6 * 12 + 11
+    assert stats.total_seconds >= stats.get_neighbors_seconds + stats.reconstruct_path_seconds > 0
+
+
+def test_a_star_times_its_heuristic():
+    grid = create_hill_grid()
+    stats = SearchStats()
+    AStarStrategy.find_path(grid, grid[0][0], grid[11][11], stats=stats)
+
+    assert stats.calculate_distance_seconds > 0
+
+
+@pytest.mark.parametrize("strategy, unpushed", [(DijkstraStrategy, 0), (AStarStrategy, 1)])
+def test_heap_pushes_count_entries_dropped_by_the_beam(monkeypatch, strategy, unpushed):
+    # A* seeds its open set with the start entry rather than pushing it
+    pushes = []
+
+    def heappush(heap, item):
+        pushes.append(item)
+        heapq.heappush(heap, item)
+
+    module = __import__(strategy.__module__, fromlist=['heapq'])
+    monkeypatch.setattr(module, 'heapq', types.SimpleNamespace(heappush=heappush, heappop=heapq.heappop))
+    terrain = TerrainGrid.filled(30, 30)
+    stats = SearchStats()
+
+    strategy.find_path(terrain, terrain.node_at(0), terrain.node_at(899), stats=stats, limits=SearchLimits(beam_width=3))
+
+    assert stats.heap_pushes == len(pushes) + unpushed
+
+
+def test_stats_accumulate_across_searches():
+    terrain = TerrainGrid.filled(5, 5)
+    stats = SearchStats()
+    DijkstraStrategy.find_path(terrain, Valley(position=Position(0, 0)), Valley(position=Position(4, 4)), stats=stats)
+    first = stats.as_dict()
+    DijkstraStrategy.find_path(terrain, Valley(position=Position(0, 0)), Valley(position=Position(4, 4)), stats=stats)
+
+    assert stats.nodes_expanded == 2 * first['nodes_expanded']
+    assert stats.heap_pushes == 2 * first['heap_pushes']
+
+
+def test_settle_counts_the_whole_tree():
+    terrain = TerrainGrid.filled(4, 5)
+    stats = SearchStats()
+    DijkstraStrategy.settle(terrain, 0, WeightedCostModel().compile(terrain.palette_weights, DijkstraStrategy.step_lengths), stats=stats)
+
+    assert stats.nodes_expanded == 20
+    assert stats.heap_pushes == stats.heap_pops
+
+
+def test_as_dict_leaves_out_the_trace():
+    stats = SearchStats(nodes_expanded=3, trace=print)
+
+    assert stats.as_dict()['nodes_expanded'] == 3
+    assert 'trace' not in stats.as_dict()
+
+
+def test_context_returns_stats_through_last_stats_and_callback():
+    grid = create_hill_grid()
+    received = []
+    context = Context(_strategy=AStarStrategy(), _grid=grid, _start=grid[5][0], _end=grid[6][11])
+    assert context.last_stats is None
+
+    context.stats_callback = received.append
+    path = context.run()
+
+    assert path == AStarStrategy.find_path(grid, grid[5][0], grid[6][11])
+    assert received == [context.last_stats]
+    assert context.last_stats.nodes_expanded > 0
+
+
+@pytest.mark.parametrize("strategy", [DijkstraStrategy(), AStarStrategy(), BidirectionalStrategy(), JumpPointStrategy(), HierarchicalStrategy(cluster_size=4), DStarLiteStrategy()])
+def test_context_collects_stats_with_every_strategy(strategy):
+    grid = create_hill_grid()
+    context = Context(_strategy=strategy, _grid=grid, _start=grid[5][0], _end=grid[6][11], _cost_model=WeightedCostModel(), _collect_stats=True)
+
+    path = context.run()
+
+    assert path[-1] is grid[6][11]
+    assert context.last_stats.total_seconds > 0
+    # Only strategies that accept `stats=` count their expansions
+    assert (context.last_stats.nodes_expanded > 0) == ('stats' in strategy.supported_options)
+
+
+def test_context_flags_cache_hits():
+    grid = create_hill_grid()
+    context = Context(_strategy=DijkstraStrategy(), _grid=grid, _start=grid[5][0], _end=grid[6][11], _cache=RouteCache(), _collect_stats=True)
+    context.run()
+    assert not context.last_stats.cache_hit
+
+    context.run()
+
+    assert context.last_stats.cache_hit
+    assert context.last_stats.nodes_expanded == 0
+
+
+def test_context_stats_setters_check_types():
+    context = Context()
+    with pytest.raises(TypeError):
+        context.collect_stats = 1
+    with pytest.raises(TypeError):
+        context.stats_callback = "print"
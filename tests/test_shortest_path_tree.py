@@ -0,0 +1,51 @@
+import math
+
+import numpy as np
+import pytest
+
+from fuel_efficency.algorithms.cost_model import WeightedCostModel
+from fuel_efficency.algorithms.dijkstra import DijkstraStrategy
+from fuel_efficency.entities.position import Position
+from fuel_efficency.entities.terrain_grid import TerrainGrid
+from fuel_efficency.entities.valley import Valley
+from tests.helpers import WALLED_PALETTE
+
+
+def create_terrain() -> TerrainGrid:
+    codes = np.random.default_rng(11).integers(0, 4, (12, 9))
+    codes[5, :8] = 4  # Wall with a gap on the right
+    return TerrainGrid(codes.astype(np.uint8), WALLED_PALETTE)
+
+
+def test_tree_paths_match_find_path():
+    terrain = create_terrain()
+    start = Valley(position=Position(1, 1))
+
+    tree = DijkstraStrategy.shortest_path_tree(terrain, start, cost_model=WeightedCostModel())
+
+    assert tree.distances.shape == terrain.shape
+    assert tree.predecessors.dtype == np.int32
+    assert tree.cost_to(start) == 0 and tree.path_to(start) == []
+    for x in range(terrain.height):
+        for y in range(terrain.width):
+            end = Valley(position=Position(x, y))
+            expected = DijkstraStrategy.find_path(terrain, start, end, cost_model=WeightedCostModel())
+            assert [node.position for node in tree.path_to(end)] == [node.position for node in expected]
+    assert tree.cost_to(Valley(position=Position(5, 0))) == math.inf
+
+
+def test_budget_limits_the_tree():
+    terrain = TerrainGrid.filled(10, 10)
+    start = Valley(position=Position(0, 0))
+
+    tree = DijkstraStrategy.shortest_path_tree(terrain, start, budget=3)
+
+    assert tree.reachable().sum() == 11  # Every cell of the 3x3 corner plus (3, 0) and (0, 3)
+    assert tree.path_to(Valley(position=Position(5, 5))) == []
+    assert np.all(tree.predecessors[np.isinf(tree.distances.ravel())] == -1)
+    assert tree.reachable(budget=1).sum() == 3
+
+
+def test_start_outside_grid():
+    with pytest.raises(ValueError):
+        DijkstraStrategy.shortest_path_tree(TerrainGrid.filled(2, 2), Valley())
@@ -0,0 +1,113 @@
+import numpy as np
+import pytest
+
+from fuel_efficency.algorithms.a_star import AStarStrategy
+from fuel_efficency.algorithms.context import Context
+from fuel_efficency.algorithms.dijkstra import DijkstraStrategy
+from fuel_efficency.entities.down_hill import DownHill
+from fuel_efficency.entities.plateau import Plateau
+from fuel_efficency.entities.position import Position
+from fuel_efficency.entities.terrain_grid import DEFAULT_PALETTE, TerrainGrid, as_terrain_grid
+from fuel_efficency.entities.up_hill import UpHill
+from fuel_efficency.entities.valley import Valley
+
+
+def create_mixed_terrain_grid():
+    kinds = [Valley, Plateau, UpHill, DownHill]
+    return [[kinds[(x + y) % 4](position=Position(x, y)) for y in range(4)] for x in range(3)]
+
+
+def test_from_nodes_round_trip():
+    grid = create_mixed_terrain_grid()
+    terrain = TerrainGrid.from_nodes(grid)
+
+    assert terrain.shape == (3, 4)
+    assert terrain.codes.dtype == np.uint8
+    nodes = terrain.to_nodes()
+    assert all(type(nodes[x][y]) is type(grid[x][y]) for x in range(3) for y in range(4))
+    assert all(nodes[x][y].position == Position(x, y) for x in range(3) for y in range(4))
+    assert terrain.weights[0, 2] == UpHill().weight
+
+
+def test_from_nodes_adds_custom_weights_to_palette():
+    grid = [[Valley(), Valley(weight=float(7))]]
+    terrain = TerrainGrid.from_nodes(grid)
+
+    assert terrain.weights.tolist() == [[1.0, 7.0]]
+    assert terrain.node_at(1).weight == 7.0
+
+
+def test_from_nodes_rejects_ragged_grid():
+    with pytest.raises(ValueError) as excinfo:
+        TerrainGrid.from_nodes([[Valley(), Valley()], [Valley()]])
+    assert "same length" in str(excinfo.value)
+
+
+def test_codes_out_of_palette_range():
+    with pytest.raises(ValueError):
+        TerrainGrid(np.full((2, 2), 9, dtype=np.uint8))
+
+
+def test_index_position_and_node_at():
+    terrain = TerrainGrid.filled(3, 5, Plateau)
+
+    assert terrain.index(Position(2, 1)) == 11
+    assert terrain.position(11) == Position(2, 1)
+    node = terrain.node_at(11)
+    assert isinstance(node, Plateau) and node.position == Position(2, 1)
+    assert as_terrain_grid(terrain) is terrain
+
+
+@pytest.mark.parametrize("strategy", [DijkstraStrategy, AStarStrategy])
+def test_strategies_accept_terrain_grid(strategy):
+    grid = create_mixed_terrain_grid()
+    terrain = TerrainGrid.from_nodes(grid)
+    start, end = grid[0][0], grid[2][3]
+
+    path = strategy.find_path(terrain, start, end)
+
+    assert path == strategy.find_path(grid, start, end)
+    assert [type(node) for node in path] == [type(grid[n.position.x][n.position.y]) for n in path]
+
+
+@pytest.mark.parametrize("strategy", [DijkstraStrategy, AStarStrategy])
+def test_strategies_return_empty_path_outside_grid(strategy):
+    terrain = TerrainGrid.filled(3, 3)
+
+    assert strategy.find_path(terrain, Valley(position=Position(0, 0)), Valley(position=Position(5, 5))) == []
+
+
+def test_context_runs_on_terrain_grid():
+    terrain = TerrainGrid.filled(3, 3)
+    context = Context()
+    context.grid = terrain
+    context.start = Valley(position=Position(0, 0))
+    context.end = Valley(position=Position(2, 2))
+
+    assert context.run() == [Valley(position=Position(1, 1)), Valley(position=Position(2, 2))]
+
+
+def test_set_cells_updates_codes_and_derived_arrays():
+    terrain = TerrainGrid.filled(2, 3)
+    assert terrain.weights.tolist() == [[1, 1, 1], [1, 1, 1]]
+    assert terrain.fingerprint == TerrainGrid.filled(2, 3).fingerprint != TerrainGrid.filled(3, 2).fingerprint
+
+    changed = terrain.set_cells({Position(1, 2): 2, Position(0, 0): 0})
+
+    assert changed == [5]
+    assert terrain.weights.tolist() == [[1, 1, 1], [1, 1, 2]]
+    assert terrain.fingerprint != TerrainGrid.filled(2, 3).fingerprint
+    assert sorted(terrain.used_palette_weights.tolist()) == [1, 2]
+    with pytest.raises(ValueError):
+        terrain.set_cells({Position(2, 0): 0})
+    with pytest.raises(ValueError):
+        terrain.set_cells({Position(0, 0): len(terrain.palette)})
+
+
+def test_code_of_extends_the_palette_once():
+    terrain = TerrainGrid.filled(1, 1)
+
+    assert terrain.code_of(UpHill()) == 2
+    assert terrain.code_of(UpHill(weight=float(7))) == len(DEFAULT_PALETTE)
+    assert terrain.code_of(UpHill(weight=float(7))) == len(DEFAULT_PALETTE)
+    assert terrain.palette[-1] == (UpHill, 7.0)
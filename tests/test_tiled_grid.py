@@ -0,0 +1,108 @@
+import math
+
+import numpy as np
+import pytest
+
+from fuel_efficency.algorithms.a_star import AStarStrategy
+from fuel_efficency.algorithms.context import Context
+from fuel_efficency.algorithms.cost_model import WeightedCostModel
+from fuel_efficency.algorithms.dijkstra import DijkstraStrategy
+from fuel_efficency.algorithms.workspace import SearchWorkspace, SparseSearchWorkspace
+from fuel_efficency.entities.grid_file import load_tiled_grid, save_grid, save_tiled_grid
+from fuel_efficency.entities.position import Position
+from fuel_efficency.entities.terrain_grid import TerrainGrid, as_terrain_grid
+from fuel_efficency.entities.valley import Valley
+from tests.helpers import WALLED_PALETTE
+
+SEARCHES = [DijkstraStrategy.find_path, AStarStrategy.find_path]
+
+
+@pytest.fixture
+def terrain():
+    rng = np.random.default_rng(1)
+    codes = rng.integers(0, 5, (45, 70)).astype(np.uint8)
+    return TerrainGrid(codes, WALLED_PALETTE)
+
+
+@pytest.fixture
+def tiled_path(tmp_path, terrain):
+    path = tmp_path / 'map.ftile'
+    save_tiled_grid(path, terrain, tile_size=8)
+    return path
+
+
+def test_tiled_grid_reads_every_code(terrain, tiled_path):
+    with load_tiled_grid(tiled_path, prefetch=False) as tiled:
+        assert tiled.shape == (45, 70) and tiled.palette == terrain.palette
+        assert [tiled.flat_codes[index] for index in range(tiled.size)] == terrain.codes.ravel().tolist()
+        assert tiled.used_palette_weights.tolist() == terrain.used_palette_weights.tolist()
+        assert tiled.node_at(100) == terrain.node_at(100)
+        assert as_terrain_grid(tiled) is tiled
+
+
+@pytest.mark.parametrize("search", SEARCHES)
+def test_searches_cross_tiles_transparently(terrain, tiled_path, search):
+    start, end = Valley(position=Position(0, 0)), Valley(position=Position(44, 66))
+    expected = search(terrain, start, end, cost_model=WeightedCostModel())
+    assert expected
+
+    with load_tiled_grid(tiled_path, max_bytes=8 * 8 * 6) as tiled:
+        assert search(tiled, start, end, cost_model=WeightedCostModel()) == expected
+        assert tiled.resident <= 5
+        assert tiled.stats.loads + tiled.stats.prefetch_hits > 5
+        assert tiled.stats.evictions > 0
+
+
+def test_memory_ceiling_bounds_resident_tiles(tiled_path):
+    with load_tiled_grid(tiled_path, max_bytes=3 * 64, prefetch=False) as tiled:
+        for index in range(0, tiled.size, 7):
+            tiled.flat_codes[index]
+        assert tiled.resident == 3
+        assert tiled.resident_bytes == 3 * 64
+        assert tiled.stats.loads == tiled.stats.evictions + 3
+
+    with pytest.raises(ValueError):
+        load_tiled_grid(tiled_path, max_bytes=64)
+
+
+def test_prefetch_reads_ahead_in_the_direction_of_travel(tiled_path):
+    with load_tiled_grid(tiled_path) as tiled:
+        # Walk along row 0, one tile after another
+        for y in range(0, 70, 8):
+            tiled.flat_codes[y]
+
+        assert tiled.stats.prefetches > 0
+        assert tiled.stats.prefetch_hits > 0
+        assert tiled.stats.loads + tiled.stats.prefetch_hits == 9
+
+
+def test_tiled_searches_use_a_sparse_workspace(tiled_path):
+    with load_tiled_grid(tiled_path) as tiled:
+        workspace = SearchWorkspace.default(tiled)
+        assert isinstance(workspace, SparseSearchWorkspace)
+        DijkstraStrategy.find_path(tiled, Valley(position=Position(0, 0)), Valley(position=Position(3, 3)))
+        assert len(workspace.cost) < tiled.size
+        assert workspace.prepare(tiled.size).cost[5] == math.inf
+
+
+def test_vectorized_search_rejects_tiled_grids(tiled_path):
+    with load_tiled_grid(tiled_path) as tiled:
+        with pytest.raises(ValueError):
+            DijkstraStrategy.find_path(tiled, Valley(position=Position(0, 0)), Valley(position=Position(3, 3)), vectorized=True)
+
+
+def test_context_runs_on_tiled_grids(terrain, tiled_path):
+    with load_tiled_grid(tiled_path) as tiled:
+        context = Context()
+        context.grid = tiled
+        context.start = Valley(position=Position(0, 0))
+        context.end = Valley(position=Position(20, 30))
+
+        assert context.run() == DijkstraStrategy.find_path(terrain, context.start, context.end)
+
+
+def test_load_rejects_other_files(tmp_path, terrain):
+    path = tmp_path / 'map.fgrid'
+    save_grid(path, terrain)
+    with pytest.raises(ValueError):
+        load_tiled_grid(path)
@@ -0,0 +1,96 @@
+import math
+import threading
+from array import array
+
+import numpy as np
+import pytest
+
+from fuel_efficency.algorithms.a_star import AStarStrategy
+from fuel_efficency.algorithms.cost_model import WeightedCostModel
+from fuel_efficency.algorithms.dijkstra import DijkstraStrategy
+from fuel_efficency.algorithms.search_stats import SearchStats
+from fuel_efficency.algorithms.workspace import SearchWorkspace
+from fuel_efficency.entities.position import Position
+from fuel_efficency.entities.valley import Valley
+from tests.helpers import create_random_terrain
+
+SEARCHES = [DijkstraStrategy.find_path, AStarStrategy.find_path]
+
+
+def assert_clean(workspace):
+    assert all(cost == math.inf for cost in workspace.cost)
+    assert all(index == -1 for index in workspace.came_from)
+    assert not any(workspace.closed)
+
+
+def test_prepare_clears_only_touched_cells():
+    workspace = SearchWorkspace(100)
+    cost = workspace.cost
+    cost[3], workspace.came_from[3], workspace.closed[3] = 1.5, 2, 1
+    workspace.touched.append(3)
+
+    workspace.prepare(100)
+
+    assert workspace.cost is cost
+    assert workspace.touched == []
+    assert_clean(workspace)
+
+
+def test_prepare_grows_and_refills():
+    workspace = SearchWorkspace(10)
+    workspace.cost[:] = array('d', [0.0]) * 10
+    workspace.touched.extend(range(10))
+
+    workspace.prepare(10)
+    assert_clean(workspace)
+
+    workspace.prepare(50)
+    assert workspace.size == 50
+    assert_clean(workspace)
+
+
+def test_negative_size_raises():
+    with pytest.raises(ValueError):
+        SearchWorkspace(-1)
+
+
+def test_default_workspace_is_per_thread():
+    workspaces = []
+    thread = threading.Thread(target=lambda: workspaces.append(SearchWorkspace.default()))
+    thread.start()
+    thread.join()
+
+    assert SearchWorkspace.default() is SearchWorkspace.default()
+    assert workspaces[0] is not SearchWorkspace.default()
+
+
+@pytest.mark.parametrize("search", SEARCHES)
+def test_reused_workspace_gives_the_same_paths(search):
+    workspace = SearchWorkspace()
+    cost_model = WeightedCostModel()
+    rng = np.random.default_rng(1)
+    for side in (12, 5, 20):
+        terrain = create_random_terrain(side, side, side)
+        for _ in range(5):
+            start, end = (Valley(position=Position(*cell)) for cell in rng.integers(0, side, (2, 2)).tolist())
+            expected = search(terrain, start, end, cost_model=cost_model, workspace=SearchWorkspace())
+            assert search(terrain, start, end, cost_model=cost_model, workspace=workspace) == expected
+
+    workspace.prepare(workspace.size)
+    assert_clean(workspace)
+
+
+@pytest.mark.parametrize("search", SEARCHES)
+def test_workspace_survives_a_failed_search(search):
+    workspace = SearchWorkspace()
+    terrain = create_random_terrain(8, 8, 0)
+    start, end = Valley(position=Position(0, 0)), Valley(position=Position(7, 7))
+    expected = search(terrain, start, end, workspace=SearchWorkspace())
+
+    def interrupt(index, priority):
+        raise RuntimeError("stop")
+
+    with pytest.raises(RuntimeError):
+        search(terrain, start, end, workspace=workspace, stats=SearchStats(trace=interrupt))
+
+    assert search(terrain, start, end, workspace=workspace) == expected